@@ -0,0 +1,131 @@
+"""
+Simulator-free stand-ins for the cocotb objects used by the drivers, for benchmarking purposes.
+"""
+import contextlib
+import logging
+import types
+import typing as T
+
+import cocotb
+
+
+class FakeValue(int):
+	"""
+	Integer standing for the BinaryValue returned by a signal handle.
+	Provides the members used by vipyhdl : n_bits, integer and signed_integer.
+	"""
+	def __new__(cls, value : int, n_bits : int):
+		ret = super().__new__(cls, value & ((1 << n_bits) - 1))
+		ret.n_bits = n_bits
+		return ret
+
+	@property
+	def integer(self) -> int:
+		return int(self)
+
+	@property
+	def signed_integer(self) -> int:
+		v = int(self)
+		return v - (1 << self.n_bits) if v >> (self.n_bits - 1) else v
+
+	@property
+	def binstr(self) -> str:
+		return f"{int(self):0{self.n_bits}b}"
+
+
+class FakeHandle:
+	def __init__(self, name : str, width : int = 1, value : int = 0, record : bool = False):
+		"""
+		ModifiableObject-like handle recording the writes and serving the last written value.
+		:param name: Name of the signal
+		:param width: Number of bits of the signal
+		:param value: Initial value
+		:param record: Keep the history of all the written values
+		"""
+		self._name = name
+		self._path = name
+		self.width = width
+		self._value = FakeValue(value, width)
+
+		"""Number of writes"""
+		self.writes = 0
+
+		"""Number of reads"""
+		self.reads = 0
+
+		self.history : T.Optional[T.List[int]] = list() if record else None
+
+	@property
+	def value(self) -> FakeValue:
+		self.reads += 1
+		return self._value
+
+	@value.setter
+	def value(self, value):
+		self.writes += 1
+		self._value = FakeValue(int(value), self.width)
+		if self.history is not None :
+			self.history.append(int(value))
+
+	def setimmediatevalue(self, value):
+		self.value = value
+
+	def __len__(self):
+		return self.width
+
+	def __repr__(self):
+		return f"<FakeHandle {self._name}[{self.width}] = 0x{int(self._value):X}>"
+
+
+class FakeSimTime:
+	def __init__(self, start : int = 0):
+		"""
+		Manually advanced simulation time, to be patched in place of cocotb.utils.get_sim_time.
+		:param start: Initial time, in simulation steps
+		"""
+		self.now = start
+
+	def __call__(self, units : str = "step") -> int:
+		return self.now
+
+	def advance(self, steps : int = 1):
+		self.now += steps
+
+	@contextlib.contextmanager
+	def patch(self, *modules):
+		"""
+		Replace get_sim_time in the given modules (which imported it by name) for the duration of the context.
+		:param modules: Modules to patch
+		"""
+		saved = [(m, m.get_sim_time) for m in modules]
+		for m, _ in saved :
+			m.get_sim_time = self
+		try :
+			yield self
+		finally :
+			for m, func in saved :
+				m.get_sim_time = func
+
+
+def run_sync(coro):
+	"""
+	Run a coroutine which completes without awaiting any trigger, as drive methods usually do.
+	:param coro: Coroutine to run
+	:return: The coroutine result
+	:raises RuntimeError: if the coroutine awaits a trigger
+	"""
+	try :
+		trigger = coro.send(None)
+	except StopIteration as e :
+		return e.value
+	coro.close()
+	raise RuntimeError(f"Coroutine {coro!r} awaited {trigger!r}, which requires a scheduler")
+
+
+def setup_cocotb_log():
+	"""
+	Outside of a simulator, cocotb.log is left as the cocotb.log module instead of the logger set up by cocotb at
+	startup. Replace it by a plain logger, as the components use it until they are built.
+	"""
+	if isinstance(cocotb.log, types.ModuleType) :
+		cocotb.log = logging.getLogger("cocotb")
@@ -0,0 +1,127 @@
+"""
+Import time benchmark.
+
+Imports each target module in a fresh interpreter with `python -X importtime`, several times, and reports the best
+run. The time spent in the vipyhdl modules themselves is checked against a budget, dependencies (cocotb, ...) are
+only reported, as they are out of our hands. Each target also lists the vipyhdl packages it must not load.
+
+Usage : python benchmarks/import_time.py [--runs N] [--budget-scale X] [--json FILE]
+The exit code is 1 if any target goes over its budget or loads a forbidden package.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import typing as T
+from dataclasses import dataclass, field, asdict
+
+
+@dataclass
+class ImportTarget:
+	"""Module to import"""
+	module : str
+
+	"""Budget for the time spent in vipyhdl modules, in ms"""
+	budget_ms : float
+
+	"""Packages which shall not be loaded by the import"""
+	forbidden : T.List[str] = field(default_factory=list)
+
+
+TARGETS = [
+	ImportTarget("vipyhdl.drivers", 2.0, ["vipyhdl.drivers.clock", "vipyhdl.regbank", "vipyhdl.structure"]),
+	ImportTarget("vipyhdl.drivers.clock", 10.0, ["vipyhdl.regbank", "vipyhdl.bus", "vipyhdl.regression"]),
+	ImportTarget("vipyhdl.structure", 2.0, ["vipyhdl.structure.component", "vipyhdl.regbank"]),
+	ImportTarget("vipyhdl.bus.spi.spi_driver", 15.0, ["vipyhdl.regbank", "vipyhdl.drivers.aggregated_signal"]),
+	ImportTarget("vipyhdl.regbank.structure", 2.0, ["vipyhdl.regbank.structure.regbank", "cocotb"]),
+]
+
+LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass
+class ImportResult:
+	module : str
+	budget_ms : float
+
+	"""Time spent in the vipyhdl modules (self time), in ms"""
+	own_ms : float
+
+	"""Total import time, dependencies included, in ms"""
+	total_ms : float
+
+	loaded : T.List[str]
+	forbidden_loaded : T.List[str]
+
+	@property
+	def passed(self) -> bool:
+		return self.own_ms <= self.budget_ms and len(self.forbidden_loaded) == 0
+
+
+def measure(target : ImportTarget, runs : int = 5) -> ImportResult:
+	"""
+	:param target: Module to import
+	:param runs: Number of fresh interpreters to run, the best run is kept
+	:return: The import measurements
+	"""
+	env = dict(os.environ)
+	root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+	env["PYTHONPATH"] = os.pathsep.join([root] + ([env["PYTHONPATH"]] if "PYTHONPATH" in env else []))
+
+	best = None
+	for _ in range(runs) :
+		proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {target.module}"],
+							  env=env, capture_output=True, text=True)
+		if proc.returncode != 0 :
+			raise RuntimeError(f"Failed to import {target.module}:\n{proc.stderr}")
+		own_us = 0
+		total_us = 0
+		loaded = list()
+		for line in proc.stderr.splitlines() :
+			m = LINE_RE.match(line)
+			if m is None :
+				continue
+			self_us, cumulative_us, indent, name = int(m[1]), int(m[2]), m[3], m[4]
+			loaded.append(name)
+			if name.split(".")[0] == "vipyhdl" :
+				own_us += self_us
+			if len(indent) == 1 :
+				total_us += cumulative_us
+		if best is None or own_us < best[0] :
+			best = (own_us, total_us, loaded)
+
+	own_us, total_us, loaded = best
+	forbidden_loaded = [n for n in loaded if any(n == f or n.startswith(f"{f}.") for f in target.forbidden)]
+	return ImportResult(target.module, target.budget_ms, own_us / 1000, total_us / 1000,
+						sorted(n for n in loaded if n.startswith("vipyhdl")), forbidden_loaded)
+
+
+def main():
+	parser = argparse.ArgumentParser(description="vipyhdl import time benchmark")
+	parser.add_argument("--runs", type=int, default=5, help="Number of runs per target, the best one is kept")
+	parser.add_argument("--budget-scale", type=float, default=1.0, help="Scale the budgets, for slow machines")
+	parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+	args = parser.parse_args()
+
+	results = list()
+	for target in TARGETS :
+		target = ImportTarget(target.module, target.budget_ms * args.budget_scale, target.forbidden)
+		res = measure(target, args.runs)
+		results.append(res)
+		status = "PASS" if res.passed else "FAIL"
+		print(f"{status} {res.module:35s} vipyhdl {res.own_ms:7.2f} ms / {res.budget_ms:6.2f} ms budget"
+			  f"   total {res.total_ms:7.2f} ms   {len(res.loaded)} vipyhdl modules")
+		for name in res.forbidden_loaded :
+			print(f"     forbidden module loaded : {name}")
+
+	if args.json is not None :
+		with open(args.json, "w") as f :
+			json.dump([dict(asdict(r), passed=r.passed) for r in results], f, indent=2)
+
+	return 0 if all(r.passed for r in results) else 1
+
+
+if __name__ == "__main__" :
+	sys.exit(main())
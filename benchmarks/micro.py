@@ -0,0 +1,285 @@
+"""
+Simulator-free micro-benchmarks of the vipyhdl hot paths.
+
+The drivers are bound to FakeHandle objects (see benchmarks/fakes.py) and their drive methods are run without a
+scheduler, so the measurements only account for the vipyhdl code.
+Each scenario reports its throughput in ops/sec, the results may be stored as JSON and compared to a previous run.
+
+Usage :
+	python benchmarks/micro.py [--filter PATTERN] [--json FILE] [--compare FILE] [--threshold RATIO]
+
+With --compare, the exit code is 1 if any scenario is slower than the reference by more than the threshold.
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import subprocess
+import sys
+import timeit
+import typing as T
+from fnmatch import fnmatch
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakes import FakeHandle, FakeSimTime, run_sync, setup_cocotb_log
+
+from vipyhdl.bus.base import DataWord
+from vipyhdl.regbank.structure import Register, RegisterBank, Field
+from vipyhdl.utils.workarounds import VectorCodec
+from vipyhdl.drivers import SignalDriver, VectorDriver, AggregatedSignalDriver
+from vipyhdl.drivers import vector_signal, aggregated_signal
+from vipyhdl.structure import GlobalEnv
+
+"""Version of the JSON results format"""
+FORMAT_VERSION = 1
+
+"""Registered scenarios : name -> setup function returning (callable, number of ops per call)"""
+SCENARIOS : T.Dict[str, T.Callable[[], T.Tuple[T.Callable[[], T.Any], int]]] = dict()
+
+"""Simulation time used by the VectorDriver cache"""
+SIM_TIME = FakeSimTime()
+
+
+def scenario(name : str):
+	"""Register a scenario setup function under the given name"""
+	def wrap(func):
+		SCENARIOS[name] = func
+		return func
+	return wrap
+
+
+# DataWord
+@scenario("dataword.from_int")
+def _dataword_from_int():
+	return lambda: DataWord(0xA5), 1
+
+@scenario("dataword.iterate_32b")
+def _dataword_iterate():
+	def run():
+		for _ in DataWord(0xDEADBEEF, wsize=32) :
+			pass
+	return run, 1
+
+@scenario("dataword.append_8b")
+def _dataword_append():
+	def run():
+		w = DataWord(0, wsize=8, limit=True)
+		w.clear()
+		while not w.is_full :
+			w.append(1)
+		return w.value
+	return run, 1
+
+
+# Register and register bank
+def _make_register(name : str, offset : int) -> Register:
+	reg = Register(name, offset, 32)
+	for i in range(4) :
+		reg.add_field(Field(f"F{i}", f"{8*i+7}:{8*i}"))
+	return reg
+
+@scenario("register.write_read")
+def _register_write_read():
+	reg = _make_register("REG", 0)
+	def run():
+		reg.value = 0x12345678
+		return reg.value
+	return run, 1
+
+@scenario("regbank.write_read_by_offset")
+def _regbank_by_offset():
+	rb = RegisterBank("bench", 8)
+	for i in range(64) :
+		rb.add_register(_make_register(f"REG{i}", 4*i))
+	def run():
+		for i in range(64) :
+			rb.write(4*i, i)
+			rb.read(4*i)
+	return run, 64
+
+@scenario("regbank.write_read_by_name")
+def _regbank_by_name():
+	rb = RegisterBank("bench", 8)
+	for i in range(64) :
+		rb.add_register(_make_register(f"REG{i}", 4*i))
+	names = [f"REG{i}" for i in range(64)]
+	def run():
+		for i, n in enumerate(names) :
+			rb.write(n, i)
+			rb.read(n)
+	return run, 64
+
+
+# Vector codec
+@scenario("vector_codec.unpack_64x12")
+def _codec_unpack():
+	codec = VectorCodec([64, 12])
+	value = (1 << codec.width) // 3
+	return lambda: codec.unpack(value), 1
+
+@scenario("vector_codec.pack_64x12")
+def _codec_pack():
+	codec = VectorCodec([64, 12])
+	words = codec.unpack((1 << codec.width) // 3)
+	return lambda: codec.pack(words), 1
+
+
+# Drivers
+def _build(comp):
+	"""Build the component as a new environment top, so it gets its logger and its active state"""
+	GlobalEnv().teardown()
+	comp.build()
+	return comp
+
+@scenario("signal_driver.set")
+def _signal_driver_set():
+	drv = _build(SignalDriver(FakeHandle("sig", 16)))
+	def run():
+		run_sync(drv.set(0x1234))
+	return run, 1
+
+@scenario("aggregated_driver.set_8x4b")
+def _aggregated_set():
+	drv = _build(AggregatedSignalDriver([FakeHandle(f"net{i}", 4) for i in range(8)]))
+	values = [0x12345678, 0x87654321]
+	def run():
+		for v in values :
+			run_sync(drv.set(v))
+	return run, 2
+
+@scenario("aggregated_driver.value_8x4b")
+def _aggregated_value():
+	drv = _build(AggregatedSignalDriver([FakeHandle(f"net{i}", 4, i) for i in range(8)]))
+	return lambda: drv.value, 1
+
+@scenario("vector_driver.set_list_64x12")
+def _vector_set_list():
+	drv = _build(VectorDriver(FakeHandle("vec", 64*12), [64, 12]))
+	values = list(range(64))
+	def run():
+		SIM_TIME.advance()
+		drv.value = values
+	return run, 1
+
+@scenario("vector_driver.set_item_cached_64x12")
+def _vector_set_item():
+	drv = _build(VectorDriver(FakeHandle("vec", 64*12), [64, 12]))
+	def run():
+		drv[5] = 42
+	return run, 1
+
+@scenario("vector_driver.get_item_cached_64x12")
+def _vector_get_item_cached():
+	drv = _build(VectorDriver(FakeHandle("vec", 64*12), [64, 12]))
+	return lambda: drv[5], 1
+
+@scenario("vector_driver.get_int_cached_64x12")
+def _vector_get_int_cached():
+	drv = _build(VectorDriver(FakeHandle("vec", 64*12), [64, 12]))
+	return lambda: drv.get_int(5), 1
+
+@scenario("vector_driver.get_item_new_step_64x12")
+def _vector_get_item_new_step():
+	drv = _build(VectorDriver(FakeHandle("vec", 64*12), [64, 12]))
+	def run():
+		SIM_TIME.advance()
+		return drv[5]
+	return run, 1
+
+
+def measure(name : str, repeat : int = 5) -> T.Dict[str, T.Any]:
+	"""
+	:param name: Scenario to run
+	:param repeat: Number of measurements, the best one is kept
+	:return: The scenario results
+	"""
+	func, ops = SCENARIOS[name]()
+	timer = timeit.Timer(func)
+	number, _ = timer.autorange()
+	best = min(timer.repeat(repeat=repeat, number=number))
+	total_ops = number * ops
+	return {
+		"ops_per_sec" : total_ops / best,
+		"ns_per_op" : best * 1e9 / total_ops,
+		"ops" : total_ops,
+		"repeat" : repeat,
+	}
+
+
+def metadata() -> T.Dict[str, T.Any]:
+	try :
+		commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+								cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+	except OSError :
+		commit = ""
+	return {
+		"date" : datetime.datetime.now().isoformat(timespec="seconds"),
+		"commit" : commit,
+		"python" : platform.python_version(),
+		"implementation" : platform.python_implementation(),
+		"machine" : platform.machine(),
+		"system" : platform.system(),
+	}
+
+
+def compare(results : T.Dict[str, T.Dict[str, T.Any]], reference : T.Dict[str, T.Any], threshold : float) -> T.List[str]:
+	"""
+	Print the speedup of each scenario against the reference results.
+	:return: The list of the scenarios slower than the reference by more than threshold
+	"""
+	if reference.get("format") != FORMAT_VERSION :
+		raise ValueError(f"Unsupported reference format {reference.get('format')!r}, expected {FORMAT_VERSION}")
+	regressions = list()
+	print(f"\nComparison with {reference['meta'].get('commit') or 'reference'} ({reference['meta'].get('date')})")
+	for name, res in results.items() :
+		if name not in reference["results"] :
+			print(f"    {name:45s}          new")
+			continue
+		ratio = res["ops_per_sec"] / reference["results"][name]["ops_per_sec"]
+		flag = ""
+		if ratio < 1 - threshold :
+			regressions.append(name)
+			flag = "  REGRESSION"
+		print(f"    {name:45s} x{ratio:7.2f}{flag}")
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description="vipyhdl simulator-free micro-benchmarks")
+	parser.add_argument("--filter", default="*", help="Only run the scenarios matching this pattern")
+	parser.add_argument("--repeat", type=int, default=5, help="Number of measurements per scenario")
+	parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+	parser.add_argument("--compare", default=None, help="Compare the results to this JSON file")
+	parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
+	parser.add_argument("--list", action="store_true", help="List the scenarios and exit")
+	args = parser.parse_args()
+
+	names = [n for n in SCENARIOS if fnmatch(n, args.filter)]
+	if args.list :
+		print("\n".join(names))
+		return 0
+
+	setup_cocotb_log()
+	results = dict()
+	with SIM_TIME.patch(vector_signal, aggregated_signal) :
+		for name in names :
+			results[name] = measure(name, args.repeat)
+			print(f"{name:45s} {results[name]['ops_per_sec']:14,.0f} ops/s {results[name]['ns_per_op']:12,.1f} ns/op")
+
+	output = {"format" : FORMAT_VERSION, "meta" : metadata(), "results" : results}
+	if args.json is not None :
+		with open(args.json, "w") as f :
+			json.dump(output, f, indent=2)
+
+	if args.compare is not None :
+		with open(args.compare) as f :
+			reference = json.load(f)
+		if len(compare(results, reference, args.threshold)) > 0 :
+			return 1
+	return 0
+
+
+if __name__ == "__main__" :
+	sys.exit(main())
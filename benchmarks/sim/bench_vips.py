@@ -0,0 +1,224 @@
+"""
+cocotb test module of the simulator-in-the-loop benchmarks, run on loopback.v by benchmarks/sim/run.py.
+
+Each test drives one VIP for a given number of transactions and appends its measurements to the JSON file named by
+the VIPY_BENCH_FILE environment variable (vipy_bench.json in the test directory by default) :
+	- transactions per wall-clock second and simulated ns per wall-clock second,
+	- GPI callbacks registered per transaction,
+	- share of the wall time spent in the cocotb scheduler, i.e. in Python.
+
+The number of transactions is set by the BENCH_TRANSACTIONS environment variable.
+"""
+import json
+import os
+import time
+import typing as T
+
+import cocotb
+import cocotb.triggers
+from cocotb.triggers import ClockCycles, RisingEdge, Timer
+from cocotb.utils import get_sim_time
+
+from vipyhdl.structure import GlobalEnv
+from vipyhdl.drivers import ClockDriver, VectorDriver
+from vipyhdl.bus.base import DataWord, SerialMode
+from vipyhdl.bus.spi import SPIDriver, SPIMonitor, SPIInterface
+from vipyhdl.externals.adc import AdcSarBase
+
+BENCH_FILE = os.environ.get("VIPY_BENCH_FILE", "vipy_bench.json")
+TRANSACTIONS = int(os.environ.get("BENCH_TRANSACTIONS", "1000"))
+CLK_PERIOD = (10, "ns")
+
+"""Width of the vector elements, as set by the VEC_WIDTH parameter of the design"""
+VEC_WIDTH = 8
+
+
+class _CountingGPI:
+	def __init__(self, simulator):
+		"""
+		Proxy of the cocotb simulator module counting the callbacks registered by the triggers.
+		:param simulator: Simulator module to forward the calls to
+		"""
+		self._simulator = simulator
+
+		"""Number of registered callbacks, indexed by registration function"""
+		self.counts : T.Dict[str, int] = dict()
+
+	def __getattr__(self, name : str):
+		func = getattr(self._simulator, name)
+		if not name.startswith("register_") :
+			return func
+
+		def counted(*args, **kwargs):
+			self.counts[name] = self.counts.get(name, 0) + 1
+			return func(*args, **kwargs)
+		return counted
+
+	@property
+	def total(self) -> int:
+		return sum(self.counts.values())
+
+
+class Probe:
+	def __init__(self, name : str, unit : str):
+		"""
+		Measure the cost of the simulation between start() and stop().
+		:param name: Name of the benchmark
+		:param unit: Name of a transaction, for the report
+		"""
+		self.name = name
+		self.unit = unit
+		self._gpi : T.Optional[_CountingGPI] = None
+		self._saved_event_loop = None
+
+		"""Wall time spent in the scheduler event loop, in seconds"""
+		self.python_time = 0.0
+
+		self._wall_start = 0.0
+		self._sim_start = 0
+
+	def _timed_event_loop(self, trigger):
+		start = time.perf_counter()
+		try :
+			self._saved_event_loop(trigger)
+		finally :
+			self.python_time += time.perf_counter() - start
+
+	def start(self):
+		self._gpi = _CountingGPI(cocotb.triggers.simulator)
+		cocotb.triggers.simulator = self._gpi
+		# The scheduler calls self._event_loop on each GPI callback, the instance attribute takes precedence.
+		self._saved_event_loop = cocotb.scheduler._event_loop
+		cocotb.scheduler._event_loop = self._timed_event_loop
+		self._sim_start = get_sim_time("ns")
+		self._wall_start = time.perf_counter()
+
+	def stop(self, transactions : int) -> T.Dict[str, T.Any]:
+		"""
+		Stop the measurement and append the results to the benchmark file
+		:param transactions: Number of transactions done since start()
+		:return: The measurements
+		"""
+		wall = time.perf_counter() - self._wall_start
+		sim_ns = get_sim_time("ns") - self._sim_start
+		cocotb.triggers.simulator = self._gpi._simulator
+		del cocotb.scheduler._event_loop
+
+		ret = {
+			"unit" : self.unit,
+			"transactions" : transactions,
+			"wall_time" : wall,
+			"sim_time_ns" : sim_ns,
+			"per_sec" : transactions / wall,
+			"sim_ns_per_sec" : sim_ns / wall,
+			"callbacks" : dict(self._gpi.counts),
+			"callbacks_per_transaction" : self._gpi.total / transactions,
+			"python_share" : self.python_time / wall,
+		}
+		results = dict()
+		if os.path.exists(BENCH_FILE) :
+			with open(BENCH_FILE) as f :
+				results = json.load(f)
+		results[self.name] = ret
+		with open(BENCH_FILE, "w") as f :
+			json.dump(results, f, indent=1)
+
+		cocotb.log.info(f"{self.name} : {ret['per_sec']:,.0f} {self.unit}/s, {ret['callbacks_per_transaction']:.1f} GPI callbacks/{self.unit}, "
+						f"{ret['python_share'] * 100:.0f}% of the time in Python")
+		return ret
+
+
+def _start_clock(dut) -> ClockDriver:
+	drv = ClockDriver(dut.clk, period=CLK_PERIOD)
+	drv.build()
+	return drv
+
+
+@cocotb.test()
+async def bench_clock(dut):
+	GlobalEnv().teardown()
+	drv = _start_clock(dut)
+	probe = Probe("clock", "cycle")
+	probe.start()
+	await drv.start()
+	await ClockCycles(dut.clk, TRANSACTIONS)
+	probe.stop(TRANSACTIONS)
+	await drv.stop(gracefully=False)
+
+
+@cocotb.test()
+async def bench_spi(dut):
+	GlobalEnv().teardown()
+	itf = SPIInterface(mosi=dut.spi_mosi, miso=dut.spi_miso, clk=dut.spi_clk, csn=dut.spi_csn)
+	drv = SPIDriver(SerialMode.MASTER, itf, clk_period=CLK_PERIOD)
+	drv.csn_pulse_per_word = False
+	drv.build()
+	# The monitor listens to MISO, looped back from MOSI by the design
+	mon = SPIMonitor(SerialMode.MASTER, itf, per_word=True)
+	mon.start_csn_evt_handling()
+	mon.start()
+	await drv.reset()
+
+	probe = Probe("spi", "word")
+	probe.start()
+	for i in range(TRANSACTIONS) :
+		drv.to_send.put_nowait(DataWord(i & 0xFF))
+	for i in range(TRANSACTIONS) :
+		word = await mon.to_handle.get()
+		assert word.value == i & 0xFF, f"SPI loopback mismatch on word {i} : got 0x{word.value:02X}"
+	probe.stop(TRANSACTIONS)
+	mon.stop()
+
+
+@cocotb.test()
+async def bench_vector(dut):
+	GlobalEnv().teardown()
+	clk = _start_clock(dut)
+	width = VEC_WIDTH
+	depth = len(dut.vec_in) // width
+	drv = VectorDriver(dut.vec_in, [depth, width])
+	drv.build()
+	await clk.start()
+	edge = RisingEdge(dut.clk)
+
+	probe = Probe("vector", "write")
+	probe.start()
+	for i in range(TRANSACTIONS) :
+		await edge
+		drv[i % depth] = i & ((1 << width) - 1)
+	probe.stop(TRANSACTIONS)
+
+	await edge
+	assert dut.vec_out.value == dut.vec_in.value, "Vector loopback mismatch"
+	await clk.stop(gracefully=False)
+
+
+@cocotb.test()
+async def bench_adc(dut):
+	GlobalEnv().teardown()
+	clk = _start_clock(dut)
+	adc = AdcSarBase(AdcSarBase.Interface(clk=dut.clk, i_start=dut.adc_start, i_en=dut.adc_en, i_chan=dut.adc_chan,
+										  o_eoc=dut.adc_eoc, o_data=dut.adc_data))
+	adc.build()
+	dut.adc_start.value = 0
+	dut.adc_chan.value = 0
+	await clk.start()
+	await adc.reset()
+	dut.adc_en.value = 1
+	await adc.evt_pu_done.wait()
+
+	mask = (1 << adc.resolution) - 1
+	eoc = RisingEdge(dut.adc_eoc)
+	probe = Probe("adc", "conversion")
+	probe.start()
+	for i in range(TRANSACTIONS) :
+		adc.queued_values[0].append(i & mask)
+		dut.adc_start.value = 1
+		await eoc
+		dut.adc_start.value = 0
+		await Timer(*CLK_PERIOD)
+		assert dut.adc_last.value == i & mask, f"ADC conversion {i} mismatch : got {dut.adc_last.value.integer}"
+	probe.stop(TRANSACTIONS)
+
+	dut.adc_en.value = 0
+	await clk.stop(gracefully=False)
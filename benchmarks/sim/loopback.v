@@ -0,0 +1,36 @@
+// Loopback design of the simulator-in-the-loop benchmarks (benchmarks/sim/run.py).
+// Every VIP under test drives the inputs, and the outputs echo them back so that the monitors see real
+// simulator value changes. Kept to plain Verilog-2005 to build on both Icarus Verilog and Verilator.
+`timescale 1ns/1ps
+
+module vipy_bench_top #(
+	parameter VEC_WIDTH = 8,
+	parameter VEC_DEPTH = 8,
+	parameter ADC_RES   = 10
+) (
+	input  wire                           clk,
+
+	input  wire                           spi_clk,
+	input  wire                           spi_csn,
+	input  wire                           spi_mosi,
+	output wire                           spi_miso,
+
+	input  wire [VEC_WIDTH*VEC_DEPTH-1:0] vec_in,
+	output wire [VEC_WIDTH*VEC_DEPTH-1:0] vec_out,
+
+	input  wire                           adc_en,
+	input  wire                           adc_start,
+	input  wire [2:0]                     adc_chan,
+	input  wire                           adc_eoc,
+	input  wire [ADC_RES-1:0]             adc_data,
+	output reg  [ADC_RES-1:0]             adc_last
+);
+
+	assign spi_miso = spi_mosi;
+	assign vec_out  = vec_in;
+
+	initial adc_last = {ADC_RES{1'b0}};
+	always @(posedge adc_eoc)
+		adc_last <= adc_data;
+
+endmodule
@@ -0,0 +1,135 @@
+"""
+Simulator-in-the-loop benchmarks of the vipyhdl VIPs.
+
+The tests of bench_vips.py are run on the loopback.v design through the vipyhdl regression runner, each one in its
+own simulator process with the task registry profiling enabled. For each VIP, the report gives :
+	- the transactions per wall-clock second and the simulated time per wall-clock second,
+	- the GPI callbacks registered per transaction,
+	- the share of the wall time spent in Python,
+	- the most time consuming vipyhdl tasks.
+
+Usage :
+	python benchmarks/sim/run.py [--simulator icarus|verilator] [--transactions N] [--json FILE] [--compare FILE]
+
+With --compare, the exit code is 1 if any benchmark is slower than the reference by more than the threshold.
+"""
+import argparse
+import json
+import os
+import sys
+import typing as T
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(os.path.dirname(HERE)))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from micro import metadata
+
+from vipyhdl.regression import RegressionRunner, RegressionSummary
+
+"""Version of the JSON results format"""
+FORMAT_VERSION = 1
+
+BENCHMARKS = ["bench_clock", "bench_spi", "bench_vector", "bench_adc"]
+BENCH_FILENAME = "vipy_bench.json"
+
+
+def collect(summary : RegressionSummary) -> T.Dict[str, T.Dict[str, T.Any]]:
+	"""
+	:return: The measurements written by the benchmark tests, indexed by benchmark name
+	"""
+	ret = dict()
+	for r in summary.results :
+		path = os.path.join(r.test_dir, BENCH_FILENAME)
+		if not os.path.exists(path) :
+			continue
+		with open(path) as f :
+			results = json.load(f)
+		for name, res in results.items() :
+			res["profile"] = sorted(r.profile, key=lambda x: x["wall_time"], reverse=True)[:5]
+			ret[name] = res
+	return ret
+
+
+def report(results : T.Dict[str, T.Dict[str, T.Any]]) -> str:
+	ret = f"{'Benchmark':10s} {'Trans./s':>12s} {'Sim ns/s':>12s} {'GPI cb/trans.':>14s} {'Python':>7s}\n"
+	for name, res in results.items() :
+		ret += f"{name:10s} {res['per_sec']:12,.0f} {res['sim_ns_per_sec']:12,.0f} {res['callbacks_per_transaction']:14.1f} " \
+			   f"{res['python_share'] * 100:6.1f}%\n"
+		for p in res["profile"] :
+			tname = f"{p['owner']}:{p['name']}"
+			ret += f"    {tname[-50:]:50s} {p['resumptions']:10d} {p['wall_time'] * 1e3:10.1f} ms\n"
+	return ret
+
+
+def compare(results : T.Dict[str, T.Dict[str, T.Any]], reference : T.Dict[str, T.Any], threshold : float) -> T.List[str]:
+	"""
+	Print the speedup of each benchmark against the reference results.
+	:return: The list of the benchmarks slower than the reference by more than threshold
+	"""
+	if reference.get("format") != FORMAT_VERSION :
+		raise ValueError(f"Unsupported reference format {reference.get('format')!r}, expected {FORMAT_VERSION}")
+	regressions = list()
+	print(f"\nComparison with {reference['meta'].get('commit') or 'reference'} ({reference['meta'].get('date')})")
+	for name, res in results.items() :
+		if name not in reference["results"] :
+			print(f"    {name:10s}          new")
+			continue
+		ratio = res["per_sec"] / reference["results"][name]["per_sec"]
+		cb_ref = reference["results"][name]["callbacks_per_transaction"]
+		flag = ""
+		if ratio < 1 - threshold :
+			regressions.append(name)
+			flag = "  REGRESSION"
+		print(f"    {name:10s} x{ratio:7.2f}   GPI callbacks/trans. {cb_ref:.1f} -> {res['callbacks_per_transaction']:.1f}{flag}")
+	return regressions
+
+
+def main():
+	parser = argparse.ArgumentParser(description="vipyhdl simulator-in-the-loop benchmarks")
+	parser.add_argument("--simulator", default="icarus", help="Simulator, as understood by the cocotb runner")
+	parser.add_argument("--transactions", type=int, default=1000, help="Number of transactions per benchmark")
+	parser.add_argument("--work-dir", default="sim_bench", help="Directory holding the build and the runs")
+	parser.add_argument("-j", "--workers", type=int, default=1, help="Number of parallel simulators. Running several "
+															   "at once makes the measurements noisier.")
+	parser.add_argument("--json", default=None, help="Write the results to this JSON file")
+	parser.add_argument("--compare", default=None, help="Compare the results to this JSON file")
+	parser.add_argument("--threshold", type=float, default=0.1, help="Relative slowdown reported as a regression")
+	args = parser.parse_args()
+
+	runner = RegressionRunner(
+		simulator=args.simulator,
+		sources=[os.path.join(HERE, "loopback.v")],
+		hdl_toplevel="vipy_bench_top",
+		work_dir=args.work_dir,
+		workers=args.workers
+	)
+	runner.add_matrix("bench_vips", testcases=BENCHMARKS, split_testcases=True,
+					  extra_env={"BENCH_TRANSACTIONS" : [str(args.transactions)]})
+	summary = runner.run()
+	if not summary.passed :
+		print(summary.as_report)
+		return 1
+
+	results = collect(summary)
+	print(report(results))
+
+	meta = metadata()
+	meta["simulator"] = args.simulator
+	output = {"format" : FORMAT_VERSION, "meta" : meta, "results" : results}
+	if args.json is not None :
+		with open(args.json, "w") as f :
+			json.dump(output, f, indent=2)
+
+	if args.compare is not None :
+		with open(args.compare) as f :
+			reference = json.load(f)
+		if reference["meta"].get("simulator") != args.simulator :
+			print(f"Warning : the reference was measured with {reference['meta'].get('simulator')}, not {args.simulator}")
+		if len(compare(results, reference, args.threshold)) > 0 :
+			return 1
+	return 0
+
+
+if __name__ == "__main__" :
+	sys.exit(main())
@@ -0,0 +1,87 @@
+"""
+VIP throughput on the stand-in simulator.
+
+Runs the clock and SPI VIPs on vipyhdl.standin signals, without any HDL simulator, and reports their throughput
+in wall-clock time along with the number of GPI callbacks they cost.
+
+Usage : python benchmarks/standin.py [--words N] [--cycles N]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from cocotb.triggers import ClockCycles
+
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.structure import GlobalEnv
+from vipyhdl.drivers import ClockDriver
+from vipyhdl.bus.base import DataWord, SerialMode
+from vipyhdl.bus.spi import SPIDriver, SPIMonitor, SPIInterface
+
+
+def report(label : str, count : int, unit : str, elapsed : float, sim : StandinSimulator):
+	callbacks = sum(sim.stats["callbacks"].values())
+	print(f"{label:20s} {count / elapsed:12,.0f} {unit}/s   {callbacks / count:8.1f} GPI callbacks/{unit}"
+		  f"   {sim.stats['deltas'] / count:6.1f} deltas/{unit}")
+
+
+def bench_clock(cycles : int):
+	sim = StandinSimulator()
+	clk = sim.signal("clk")
+
+	async def test():
+		drv = ClockDriver(clk, period=(10, "ns"))
+		drv.build()
+		await drv.start()
+		await ClockCycles(clk, cycles)
+
+	GlobalEnv().teardown()
+	start = time.perf_counter()
+	sim.run(test())
+	report("ClockDriver", cycles, "cycle", time.perf_counter() - start, sim)
+	sim.uninstall()
+
+
+def bench_spi(words : int, burst : bool = False):
+	sim = StandinSimulator()
+	itf = SPIInterface(mosi=sim.signal("mosi"), miso=sim.signal("miso"), clk=sim.signal("clk"), csn=sim.signal("csn", value=1))
+
+	async def test():
+		drv = SPIDriver(SerialMode.MASTER, itf, clk_period=(10, "ns"))
+		drv.csn_pulse_per_word = False
+		drv.burst = burst
+		drv.build()
+		mon = SPIMonitor(SerialMode.SLAVE, itf, per_word=True)
+		mon.start_csn_evt_handling()
+		mon.start()
+		await drv.reset()
+		for i in range(words) :
+			drv.to_send.put_nowait(DataWord(i & 0xFF))
+		for i in range(words) :
+			word = await mon.to_handle.get()
+			if word.value != i & 0xFF :
+				raise AssertionError(f"SPI loopback mismatch on word {i} : got 0x{word.value:02X}")
+
+	GlobalEnv().teardown()
+	start = time.perf_counter()
+	sim.run(test())
+	report("SPI burst loopback" if burst else "SPI loopback", words, "word", time.perf_counter() - start, sim)
+	sim.uninstall()
+
+
+def main():
+	parser = argparse.ArgumentParser(description="vipyhdl VIP throughput on the stand-in simulator")
+	parser.add_argument("--words", type=int, default=500, help="Number of SPI words")
+	parser.add_argument("--cycles", type=int, default=10000, help="Number of clock cycles")
+	args = parser.parse_args()
+
+	bench_clock(args.cycles)
+	bench_spi(args.words)
+	bench_spi(args.words, burst=True)
+
+
+if __name__ == "__main__" :
+	main()
@@ -0,0 +1,97 @@
+"""
+Vector codec benchmark.
+
+Compares the speed of VectorCodec with the former string based implementation of int_to_vector/vector_to_int.
+The round trips and the equivalence with the former implementation are checked in tests/test_vector_codec.py.
+
+Usage : python benchmarks/vector_codec.py
+"""
+import random
+import timeit
+import typing as T
+from copy import copy
+from math import prod
+
+from vipyhdl.utils.workarounds.vector_codec import VectorCodec, np
+
+
+# Former string based implementation, kept as a reference for the speed comparison and the tests.
+# The recursive branch of vector_to_int dropped wsize, so only flat lists may be packed.
+def legacy_sign_bin_to_int(val : int,wsize = 8) :
+	mask = (2**wsize) - 1
+	if val & (1 << (wsize-1)):
+		nval = -(((val ^ mask) & mask) +1)
+	else :
+		nval = val & mask
+	return nval
+
+def legacy_int_to_sign_bin(val : int,wsize = 8) :
+	mask = (2**wsize) - 1
+	if val < 0 :
+		nval = ((abs(val) ^ mask) +1) & mask
+	else :
+		nval = val & mask
+	return nval
+
+def legacy_int_to_vector(v, vdim, signed=False):
+	if len(vdim) == 0:
+		return v
+	if isinstance(v, int):
+		nv = [c for c in f"{v:0{prod(vdim)}b}"]
+		nv.reverse()
+		return legacy_int_to_vector(nv, vdim,signed)
+	word_group_size = vdim[-1]
+	curr_word = str() if isinstance(v[0], str) else list()
+	nv = list()
+	if len(vdim) == 1:
+		return v
+	for c in v:
+		curr_word += c
+		if len(curr_word) == word_group_size:
+			if isinstance(curr_word, str):
+				new_value = int(curr_word[::-1], 2)
+				if signed :
+					new_value = legacy_sign_bin_to_int(new_value,len(curr_word))
+				nv.append(new_value)
+				curr_word = ""
+			else:
+				nv.append(copy(curr_word))
+				curr_word.clear()
+	return legacy_int_to_vector(nv, vdim[:-1],signed)
+
+def legacy_vector_to_int(v, wsize):
+	new_v = list()
+	for x in v :
+		if isinstance(x,int) and x < 0 :
+			x = legacy_int_to_sign_bin(x,wsize)
+		new_v.append(x)
+	return int("".join(reversed([(f"{x:0{wsize}b}" if isinstance(x, int) else x) for x in new_v])), 2)
+
+
+def bench(label : str, func : T.Callable, number : int) -> float:
+	t = min(timeit.repeat(func, number=number, repeat=3)) / number
+	print(f"    {label:30s} {t * 1e6:12.2f} us/op")
+	return t
+
+
+def run_benchmarks():
+	for dim in [[16, 8], [64, 12], [1024, 16], [4096, 18]] :
+		for signed in [False, True] :
+			codec = VectorCodec(dim, signed)
+			value = random.getrandbits(codec.width)
+			words = codec.unpack_flat(value)
+			number = max(1, 20000 // dim[0])
+			print(f"Vector {dim} signed={signed}")
+			t_legacy_unpack = bench("legacy int_to_vector", lambda: legacy_int_to_vector(value, dim, signed), number)
+			t_unpack = bench("codec unpack", lambda: codec.unpack(value), number)
+			t_legacy_pack = bench("legacy vector_to_int", lambda: legacy_vector_to_int(words, dim[-1]), number)
+			t_pack = bench("codec pack", lambda: codec.pack(words), number)
+			if np is not None :
+				array = codec.unpack_array(value)
+				bench("codec unpack_array", lambda: codec.unpack_array(value), number)
+				bench("codec pack_array", lambda: codec.pack_array(array), number)
+			print(f"    speedup unpack x{t_legacy_unpack / t_unpack:.1f}, pack x{t_legacy_pack / t_pack:.1f}")
+
+
+if __name__ == "__main__" :
+	run_benchmarks()
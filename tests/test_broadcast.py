@@ -0,0 +1,96 @@
+import pytest
+import cocotb
+from cocotb.queue import QueueFull
+from cocotb.triggers import Timer
+
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.utils.queue import BroadcastPort, OverflowPolicy, BroadcastOverflowError
+
+
+def test_max_occupancy_fast_reader():
+	port = BroadcastPort(16)
+	sub = port.connect("fast")
+	for i in range(100) :
+		port.put_nowait(i)
+		assert sub.get_nowait() == i
+	assert port.occupancy == 0
+	assert port.max_occupancy == 1
+
+
+def test_max_occupancy_lagging_reader():
+	port = BroadcastPort(16)
+	fast = port.connect("fast")
+	slow = port.connect("slow")
+	for i in range(100) :
+		port.put_nowait(i)
+		fast.get_nowait()
+		# Reads every other item for a while, then keeps up with a lag of 12 items
+		if i >= 24 or i % 2 == 1 :
+			slow.get_nowait()
+	assert port.max_occupancy == 13
+	assert port.occupancy == 12
+	assert slow.lag == 12
+	assert fast.lag == 0
+
+
+def test_max_occupancy_bounded_lag():
+	port = BroadcastPort(16)
+	sub = port.connect("sub")
+	for i in range(100) :
+		port.put_nowait(i)
+		# Keeps 3 items unread
+		if i >= 3 :
+			sub.get_nowait()
+	assert port.max_occupancy == 4
+	assert port.occupancy == 3
+
+
+def test_policy_raise():
+	port = BroadcastPort(4, OverflowPolicy.RAISE)
+	sub = port.connect("sub")
+	for i in range(4) :
+		port.put_nowait(i)
+	with pytest.raises(BroadcastOverflowError) :
+		port.put_nowait(4)
+	assert port.overflows == 1
+	assert sub.drain() == [0, 1, 2, 3]
+	port.put_nowait(4)
+	assert sub.get_nowait() == 4
+
+
+def test_policy_drop_oldest():
+	port = BroadcastPort(4, OverflowPolicy.DROP_OLDEST)
+	sub = port.connect("sub")
+	for i in range(10) :
+		port.put_nowait(i)
+	assert port.overflows == 6
+	assert sub.drain() == [6, 7, 8, 9]
+	assert sub.dropped == 6
+	assert port.dropped == 6
+	assert port.max_occupancy == 4
+
+
+def test_policy_block():
+	port = BroadcastPort(4, OverflowPolicy.BLOCK)
+	sub = port.connect("sub")
+	for i in range(4) :
+		port.put_nowait(i)
+	with pytest.raises(QueueFull) :
+		port.put_nowait(4)
+
+	received = list()
+
+	async def reader():
+		await Timer(10, "ns")
+		while len(received) < 8 :
+			received.append(await sub.get())
+
+	async def test():
+		cocotb.start_soon(reader())
+		for i in range(4, 8) :
+			await port.put(i)
+		await Timer(10, "ns")
+		assert received == list(range(8))
+		assert port.blocked_puts == 1
+
+	StandinSimulator().run(test(), timeout=(1, "us"))
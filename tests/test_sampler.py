@@ -0,0 +1,88 @@
+import pytest
+import cocotb
+from cocotb.triggers import Timer
+
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.structure import GlobalEnv
+
+np = pytest.importorskip("numpy")
+from vipyhdl.monitors import SamplerMonitor
+
+CHUNK = 64
+SAMPLES = 3 * CHUNK + 10
+
+
+def setup_function():
+	GlobalEnv().teardown()
+
+
+def teardown_function():
+	GlobalEnv().teardown()
+
+
+def _record(path, check_live = None) -> SamplerMonitor:
+	"""Sample a counter and its triple every 10 ns, the counter changing between two samples"""
+	sim = StandinSimulator()
+	a = sim.signal("a", 8)
+	b = sim.signal("b", 20)
+
+	async def count():
+		await Timer(5, "ns")
+		i = 0
+		while True :
+			i += 1
+			a.value = i & 0xFF
+			b.value = 3 * i
+			await Timer(10, "ns")
+
+	async def test():
+		sampler = GlobalEnv().get_top(SamplerMonitor, [a, b], period=10, unit="ns", path=path, chunk_size=CHUNK, buffers=2)
+		chunks = sampler.chunks.connect("test")
+		cocotb.start_soon(count())
+		sampler.start()
+		await Timer(SAMPLES * 10 + 1, "ns")
+		if check_live is not None :
+			check_live(sampler)
+		sampler.close()
+		assert sampler.samples == SAMPLES
+		assert chunks.qsize() == 4
+		return sampler
+
+	return sim.run(test())
+
+
+def _check(samples : "np.ndarray"):
+	assert samples.shape == (SAMPLES,)
+	assert samples.dtype.names == ("time", "a", "b")
+	assert samples["a"].dtype == np.uint8 and samples["b"].dtype == np.uint32
+	index = np.arange(1, SAMPLES + 1)
+	assert np.array_equal(samples["a"], index & 0xFF)
+	assert np.array_equal(samples["b"], 3 * index)
+	assert np.all(np.diff(samples["time"]) == samples["time"][1] - samples["time"][0])
+
+
+def test_npy(tmp_path):
+	path = str(tmp_path / "samples.npy")
+	streamed = list()
+
+	def live(sampler : SamplerMonitor):
+		# Read back while recording, the header not being final yet
+		streamed.append(np.concatenate(list(sampler.stream(50))))
+
+	_record(path, live)
+	_check(streamed[0])
+	_check(np.load(path))
+	_check(np.load(path, mmap_mode="r"))
+	chunks = list(SamplerMonitor.load(path, 50))
+	assert [len(c) for c in chunks] == [50, 50, 50, 50, 2]
+	_check(np.concatenate(chunks))
+
+
+def test_npz(tmp_path):
+	path = str(tmp_path / "samples.npz")
+	_record(path)
+	with np.load(path) as data :
+		assert sorted(data.files) == [f"chunk_{i:06d}" for i in range(4)]
+	chunks = list(SamplerMonitor.load(path))
+	assert [len(c) for c in chunks] == [CHUNK, CHUNK, CHUNK, 10]
+	_check(np.concatenate(chunks))
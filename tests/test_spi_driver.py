@@ -0,0 +1,90 @@
+import pytest
+import cocotb
+from cocotb.triggers import RisingEdge, FallingEdge, Edge, Timer
+
+from vipyhdl.bus.base import SerialMode
+from vipyhdl.bus.spi import SPIInterface, SPIDriver
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.structure import GlobalEnv
+
+
+class WireChecker:
+	def __init__(self, itf : SPIInterface, spi_mode : int):
+		"""
+		Record the MOSI bits seen on the capture edges of an SPI mode, frame by frame.
+		:param itf: SPI interface
+		:param spi_mode: SPI mode, CPOL as bit 1 and CPHA as bit 0
+		"""
+		self.itf = itf
+		cpol = spi_mode >> 1
+		cpha = spi_mode & 1
+		self.capture = RisingEdge(itf.clk) if cpol == cpha else FallingEdge(itf.clk)
+		self.frames = list()
+		self.outside = 0
+		self._frame = None
+
+	async def _csn(self):
+		while True :
+			await Edge(self.itf.csn)
+			if self.itf.csn.value == 0 :
+				self._frame = list()
+			else :
+				self.frames.append(self._frame)
+				self._frame = None
+
+	async def run(self):
+		cocotb.start_soon(self._csn())
+		while True :
+			await self.capture
+			if self._frame is None :
+				self.outside += 1
+			else :
+				self._frame.append(int(self.itf.mosi.value))
+
+	@property
+	def data(self) -> bytes:
+		bits = [bit for frame in self.frames for bit in frame]
+		return bytes(int("".join(map(str, bits[i:i + 8])), 2) for i in range(0, len(bits), 8))
+
+
+def setup_function():
+	GlobalEnv().teardown()
+
+
+def teardown_function():
+	GlobalEnv().teardown()
+
+
+@pytest.mark.parametrize("spi_mode", [0, 1, 2, 3])
+@pytest.mark.parametrize("burst", [False, True])
+@pytest.mark.parametrize("pulse", [False, True])
+def test_transfer_loopback(spi_mode, burst, pulse):
+	sim = StandinSimulator()
+	itf = SPIInterface(mosi=sim.signal("mosi"), miso=sim.signal("miso"), clk=sim.signal("clk"), csn=sim.signal("csn", value=1))
+	sim.connect(itf.mosi, itf.miso)
+	data = bytes((i * 37 + 1) & 0xFF for i in range(6))
+
+	async def test():
+		driver = GlobalEnv().get_top(SPIDriver, SerialMode.MASTER, itf, (10, "ns"))
+		driver.burst = burst
+		driver.csn_pulse_per_word = pulse
+		driver.spi_mode = spi_mode
+		await driver.reset()
+		await Timer(50, "ns")
+		assert itf.clk.value == driver.clk_idle
+
+		checker = WireChecker(itf, spi_mode)
+		cocotb.start_soon(checker.run())
+		assert await driver.transfer(b"\xa5") == b"\xa5"
+		assert await driver.transfer(data) == data
+		await driver.is_idle.wait()
+		await Timer(50, "ns")
+
+		assert checker.data == b"\xa5" + data
+		assert all(len(frame) % 8 == 0 for frame in checker.frames)
+		if pulse :
+			assert len(checker.frames) == 1 + len(data)
+		assert checker.outside == 0
+		assert itf.clk.value == driver.clk_idle
+
+	sim.run(test(), timeout=(100, "us"))
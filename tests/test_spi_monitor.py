@@ -0,0 +1,86 @@
+import pytest
+from cocotb.triggers import Timer
+
+from vipyhdl.bus.base import SerialMode
+from vipyhdl.bus.spi import SPIInterface, SPIDriver, SPIMonitor
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.structure import GlobalEnv
+
+
+def _loopback(sim : StandinSimulator) -> SPIInterface:
+	itf = SPIInterface(mosi=sim.signal("mosi"), miso=sim.signal("miso"), clk=sim.signal("clk"), csn=sim.signal("csn", value=1))
+	sim.connect(itf.mosi, itf.miso)
+	return itf
+
+
+def setup_function():
+	GlobalEnv().teardown()
+
+
+def teardown_function():
+	GlobalEnv().teardown()
+
+
+async def _send(driver : SPIDriver, monitor : SPIMonitor, spi_mode : int, data : bytes) -> bytes:
+	driver.spi_mode = spi_mode
+	monitor.spi_mode = spi_mode
+	await driver.reset()
+	rx = await driver.transfer(data)
+	await driver.is_idle.wait()
+	await Timer(50, "ns")
+	return rx
+
+
+@pytest.mark.parametrize("burst", [False, True])
+@pytest.mark.parametrize("pulse", [False, True])
+def test_frames(burst, pulse):
+	sim = StandinSimulator()
+	itf = _loopback(sim)
+	data = bytes((i * 37 + 1) & 0xFF for i in range(8))
+
+	async def test():
+		driver = GlobalEnv().get_top(SPIDriver, SerialMode.MASTER, itf, (10, "ns"))
+		driver.burst = burst
+		driver.csn_pulse_per_word = pulse
+		monitor = SPIMonitor(SerialMode.SLAVE, itf, per_word=True)
+		frames = monitor.frames.connect("test")
+		monitor.start()
+
+		assert await _send(driver, monitor, 0, data) == data
+		received = frames.drain()
+		assert len(received) == (len(data) if pulse else 1)
+		assert b"".join(frame.data for frame in received) == data
+		assert sum(frame.bits for frame in received) == 8 * len(data)
+		for frame in received :
+			assert frame.start < frame.end
+		for previous, frame in zip(received, received[1:]) :
+			assert previous.end <= frame.start
+
+		words = monitor.to_handle.drain()
+		assert [word.value for word in words] == list(data)
+		assert all(len(word) == 8 and word.msbf for word in words)
+
+	sim.run(test(), timeout=(100, "us"))
+
+
+def test_mode_change():
+	sim = StandinSimulator()
+	itf = _loopback(sim)
+
+	async def test():
+		driver = GlobalEnv().get_top(SPIDriver, SerialMode.MASTER, itf, (10, "ns"))
+		monitor = SPIMonitor(SerialMode.SLAVE, itf)
+		frames = monitor.frames.connect("test")
+		monitor.start()
+		# Each change of the capture edge re-arms the capture task
+		for spi_mode in [0, 1, 3, 2, 0] :
+			data = bytes((i * 37 + spi_mode) & 0xFF for i in range(4))
+			await _send(driver, monitor, spi_mode, data)
+			received = frames.drain()
+			assert b"".join(frame.data for frame in received) == data, f"SPI mode {spi_mode}"
+			assert sum(frame.bits for frame in received) == 8 * len(data)
+
+		# Words are only published when per_word is set
+		assert monitor.to_handle.empty()
+
+	sim.run(test(), timeout=(100, "us"))
@@ -0,0 +1,125 @@
+import pytest
+import cocotb
+from cocotb.triggers import RisingEdge, FallingEdge, First
+
+from vipyhdl.bus.base import SerialMode
+from vipyhdl.bus.spi import SPIInterface, SPIDriver, SPIRegisterAgent, SPIRegisterFormat
+from vipyhdl.regbank.structure import RegisterBank, Register
+from vipyhdl.regbank.structure.field import Field
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.structure import GlobalEnv
+
+
+class SlaveModel:
+	def __init__(self, itf : SPIInterface, frame_format : SPIRegisterFormat, registers : dict):
+		"""
+		SPI mode 0 register slave : decodes the frames sent on MOSI and answers reads on MISO.
+		:param itf: SPI interface
+		:param frame_format: Frame layout, with the read/write flag as MSB of the header
+		:param registers: Register values, by address
+		"""
+		self.itf = itf
+		self.format = frame_format
+		self.registers = registers
+
+		"""Addresses of the registers read back with their LSB flipped"""
+		self.corrupted = set()
+
+	async def _answer(self, value : int):
+		bits = self.format.read_dummy + self.format.data_width
+		for shift in range(bits - 1, -1, -1) :
+			await FallingEdge(self.itf.clk)
+			self.itf.miso.value = (value >> shift) & 1
+
+	async def run(self):
+		fmt = self.format
+		while True :
+			await FallingEdge(self.itf.csn)
+			frame = 0
+			bits = 0
+			while True :
+				await First(RisingEdge(self.itf.clk), RisingEdge(self.itf.csn))
+				if self.itf.csn.value == 1 :
+					break
+				frame = (frame << 1) | int(self.itf.mosi.value)
+				bits += 1
+				if bits == fmt.header_width and frame >> (fmt.header_width - 1) == fmt.read_flag :
+					address = frame & ((1 << fmt.addr_width) - 1)
+					value = self.registers[address] ^ (1 if address in self.corrupted else 0)
+					cocotb.start_soon(self._answer(value))
+			if bits == fmt.frame_width(False) and frame >> (bits - 1) != fmt.read_flag :
+				self.registers[(frame >> fmt.data_width) & ((1 << fmt.addr_width) - 1)] = fmt.decode(frame)
+
+
+def _regbank() -> RegisterBank:
+	rb = RegisterBank("tst", 7, 8)
+	for i, access in enumerate(["RW", "RW", "RO"]) :
+		reg = Register(f"reg{i}", i, 8)
+		reg.add_field(Field(f"field{i}", "[7:0]", access))
+		rb.add_register(reg)
+	return rb
+
+
+def _interface(sim : StandinSimulator) -> SPIInterface:
+	return SPIInterface(mosi=sim.signal("mosi"), miso=sim.signal("miso"), clk=sim.signal("clk"), csn=sim.signal("csn", value=1))
+
+
+def setup_function():
+	GlobalEnv().teardown()
+
+
+def teardown_function():
+	GlobalEnv().teardown()
+
+
+@pytest.mark.parametrize("burst", [False, True])
+@pytest.mark.parametrize("read_dummy", [0, 2])
+def test_register_accesses(burst, read_dummy):
+	sim = StandinSimulator()
+	itf = _interface(sim)
+	fmt = SPIRegisterFormat(7, 8, read_dummy=read_dummy)
+	slave = SlaveModel(itf, fmt, {0 : 0, 1 : 0, 2 : 0x5A})
+
+	async def test():
+		driver = SPIDriver(SerialMode.MASTER, itf, clk_period=(10, "ns"))
+		driver.burst = burst
+		driver.csn_pulse_per_word = True
+		agent = GlobalEnv().get_top(SPIRegisterAgent, _regbank(), driver, fmt)
+		await driver.reset()
+		cocotb.start_soon(slave.run())
+
+		await agent.write("reg0", 0xA5)
+		await agent.write_many([("reg1", 0x3C), (0, 0x11)])
+		assert slave.registers == {0 : 0x11, 1 : 0x3C, 2 : 0x5A}
+		assert await agent.read_many(["reg0", "reg1", "reg2"]) == [0x11, 0x3C, 0x5A]
+
+		# Read-only fields are not checked
+		slave.corrupted.add(2)
+		assert await agent.read("reg2") == 0x5B
+		assert agent.mismatches == 0
+
+		slave.corrupted.add(1)
+		with pytest.raises(AssertionError) :
+			await agent.read(1)
+		assert (agent.reads, agent.writes, agent.mismatches) == (5, 3, 1)
+
+	sim.run(test(), timeout=(1, "ms"))
+
+
+def test_driver_configuration():
+	sim = StandinSimulator()
+	itf = _interface(sim)
+
+	async def test():
+		driver = SPIDriver(SerialMode.MASTER, itf, clk_period=(10, "ns"))
+		driver.csn_pulse_per_word = False
+		with pytest.raises(ValueError) :
+			SPIRegisterAgent(_regbank(), driver)
+
+		driver.csn_pulse_per_word = True
+		agent = GlobalEnv().get_top(SPIRegisterAgent, _regbank(), driver)
+		driver.is_active = False
+		with pytest.raises(RuntimeError) :
+			await agent.read("reg0")
+
+	sim.run(test())
@@ -0,0 +1,47 @@
+import os
+import sys
+
+import pytest
+
+from vipyhdl.utils.workarounds import int_to_vector, vector_to_int
+from vipyhdl.utils.workarounds.vector_codec import VectorCodec, np
+
+# Former string based implementation, from the benchmark
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks"))
+from vector_codec import legacy_int_to_vector, legacy_vector_to_int
+
+SHAPES = [[1], [5], [1, 1], [4, 1], [2, 3], [3, 4], [2, 8], [2, 2, 3], [3, 2, 2], [2, 2, 2, 2], [1, 12], [12, 1]]
+
+
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("dim", SHAPES, ids=lambda dim : "x".join(str(d) for d in dim))
+def test_round_trips(dim, signed):
+	"""Exhaustive round trips on all the values of small vectors"""
+	codec = VectorCodec(dim, signed)
+	for value in range(1 << codec.width) :
+		words = codec.unpack(value)
+		assert codec.pack(words) == value
+		assert codec.pack_flat(codec.unpack_flat(value)) == value
+
+
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("dim", [d for d in SHAPES if len(d) == 2], ids=lambda dim : "x".join(str(d) for d in dim))
+def test_legacy_equivalence(dim, signed):
+	codec = VectorCodec(dim, signed)
+	for value in range(1 << codec.width) :
+		words = codec.unpack(value)
+		assert words == legacy_int_to_vector(value, dim, signed)
+		assert legacy_vector_to_int(words, dim[-1]) == value
+		assert int_to_vector(value, dim, signed) == words
+		assert vector_to_int(words, dim[-1]) == value
+
+
+@pytest.mark.skipif(np is None, reason="NumPy is not installed")
+@pytest.mark.parametrize("signed", [False, True])
+@pytest.mark.parametrize("dim", SHAPES, ids=lambda dim : "x".join(str(d) for d in dim))
+def test_numpy_round_trips(dim, signed):
+	codec = VectorCodec(dim, signed)
+	for value in range(1 << codec.width) :
+		array = codec.unpack_array(value)
+		assert list(array.reshape(-1)) == codec.flatten(codec.unpack(value))
+		assert codec.pack_array(array) == value
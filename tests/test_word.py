@@ -0,0 +1,114 @@
+import pytest
+
+from vipyhdl.bus.base import DataWord
+from vipyhdl.bus.base.word import DataWordOverflowError
+
+
+def test_msb_first_iteration():
+	word = DataWord(0xA5, 8, msbf=True)
+	assert len(word) == 8
+	assert word.value == 0xA5
+	assert word.content == [1, 0, 1, 0, 0, 1, 0, 1]
+	assert next(word) == 1
+	assert next(word) == 0
+	assert len(word) == 6
+	assert word.value == 0x25
+	assert list(word) == [1, 0, 0, 1, 0, 1]
+	assert len(word) == 0 and word.value == 0
+	with pytest.raises(StopIteration) :
+		next(word)
+
+
+def test_lsb_first_iteration():
+	word = DataWord(0xA5, 8, msbf=False)
+	assert word.value == 0xA5
+	assert word.content == [1, 0, 1, 0, 0, 1, 0, 1][::-1]
+	assert next(word) == 1
+	assert next(word) == 0
+	assert len(word) == 6
+	assert word.value == 0xA5 >> 2
+	assert list(word) == [1, 0, 0, 1, 0, 1]
+
+
+@pytest.mark.parametrize("msbf", [True, False])
+def test_append(msbf):
+	word = DataWord(0, 4, msbf=msbf)
+	word.clear()
+	assert len(word) == 0
+	for bit in [1, 1, 0, 1] :
+		word.append(bit)
+	assert len(word) == 4
+	# Appended bits come last in transmission order
+	assert word.content == [1, 1, 0, 1]
+	assert word.value == (0b1101 if msbf else 0b1011)
+	assert list(word) == [1, 1, 0, 1]
+
+
+@pytest.mark.parametrize("msbf", [True, False])
+def test_append_after_read(msbf):
+	word = DataWord(0b1100, 4, msbf=msbf)
+	next(word)
+	word.append(1)
+	assert len(word) == 4
+	assert list(word) == (DataWord(0b1100, 4, msbf).content[1:] + [1])
+
+
+@pytest.mark.parametrize("msbf", [True, False])
+def test_limit(msbf):
+	word = DataWord(0x1F3, 8, msbf=msbf, limit=True)
+	assert word.value == 0xF3
+	assert len(word) == 8
+	assert word.is_full
+	with pytest.raises(DataWordOverflowError) :
+		word.append(1)
+
+	word.clear()
+	assert not word.is_full
+	for _ in range(8) :
+		word.append(1)
+	assert word.is_full and word.value == 0xFF
+
+
+def test_no_limit():
+	word = DataWord(0x1F3, 8)
+	assert not word.is_full
+	assert len(word) == 9
+	assert word.value == 0x1F3
+	word.append(0)
+	assert word.value == 0x3E6
+
+
+def test_msbf_change_keeps_value():
+	word = DataWord(0b0011, 4, msbf=True)
+	word.msbf = False
+	assert word.value == 0b0011
+	assert list(word) == [1, 1, 0, 0]
+
+
+def test_rewind():
+	word = DataWord(0x5A, 8)
+	assert list(word) == [0, 1, 0, 1, 1, 0, 1, 0]
+	word.rewind()
+	assert len(word) == 8 and word.value == 0x5A
+	assert list(word) == [0, 1, 0, 1, 1, 0, 1, 0]
+
+
+def test_int_conversions():
+	word = DataWord(42, 8)
+	assert int(word) == 42
+	assert [0, 1, 2][DataWord(2, 2)] == 2
+
+
+def test_bytes():
+	words = DataWord.from_bytes(b"\x12\x34\x56\x78", 16)
+	assert [w.value for w in words] == [0x1234, 0x5678]
+	assert all(w.wsize == 16 for w in words)
+	assert [w.value for w in DataWord.from_bytes(b"\x34\x12", 16, byteorder="little")] == [0x1234]
+	assert [w.value for w in DataWord.from_bytes(b"\x01\xff", 8)] == [0x01, 0xFF]
+	assert DataWord(0x1234, 16).to_bytes() == b"\x12\x34"
+	assert DataWord(0x1234, 16).to_bytes("little") == b"\x34\x12"
+	assert DataWord(0x5, 12).to_bytes() == b"\x00\x05"
+	with pytest.raises(ValueError) :
+		DataWord.from_bytes(b"\x01\x02\x03", 16)
+	with pytest.raises(ValueError) :
+		DataWord.from_bytes(b"\x01", 12)
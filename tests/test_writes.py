@@ -0,0 +1,50 @@
+from cocotb.triggers import Timer
+
+from vipyhdl.drivers import SignalDriver
+from vipyhdl.standin import StandinSimulator
+from vipyhdl.structure import GlobalEnv
+
+
+def setup_function():
+	GlobalEnv().teardown()
+	GlobalEnv().writes.enabled = True
+
+
+def teardown_function():
+	# Drops the pending writes first, so that disabling does not flush them
+	GlobalEnv().teardown()
+	GlobalEnv().writes.enabled = False
+
+
+def test_write_after_rearm():
+	sim = StandinSimulator()
+	sig = sim.signal("sig", 8)
+
+	async def test():
+		driver = GlobalEnv().get_top(SignalDriver, sig)
+		await driver.set(1)
+		# Kills the flush task before it runs
+		await GlobalEnv().rearm()
+		await driver.set(42)
+		await Timer(1, "ns")
+		assert sig.value == 42
+
+	sim.run(test())
+
+
+def test_write_after_end_of_test():
+	sim = StandinSimulator()
+	sig = sim.signal("sig", 8)
+
+	async def first():
+		driver = GlobalEnv().get_top(SignalDriver, sig)
+		await driver.set(1)
+
+	async def second():
+		await GlobalEnv().top.set(42)
+		await Timer(1, "ns")
+		assert sig.value == 42
+
+	# The flush task is killed along with the first test
+	sim.run(first())
+	sim.run(second())
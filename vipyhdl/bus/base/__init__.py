@@ -1,4 +1,17 @@
-from .serial import BaseSerial
-from .serial import SerialMode
-from .word import DataWord
-from .word import DataWordOverflowError
\ No newline at end of file
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .serial import BaseSerial
+	from .serial import SerialMode
+	from .word import DataWord
+	from .word import DataWordOverflowError
+
+__all__ = ["BaseSerial", "SerialMode", "DataWord", "DataWordOverflowError"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"BaseSerial" : ".serial",
+	"SerialMode" : ".serial",
+	"DataWord" : ".word",
+	"DataWordOverflowError" : ".word",
+})
@@ -7,15 +7,76 @@ class DataWordOverflowError(RuntimeError):
 class DataWord:
 	word_size = 8
 	msbfirst= True
+
+	__slots__ = ("_msbf", "wsize", "limit", "_value", "_count", "_cursor")
+
 	def __init__(self, value : int, wsize = None, msbf = None,limit=False):
+		"""
+		Serial data word, built by appending bits and consumed bit by bit in transmission order.
+		The bits are held as an integer, along with the number of bits and a read cursor, so appending, reading
+		the next bit or getting the value never walk through the bits.
+
+		Iterating over the word consumes it : the length and the value are the ones of the bits not read yet.
+
+		The value is the one of the word whatever the transmission order : LSB-first words send the LSB of the value
+		first, appended bits always come last in transmission order, and changing msbf keeps the value.
+		:param value: Initial value, over wsize bits (or more if the value does not fit and the word is not limited)
+		:param wsize: Word size in bits, default to DataWord.word_size
+		:param msbf: Transmission order, MSB first if True, default to DataWord.msbfirst
+		:param limit: Restrict the word to wsize bits
+		"""
 		self._msbf = msbf if msbf is not None else DataWord.msbfirst
 		self.wsize = wsize if wsize is not None else DataWord.word_size
-		self.content : T.List[int] = list()
 		self.limit = limit
+
+		"""Bits of the word, including the ones already read"""
+		self._value = 0
+		self._count = 0
+
+		"""Number of bits already read"""
+		self._cursor = 0
 		self._from_int(value)
 
+	@classmethod
+	def from_bytes(cls, data : T.Union[bytes, bytearray, T.Iterable[int]], wsize = None, msbf = None, byteorder : str = "big") -> T.List["DataWord"]:
+		"""
+		Split a buffer in words.
+		:param data: Bytes to split, of a multiple of the word size
+		:param wsize: Word size in bits, a multiple of 8, default to DataWord.word_size
+		:param msbf: Transmission order of the words
+		:param byteorder: Order of the bytes in the multi-bytes words
+		:return: The list of words
+		"""
+		data = bytes(data)
+		wsize = wsize if wsize is not None else cls.word_size
+		if wsize % 8 != 0 or len(data) % (wsize // 8) != 0 :
+			raise ValueError(f"Unable to split {len(data)} bytes in words of {wsize} bits")
+		if wsize == 8 :
+			return [cls(b, wsize, msbf) for b in data]
+		step = wsize // 8
+		return [cls(int.from_bytes(data[i:i + step], byteorder), wsize, msbf) for i in range(0, len(data), step)]
+
+	def to_bytes(self, byteorder : str = "big") -> bytes:
+		"""
+		:param byteorder: Order of the bytes for words larger than 8 bits
+		:return: The value of the word, on as many bytes as required by the word size
+		"""
+		return self.value.to_bytes((max(self.wsize, len(self)) + 7) // 8, byteorder)
+
 	def clear(self):
-		self.content.clear()
+		self._value = 0
+		self._count = 0
+		self._cursor = 0
+
+	def rewind(self):
+		"""Make the bits already read available again"""
+		self._cursor = 0
+
+	def _compact(self):
+		"""Drop the bits already read"""
+		self._value = self.value
+		self._count -= self._cursor
+		self._cursor = 0
 
 	@property
 	def msbf(self):
@@ -24,49 +85,74 @@ class DataWord:
 	@msbf.setter
 	def msbf(self,val):
 		if val != self._msbf :
+			# The value is kept, the remaining bits are sent in the other order
+			self._compact()
 			self._msbf = val
-			self.content.reverse()
 
 	@property
-	def value(self):
-		return int("".join([str(x) for x in self.content]),2)
+	def value(self) -> int:
+		""":return: The value of the bits not read yet"""
+		if self._cursor == 0 :
+			return self._value
+		if self._msbf :
+			return self._value & ((1 << (self._count - self._cursor)) - 1)
+		return self._value >> self._cursor
+
+	@property
+	def content(self) -> T.List[int]:
+		""":return: The bits not read yet, in transmission order"""
+		remaining = self._count - self._cursor
+		bits = [int(x) for x in f"{self.value:0{remaining}b}"] if remaining > 0 else list()
+		if not self._msbf :
+			bits.reverse()
+		return bits
 
 	@property
 	def is_full(self):
-		return self.limit and len(self.content) >= self.wsize
+		return self.limit and len(self) >= self.wsize
 
 	def _from_int(self,val):
-		self.content.clear()
-		self.content = [int(x) for x in f"{val:0{self.wsize}b}"]
-		if not self.msbf :
-			self.content.reverse()
-		if self.limit and len(self.content) > self.wsize :
-			self.content = self.content[:self.wsize]
+		val = int(val)
+		if self.limit :
+			val &= (1 << self.wsize) - 1
+		self._value = val
+		self._count = max(self.wsize, val.bit_length())
+		self._cursor = 0
 
 	def append(self,val : int):
+		"""
+		Append a bit, in transmission order : as LSB of the value if MSB first, as MSB otherwise.
+		"""
 		if self.is_full :
 			raise DataWordOverflowError
 
-		val = 1 if val else 0
-		if self.msbf :
-			self.content.append(val)
-		else:
-			self.content.insert(0,val)
+		if self._msbf :
+			self._value = (self._value << 1) | (1 if val else 0)
+		elif val :
+			self._value |= 1 << self._count
+		self._count += 1
 
 	def __iter__(self):
 		return self
 
 	def __next__(self):
-		if len(self.content) > 0 :
-			return self.content.pop(0)
-		else :
+		if self._cursor >= self._count :
 			raise StopIteration
+		if self._msbf :
+			bit = (self._value >> (self._count - self._cursor - 1)) & 1
+		else :
+			bit = (self._value >> self._cursor) & 1
+		self._cursor += 1
+		return bit
 
 	def __len__(self):
-		return len(self.content)
+		return self._count - self._cursor
 
 	def __str__(self):
 		return f"{self.wsize:2d} : 0x{self.value:0{len(self)//4}X} - {''.join([str(x) for x in self.content])}"
 
+	def __int__(self):
+		return self.value
+
 	def __index__(self):
-		return self.value
\ No newline at end of file
+		return self.value
@@ -1,4 +1,21 @@
-from .spi_base import SPIBase
-from .spi_base import SPIInterface
-from .spi_driver import SPIDriver
-from .spi_monitor import SPIMonitor
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .spi_base import SPIBase
+	from .spi_base import SPIInterface
+	from .spi_driver import SPIDriver
+	from .spi_monitor import SPIMonitor, SPIFrame
+	from .spi_regbank import SPIRegisterAgent, SPIRegisterFormat
+
+__all__ = ["SPIBase", "SPIInterface", "SPIDriver", "SPIMonitor", "SPIFrame", "SPIRegisterAgent", "SPIRegisterFormat"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"SPIBase" : ".spi_base",
+	"SPIInterface" : ".spi_base",
+	"SPIDriver" : ".spi_driver",
+	"SPIMonitor" : ".spi_monitor",
+	"SPIFrame" : ".spi_monitor",
+	"SPIRegisterAgent" : ".spi_regbank",
+	"SPIRegisterFormat" : ".spi_regbank",
+})
@@ -1,14 +1,15 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import typing as T
 import cocotb
 
 from  cocotb.handle import ModifiableObject
-from cocotb.triggers import Event, RisingEdge, FallingEdge, Edge, First, NextTimeStep
+from cocotb.triggers import Event, RisingEdge, FallingEdge, NextTimeStep
 
 from vipyhdl.bus.base import DataWord
 from vipyhdl.bus.base.serial import BaseSerial, SerialMode
+from vipyhdl.structure.globalenv import GlobalEnv
+from vipyhdl.utils.event import PulseEvent
 
-import enum
 
 
 @dataclass
@@ -22,10 +23,10 @@ class SPIBase(BaseSerial):
 
 	@dataclass
 	class SPIEvents:
-		config_changed: Event = Event("spi_config_changed")
-		selected: Event = Event("is_selected")
-		deselected: Event = Event("is_deselected")
-		word_done : Event = Event("word_done")
+		config_changed: PulseEvent = field(default_factory=lambda: PulseEvent("spi_config_changed"))
+		selected: Event = field(default_factory=lambda: Event("is_selected"))
+		deselected: Event = field(default_factory=lambda: Event("is_deselected"))
+		word_done : PulseEvent = field(default_factory=lambda: PulseEvent("word_done"))
 
 	def __init__(self, mode : SerialMode):
 		super().__init__()
@@ -35,19 +36,27 @@ class SPIBase(BaseSerial):
 		self.evt : SPIBase.SPIEvents = SPIBase.SPIEvents()
 		self.itf : SPIInterface = SPIInterface()
 
-		self._monitored_events = [
-			self.evt.config_changed.wait(),
-			self.evt.word_done.wait()
-		]
-
 		self.word_size : int = DataWord.word_size
-
-		cocotb.start_soon(self._clear_toogled_events())
+		self._csn_evt_handling = False
+		self._background_tasks : T.List[cocotb.Task] = list()
+
+		self.arm()
+
+	def arm(self):
+		"""
+		(Re)start the background tasks of the SPI object.
+		Any running instance of those tasks is killed beforehand.
+		"""
+		for task in self._background_tasks :
+			task.kill()
+		self._background_tasks = list()
+		if self._csn_evt_handling :
+			self._background_tasks.append(GlobalEnv().tasks.start_soon(self,self._csn_evt_handler()))
 
 	def start_csn_evt_handling(self):
-		cocotb.start_soon(self._csn_evt_handler())
+		self._csn_evt_handling = True
+		self._background_tasks.append(GlobalEnv().tasks.start_soon(self,self._csn_evt_handler()))
 
-	@cocotb.coroutine
 	async def _csn_evt_handler(self) :
 		if not self.is_selected:
 			self.evt.deselected.set()
@@ -88,12 +97,6 @@ class SPIBase(BaseSerial):
 		output += 2 if self._pol else 0
 		return output
 
-	@cocotb.coroutine
-	async def _clear_toogled_events(self):
-		while True :
-			evt : Event = await First(*self._monitored_events)
-			evt.parent.clear()
-
 	@spi_mode.setter
 	def spi_mode(self,val : int):
 		val = val & 0b11
@@ -103,7 +106,6 @@ class SPIBase(BaseSerial):
 		self._pol = (val & 0b10) != 0
 
 		self.evt.config_changed.set(self.spi_mode)
-		self.evt.config_changed.clear()
 
 	@property
 	def capture_edge(self) -> T.Union[RisingEdge, FallingEdge]:
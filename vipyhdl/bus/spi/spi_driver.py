@@ -1,21 +1,48 @@
+import time
 import typing as T
 
-import cocotb
 from cocotb import Task
-from cocotb.clock import Clock
 
-from cocotb.utils import get_time_from_sim_steps
-from cocotb.triggers import *
+from cocotb.utils import get_time_from_sim_steps, get_sim_steps, get_sim_time
+from cocotb.triggers import Event, Timer, NextTimeStep
 
-from vipyhdl.bus.base.serial import BaseSerial, SerialMode
+from vipyhdl.bus.base.serial import SerialMode
 from .spi_base import SPIBase, SPIInterface
-import enum
 
 from ..base.word import DataWord
 from ...utils.queue import QueueEvt
 
-from vipyhdl.structure import *
-from vipyhdl.drivers import *
+from vipyhdl.structure import GenericDriver, drive_method
+from vipyhdl.drivers import ClockDriver
+
+try :
+	import numpy as np
+except ImportError :
+	np = None
+
+
+class _Transfer:
+	__slots__ = ("words", "wsize", "index", "miso", "done")
+
+	def __init__(self, words : T.Sequence[int], wsize : int):
+		"""
+		Bulk transfer queued on a SPIDriver, see SPIDriver.transfer
+		:param words: Values of the words to send
+		:param wsize: Word size in bits
+		"""
+		self.words = words
+		self.wsize = wsize
+
+		"""Index of the next word to send, so an interrupted transfer resumes where it stopped"""
+		self.index = 0
+
+		"""Captured words, packed MSB first"""
+		self.miso = bytearray()
+		self.done = Event("transfer_done")
+
+	def __len__(self):
+		return len(self.words)
+
 
 class SPIDriver(SPIBase, GenericDriver):
 	def __init__(self, mode : SerialMode, itf : SPIInterface, clk_period : T.Tuple[int,str] = (1,"us")):
@@ -26,8 +53,38 @@ class SPIDriver(SPIBase, GenericDriver):
 		self.clk_period = clk_period
 		self.csn_pulse_per_word = True
 		self.csn_pulse_duration = clk_period
+
+		"""
+		Burst mode : the words are shifted back to back by a single task which also toggles the SPI clock, the clock
+		is never stopped and restarted between words. Framing is then expressed in clock cycles (see word_gap and
+		csn_idle_cycles). Taken into account on reset.
+		"""
+		self.burst = False
+
+		"""Burst mode : number of idle clock cycles between two words of a frame"""
+		self.word_gap = 0
+
+		"""Burst mode : number of clock cycles the chip select stays deasserted between two frames"""
+		self.csn_idle_cycles = 1
+
+		"""Number of words and bits shifted"""
+		self.words_sent = 0
+		self.bits_sent = 0
+
+		"""Simulation time (in steps) and wall time (in seconds) spent shifting words, idle periods excluded"""
+		self.busy_sim_time = 0
+		self.busy_wall_time = 0.0
+		self._busy_since : T.Optional[T.Tuple[int, float]] = None
+
+		"""Burst mode timers, built when the sending loop starts"""
+		self._t_first : T.Optional[Timer] = None
+		self._t_second : T.Optional[Timer] = None
+		self._t_gap : T.Optional[Timer] = None
+		self._t_csn_idle : T.Optional[Timer] = None
+
 		self._current_data = DataWord(0)
-		self._current_data.content.clear()
+		self._current_data.clear()
+		self._current_transfer : T.Optional[_Transfer] = None
 
 		self.clock = ClockDriver(self.itf.clk,idle=self.clk_idle)
 
@@ -44,61 +101,317 @@ class SPIDriver(SPIBase, GenericDriver):
 	async def drive_csn(self, state : bool, pulse_period : T.Tuple[int,str] = None):
 		expected_state = 1 if state else 0
 		if self.itf.csn.value.integer != expected_state :
-			self.itf.csn.value = expected_state
+			self.write_signal(self.itf.csn, expected_state)
 			if pulse_period is not None :
 				await Timer(*pulse_period)
-				self.itf.csn.value = 1-expected_state
+				self.write_signal(self.itf.csn, 1-expected_state)
 			await NextTimeStep()
 		else :
 			await NextTimeStep()
 
+	def teardown(self):
+		GenericDriver.teardown(self)
+		self._drive_process = None
+		self._current_data.clear()
+		self._current_transfer = None
+		self._busy_since = None
+		self.is_idle.set()
+
 	@drive_method
 	async def reset(self):
+		self.clock.idle_state = self.clk_idle
 		await self.reset_drivers()
 		if self._drive_process is not None :
 			self._drive_process.kill()
-		self._drive_process = cocotb.start_soon(self.enable_sending())
+		self._drive_process = self.start_task(self._burst_sending() if self.burst else self.enable_sending())
 		await self.drive_csn(True)
 
-	@cocotb.coroutine
 	async def enable_sending(self):
 		need_clk_resume = False
 		first_frame_bit = False
 		while True:
-			if len(self._current_data) == 0 :
+			if len(self._current_data) == 0 and self._current_transfer is None :
 				if self.to_send.empty():
-					await self.clock.stop(gracefully=True)
-					await Timer(self.clock.period)
-					await self.drive_csn(True)
-					need_clk_resume = True
+					if not need_clk_resume :
+						await self.clock.stop(gracefully=True)
+						await Timer(self.clock.period)
+						await self.drive_csn(True)
+						need_clk_resume = True
+					self._set_busy(False)
 					self.is_idle.set()
-				self._current_data = await self.to_send.get()
+				item = await self.to_send.get()
 				self.is_idle.clear()
+				self._set_busy(True)
+				if isinstance(item, _Transfer) :
+					self._current_transfer = item
+				else :
+					self._current_data = item
+
+			if self._current_transfer is not None :
+				need_clk_resume = await self._send_transfer(self._current_transfer, need_clk_resume)
+				self._current_transfer = None
+				first_frame_bit = False
+				continue
 
-				if need_clk_resume :
-					await self.drive_csn(False)
-					await self.clock.start(self.clk_period)
-					need_clk_resume = False
-					first_frame_bit = True
+			if need_clk_resume :
+				await self._begin_frame()
+				need_clk_resume = False
+				first_frame_bit = True
 
 			for bit in self._current_data :
 				if self._pha == 1 or not first_frame_bit :
 					await self.drive_edge
 				else :
 					first_frame_bit = False
-				self.tx_pin.value = bit
+				self.write_signal(self.tx_pin, bit)
+				self.bits_sent += 1
 
 			await self.capture_edge
+			need_clk_resume = await self._end_word()
 
-			if self.csn_pulse_per_word :
-				await self.clock.stop(gracefully=True)
-				await self.drive_csn(True)
-				await Timer(*self.csn_pulse_duration)
-				await self.drive_csn(False)
-				await self.clock.start(*self.clk_period)
+	async def _begin_frame(self):
+		"""Select the device and start the clock, the first bit being driven right away"""
+		await self.drive_csn(False)
+		await self.clock.start(self.clk_period)
 
-			self.evt.word_done.set()
-			await NextTimeStep()
+	async def _end_word(self) -> bool:
+		"""
+		End a word, and the frame if csn_pulse_per_word is set. The clock is then stopped, and only restarted along
+		with the next frame so that no edge occurs before its first bit is driven.
+		:return: True if the frame is ended
+		"""
+		self.words_sent += 1
+		if self.csn_pulse_per_word :
+			await self.clock.stop(gracefully=True)
+			await self.drive_csn(True)
+			await Timer(*self.csn_pulse_duration)
+
+		self.evt.word_done.set()
+		await NextTimeStep()
+		return self.csn_pulse_per_word
+
+	async def _send_transfer(self, transfer : _Transfer, new_frame : bool) -> bool:
+		"""
+		Send the words of a bulk transfer, capturing the receive pin on each capture edge.
+		The bits are taken from the word values, MSB first, without building a DataWord per word.
+		:param new_frame: The first word starts a new frame
+		:return: True if the frame is ended
+		"""
+		tx = self.tx_pin
+		rx = self.rx_pin
+		drive_edge = self.drive_edge
+		capture_edge = self.capture_edge
+		shifts = range(transfer.wsize - 1, -1, -1)
+		nbytes = (transfer.wsize + 7) // 8
+		miso = transfer.miso
+		words = transfer.words
+		while transfer.index < len(words) :
+			first_frame_bit = new_frame
+			if new_frame :
+				await self._begin_frame()
+			word = words[transfer.index]
+			captured = 0
+			for shift in shifts :
+				if self._pha == 1 or not first_frame_bit :
+					await drive_edge
+				else :
+					first_frame_bit = False
+				self.write_signal(tx, (word >> shift) & 1)
+				await capture_edge
+				captured = (captured << 1) | (rx is not None and rx.value.binstr == "1")
+			miso += captured.to_bytes(nbytes, "big")
+			transfer.index += 1
+			self.bits_sent += transfer.wsize
+			new_frame = await self._end_word()
+		transfer.done.set()
+		return new_frame
+
+	def _set_busy(self, busy : bool):
+		"""Account the time spent shifting words"""
+		if busy and self._busy_since is None :
+			self._busy_since = (get_sim_time("step"), time.perf_counter())
+		elif not busy and self._busy_since is not None :
+			self.busy_sim_time += get_sim_time("step") - self._busy_since[0]
+			self.busy_wall_time += time.perf_counter() - self._busy_since[1]
+			self._busy_since = None
+
+	@property
+	def stats(self) -> T.Dict[str, T.Any]:
+		"""
+		:return: The number of words and bits sent, and the sustained throughput while busy, in bits per simulated
+		second and per wall clock second
+		"""
+		sim_time = self.busy_sim_time
+		wall_time = self.busy_wall_time
+		if self._busy_since is not None :
+			sim_time += get_sim_time("step") - self._busy_since[0]
+			wall_time += time.perf_counter() - self._busy_since[1]
+		sim_seconds = get_time_from_sim_steps(sim_time, "sec") if sim_time > 0 else 0
+		return {
+			"words" : self.words_sent,
+			"bits" : self.bits_sent,
+			"busy_sim_time" : sim_seconds,
+			"busy_wall_time" : wall_time,
+			"bits_per_sim_second" : self.bits_sent / sim_seconds if sim_seconds > 0 else 0.0,
+			"bits_per_wall_second" : self.bits_sent / wall_time if wall_time > 0 else 0.0
+		}
+
+	async def _shift(self, word : int, wsize : int, msbf : bool, capture : bool) -> int:
+		"""
+		Burst mode : shift a word out, toggling the SPI clock from here.
+		The bits are taken from the word value as they are sent.
+		:param word: Value of the word
+		:param wsize: Number of bits to send
+		:param msbf: Send the MSB first
+		:param capture: Sample the receive pin on each capture edge
+		:return: The captured bits, first one as MSB
+		"""
+		tx = self.tx_pin
+		rx = self.rx_pin if capture else None
+		clk = self.itf.clk
+		idle = self.clk_idle
+		active = 1 - idle
+		t_first = self._t_first
+		t_second = self._t_second
+		captured = 0
+		for shift in (range(wsize - 1, -1, -1) if msbf else range(wsize)) :
+			bit = (word >> shift) & 1
+			if self._pha == 0 :
+				# Data set on the trailing edge (or on frame start), captured on the leading edge
+				self.write_signal(tx, bit)
+				await t_first
+				if rx is not None :
+					captured = (captured << 1) | (rx.value.binstr == "1")
+				self.write_signal(clk, active)
+				await t_second
+				self.write_signal(clk, idle)
+			else :
+				# Data set on the leading edge, captured on the trailing edge
+				self.write_signal(clk, active)
+				self.write_signal(tx, bit)
+				await t_first
+				if rx is not None :
+					captured = (captured << 1) | (rx.value.binstr == "1")
+				self.write_signal(clk, idle)
+				await t_second
+		self.bits_sent += wsize
+		return captured
+
+	async def _burst_sending(self):
+		"""
+		Burst mode sending loop, see burst.
+		The chip select stays asserted as long as words are queued, unless csn_pulse_per_word is set.
+		"""
+		await self.clock.stop(gracefully=False)
+		period = get_sim_steps(*self.clk_period)
+		self._t_first = Timer(period // 2, "step")
+		self._t_second = Timer(period - period // 2, "step")
+		self._t_gap = Timer(self.word_gap * period, "step") if self.word_gap > 0 else None
+		self._t_csn_idle = Timer(max(1, self.csn_idle_cycles) * period, "step")
+		self.write_signal(self.itf.clk, self.clk_idle)
+
+		# A transfer interrupted by a reset is resumed
+		item = self._current_transfer
+		framing = False
+		while True :
+			if item is None :
+				if self.to_send.empty() :
+					if framing :
+						# Hold time, then end of frame
+						await self._t_first
+						self.write_signal(self.itf.csn, 1)
+						framing = False
+					self._set_busy(False)
+					self.is_idle.set()
+				item = await self.to_send.get()
+				self.is_idle.clear()
+				self._set_busy(True)
+
+			if isinstance(item, _Transfer) :
+				self._current_transfer = item
+				nbytes = (item.wsize + 7) // 8
+				while item.index < len(item.words) :
+					framing = await self._begin_burst_word(framing)
+					captured = await self._shift(item.words[item.index], item.wsize, True, True)
+					item.miso += captured.to_bytes(nbytes, "big")
+					item.index += 1
+					framing = await self._end_burst_word()
+				self._current_transfer = None
+				item.done.set()
+			else :
+				framing = await self._begin_burst_word(framing)
+				await self._shift(item.value, len(item), item.msbf, False)
+				framing = await self._end_burst_word()
+			item = None
+
+	async def _begin_burst_word(self, framing : bool) -> bool:
+		"""
+		Burst mode : start a frame (chip select asserted half a period before the first edge) or wait for the gap
+		between two words of the frame.
+		:param framing: A frame is in progress
+		:return: True, a frame being in progress
+		"""
+		if not framing :
+			self.write_signal(self.itf.csn, 0)
+			await self._t_first
+		elif self._t_gap is not None :
+			await self._t_gap
+		return True
+
+	async def _end_burst_word(self) -> bool:
+		"""
+		Burst mode : end a word, and the frame if csn_pulse_per_word is set
+		:return: True if the frame goes on
+		"""
+		self.words_sent += 1
+		self.evt.word_done.set()
+		if self.csn_pulse_per_word :
+			await self._t_first
+			self.write_signal(self.itf.csn, 1)
+			await self._t_csn_idle
+			return False
+		return True
+
+	@staticmethod
+	def _buffer_words(buffer, wsize : int) -> T.Sequence[int]:
+		"""
+		:return: The values of the words of a transfer buffer
+		"""
+		if np is not None and isinstance(buffer, np.ndarray) :
+			return (buffer.ravel().astype(np.uint64) & ((1 << wsize) - 1)).tolist()
+		if isinstance(buffer, (bytes, bytearray, memoryview)) :
+			data = memoryview(buffer).cast("B")
+			if wsize == 8 :
+				# Copied, so that changing the buffer after the call does not change what is sent
+				return bytes(data)
+			if wsize % 8 != 0 or len(data) % (wsize // 8) != 0 :
+				raise ValueError(f"Unable to split {len(data)} bytes in words of {wsize} bits")
+			step = wsize // 8
+			return [int.from_bytes(data[i:i + step], "big") for i in range(0, len(data), step)]
+		mask = (1 << wsize) - 1
+		return [int(w) & mask for w in buffer]
+
+	async def transfer(self, buffer : T.Union[bytes, bytearray, memoryview, "np.ndarray", T.Sequence[int]], word_size : T.Optional[int] = None) -> bytes:
+		"""
+		Send a whole buffer and wait for the end of the transfer, queued after the words already in to_send.
+		The words are framed as the ones of to_send (chip select handling, word_done events).
+
+		Bytes-like buffers are split in words of word_size bits, big endian. NumPy arrays and sequences hold one
+		word per element.
+		:param buffer: Data to send
+		:param word_size: Size of the words of this transfer, default to the word_size of the driver
+		:return: The words captured on the receive pin during the transfer, each on word_size / 8 bytes (rounded up),
+		big endian. Empty if the driver is inactive.
+		"""
+		if not self.is_active :
+			return bytes()
+		word_size = word_size if word_size is not None else self.word_size
+		transfer = _Transfer(self._buffer_words(buffer, word_size), word_size)
+		if len(transfer) == 0 :
+			return bytes()
+		self.to_send.put_nowait(transfer)
+		await transfer.done.wait()
+		return bytes(transfer.miso)
 
 
 
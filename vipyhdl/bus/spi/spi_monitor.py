@@ -1,56 +1,134 @@
 import typing as T
+from dataclasses import dataclass
 
-import cocotb
 from cocotb import Task
-from cocotb.triggers import *
+from cocotb.triggers import RisingEdge, FallingEdge
+from cocotb.utils import get_sim_time
 
-from vipyhdl.bus.base.serial import BaseSerial, SerialMode
+from vipyhdl.bus.base.serial import SerialMode
 from .spi_base import SPIBase, SPIInterface
-import enum
 
 from ..base.word import DataWord
-from ...utils.queue import QueueEvt
+from ...utils.queue import QueueEvt, DataPort
+from vipyhdl.structure.globalenv import GlobalEnv
+
+
+@dataclass
+class SPIFrame:
+	"""Data exchanged while the chip select was asserted"""
+	"""Complete words of the frame, each on word_size / 8 bytes (rounded up), big endian"""
+	data : bytes
+	"""Simulation time of the chip select assertion and deassertion, in steps"""
+	start : int
+	end : int
+	"""Number of bits captured, trailing bits of an incomplete word are not in data"""
+	bits : int
 
 
 class SPIMonitor(SPIBase):
-	def __init__(self, mode: SerialMode, itf: SPIInterface):
+	def __init__(self, mode: SerialMode, itf: SPIInterface, per_word : bool = False):
+		"""
+		Capture the data received on the SPI bus, frame by frame.
+		Whole frames, from the chip select assertion to its deassertion, are published on the frames data port.
+		The bits are shifted in an integer, MSB first, on cached edge triggers which are only rebuilt when the SPI
+		configuration changes.
+		:param mode: SerialMode.SLAVE to capture MOSI, SerialMode.MASTER to capture MISO
+		:param itf: SPI interface
+		:param per_word: Also put each complete word in to_handle, as a DataWord. Otherwise to_handle stays empty.
+		"""
 		super().__init__(mode)
 		self.itf = itf
+		self.per_word = per_word
+
+		"""Complete words, as MSB first DataWord. Stays empty unless per_word is set, frames is the main output."""
 		self.to_handle : QueueEvt[DataWord] = QueueEvt()
-		self.current_word = DataWord(0,wsize=self.word_size,msbf=True,limit=True)
-		self.current_word.clear()
 
+		"""Complete frames, as SPIFrame"""
+		self.frames = DataPort()
+
+		"""Shift register of the word being received, and its number of bits"""
+		self._shift = 0
+		self._shift_bits = 0
+
+		"""Frame being received, None when not selected"""
+		self._frame : T.Optional[bytearray] = None
+		self._frame_bits = 0
+		self._frame_start = 0
+
+		self._capture_trigger : T.Optional[T.Union[RisingEdge, FallingEdge]] = None
+		self._capture_process : T.Optional[Task] = None
 		self._processes  : T.List[Task] = list()
 
-	@cocotb.coroutine
-	async def _monitor_task(self):
+	def _start_capture(self):
+		"""(Re)start the capture task on the capture edge of the current configuration"""
+		if self._capture_process is not None :
+			self._capture_process.kill()
+		self._capture_trigger = self.capture_edge
+		self._capture_process = GlobalEnv().tasks.start_soon(self,self._monitor_task())
 
-		if self.is_selected :
-			await RisingEdge(self.itf.csn)
-		if self._pha == 1 :
-			await self.capture_edge
+	async def _config_task(self):
+		while True :
+			await self.evt.config_changed.wait()
+			# The capture task may be waiting on the former capture edge
+			self._start_capture()
+
+	async def _monitor_task(self):
+		rx = self.rx_pin
 		while True :
-			await Combine(self.evt.selected.wait(), self.capture_edge)
+			await self._capture_trigger
+			if self._frame is None :
+				continue
 
-			self.current_word.append(self.rx_pin.value.integer)
-			if self.current_word.is_full :
-				self.to_handle.put_nowait(DataWord(self.current_word.value,wsize=self.word_size,msbf=True))
-				self.current_word.clear()
+			self._shift = (self._shift << 1) | (rx.value.binstr == "1")
+			self._shift_bits += 1
+			self._frame_bits += 1
+			wsize = self.word_size
+			if self._shift_bits >= wsize :
+				word = self._shift
+				self._shift = 0
+				self._shift_bits = 0
+				# The word size may change at any time, without any configuration event
+				self._frame += word.to_bytes((wsize + 7) // 8, "big")
+				if self.per_word :
+					self.to_handle.put_nowait(DataWord(word,wsize=wsize,msbf=True))
 
-	@cocotb.coroutine
-	async def _auto_clear_word(self):
+	async def _frame_task(self):
+		select = FallingEdge(self.itf.csn)
+		deselect = RisingEdge(self.itf.csn)
 		while True :
-			await self.evt.deselected.wait()
-			self.current_word.clear()
-			await self.evt.selected.wait()
+			if self._frame is None :
+				await select
+				self._begin_frame()
+			else :
+				await deselect
+				self._end_frame()
+
+	def _begin_frame(self):
+		self._shift = 0
+		self._shift_bits = 0
+		self._frame = bytearray()
+		self._frame_bits = 0
+		self._frame_start = get_sim_time("step")
+
+	def _end_frame(self):
+		self.frames.put(SPIFrame(bytes(self._frame), self._frame_start, get_sim_time("step"), self._frame_bits))
+		self._frame = None
 
 	def start(self):
 		#cocotb.log.info(f"Starting SPI Monitor in mode {self.spi_mode}")
 		self.stop()
-		self._processes.append(cocotb.start_soon(self._monitor_task()))
-		self._processes.append(cocotb.start_soon(self._auto_clear_word()))
+		if self.is_selected :
+			# Frame in progress, its start time is unknown
+			self._begin_frame()
+		self._processes.append(GlobalEnv().tasks.start_soon(self,self._frame_task()))
+		self._processes.append(GlobalEnv().tasks.start_soon(self,self._config_task()))
+		self._start_capture()
 
 	def stop(self):
 		for task in self._processes :
 			task.kill()
 		self._processes.clear()
+		if self._capture_process is not None :
+			self._capture_process.kill()
+			self._capture_process = None
+		self._frame = None
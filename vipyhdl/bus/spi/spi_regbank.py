@@ -0,0 +1,170 @@
+import typing as T
+from dataclasses import dataclass
+
+from vipyhdl.regbank.structure import RegisterBank, Register
+from vipyhdl.structure import Component
+from .spi_driver import SPIDriver
+
+
+@dataclass
+class SPIRegisterFormat:
+	"""
+	Layout of a register access frame, sent MSB first in a single chip select frame :
+	a header made of the command bits, the read/write flag and the address, then the dummy bits of reads and the data.
+	"""
+	addr_width : int = 7
+	data_width : int = 8
+	"""Extra command bits, sent before the address, and their value"""
+	cmd_width : int = 0
+	cmd : int = 0
+	"""Position of the read/write flag in the header, from its LSB. None for the MSB of the header."""
+	rw_position : T.Optional[int] = None
+	"""Value of the read/write flag for reads, the opposite value being used for writes"""
+	read_flag : int = 1
+	"""Turnaround bits between the header and the data of reads"""
+	read_dummy : int = 0
+
+	@property
+	def header_width(self) -> int:
+		return self.cmd_width + 1 + self.addr_width
+
+	def frame_width(self, read : bool) -> int:
+		""":return: The number of bits of a frame"""
+		return self.header_width + (self.read_dummy if read else 0) + self.data_width
+
+	def encode(self, read : bool, address : int, data : int = 0) -> int:
+		"""
+		:param read: Read access
+		:param address: Register address
+		:param data: Data to write
+		:return: The frame, as an integer of frame_width(read) bits
+		"""
+		header = (self.cmd << self.addr_width) | (address & ((1 << self.addr_width) - 1))
+		position = self.rw_position if self.rw_position is not None else self.header_width - 1
+		flag = self.read_flag if read else 1 - self.read_flag
+		header = ((header >> position) << (position + 1)) | (flag << position) | (header & ((1 << position) - 1))
+		dummy = self.read_dummy if read else 0
+		return (header << (dummy + self.data_width)) | (data & ((1 << self.data_width) - 1))
+
+	def decode(self, frame : int) -> int:
+		""":return: The data of a frame, as received"""
+		return frame & ((1 << self.data_width) - 1)
+
+
+class SPIRegisterAgent(Component):
+	def __init__(self, regbank : RegisterBank, driver : SPIDriver, frame_format : T.Optional[SPIRegisterFormat] = None,
+				 strict : bool = True):
+		"""
+		Access a register bank over SPI, checking the read data against the RegisterBank model.
+
+		Each access is a single chip select frame, sent as one word of the frame width : the driver must pulse the
+		chip select between words (csn_pulse_per_word), which the agent checks but does not set. The frames are sent
+		as bulk transfers, the data read back being captured by the driver itself, so batches keep the driver queue
+		full and run back to back in burst mode.
+
+		The model is updated when an access is queued, so concurrent accesses are checked in the order they reach
+		the bus. Only the bits of readable fields which the design may not change (RW fields) are checked.
+
+		:param regbank: Register bank model
+		:param driver: SPI master driver, with csn_pulse_per_word set
+		:param frame_format: Frame layout, default to the address and data widths of the register bank
+		:param strict: Raise an AssertionError on read mismatches, else only log and count them
+		:raises ValueError: if the driver does not pulse the chip select between words
+		"""
+		super().__init__()
+		self.regbank = regbank
+		self.driver = driver
+		self.format = frame_format if frame_format is not None else SPIRegisterFormat(regbank.address_width, regbank.data_width)
+		self.strict = strict
+		if not self.driver.csn_pulse_per_word :
+			raise ValueError("SPIRegisterAgent requires a driver with csn_pulse_per_word set, one frame being sent per access")
+
+		"""Number of accesses done, and of read values which did not match the model"""
+		self.reads = 0
+		self.writes = 0
+		self.mismatches = 0
+
+		"""Mask of the bits checked on read, per register"""
+		self._check_masks : T.Dict[str, int] = dict()
+
+	def _register(self, reg : T.Union[Register, str, int]) -> Register:
+		found = self.regbank.get_register(reg)
+		if found is None :
+			raise KeyError(f"Register {reg!r} not found in the {self.regbank.prefix} register bank")
+		return found
+
+	def _check_driver(self):
+		if not self.driver.is_active :
+			raise RuntimeError(f"Unable to access the {self.regbank.prefix} register bank : SPI driver {self.driver.name} is inactive")
+		if not self.driver.csn_pulse_per_word :
+			raise RuntimeError(f"SPI driver {self.driver.name} does not pulse the chip select between words anymore")
+
+	def _check_mask(self, reg : Register) -> int:
+		try :
+			return self._check_masks[reg.name]
+		except KeyError :
+			pass
+		mask = sum(f.size.placed_mask for f in reg if f.access.is_readable_by_itf and not f.access.is_writable_by_design)
+		self._check_masks[reg.name] = mask
+		return mask
+
+	def _decode(self, miso : bytes) -> T.List[int]:
+		step = (self.format.frame_width(True) + 7) // 8
+		return [self.format.decode(int.from_bytes(miso[i:i + step], "big")) for i in range(0, len(miso), step)]
+
+	def _check(self, reg : Register, value : int, expected : int) -> bool:
+		mask = self._check_mask(reg)
+		if (value ^ expected) & mask == 0 :
+			return True
+		self.mismatches += 1
+		self._log.error(f"Read 0x{value:X} from {reg.name} @ 0x{reg.offset:X}, expected 0x{expected & mask:X} on mask 0x{mask:X}")
+		return False
+
+	async def write_many(self, accesses : T.Iterable[T.Tuple[T.Union[Register, str, int], int]]):
+		"""
+		Write several registers in a single bulk transfer.
+		:param accesses: (register, value) pairs, registers given as Register, name or offset
+		:raises RuntimeError: if the driver is inactive
+		"""
+		self._check_driver()
+		frames = list()
+		for reg, value in accesses :
+			reg = self._register(reg)
+			self.regbank.write(reg, value)
+			frames.append(self.format.encode(False, reg.offset, value))
+		self.writes += len(frames)
+		await self.driver.transfer(frames, self.format.frame_width(False))
+
+	async def read_many(self, registers : T.Iterable[T.Union[Register, str, int]]) -> T.List[int]:
+		"""
+		Read several registers in a single bulk transfer and check the values against the model.
+		:param registers: Registers to read, as Register, name or offset
+		:return: The values read, in order
+		:raises AssertionError: if a value does not match the model, in strict mode
+		:raises RuntimeError: if the driver is inactive
+		"""
+		self._check_driver()
+		regs = [self._register(r) for r in registers]
+		expected = [self.regbank.read(r) for r in regs]
+		values = self._decode(await self.driver.transfer([self.format.encode(True, r.offset) for r in regs], self.format.frame_width(True)))
+		self.reads += len(regs)
+		failed = [r.name for r, value, exp in zip(regs, values, expected) if not self._check(r, value, exp)]
+		if self.strict and len(failed) > 0 :
+			raise AssertionError(f"Read mismatch on {', '.join(failed)}")
+		return values
+
+	async def write(self, reg : T.Union[Register, str, int], value : int):
+		"""
+		Write a register and update the model.
+		:param reg: Register, register name or offset
+		:param value: Value to write
+		"""
+		await self.write_many([(reg, value)])
+
+	async def read(self, reg : T.Union[Register, str, int]) -> int:
+		"""
+		Read a register and check its value against the model.
+		:param reg: Register, register name or offset
+		:return: The value read
+		"""
+		return (await self.read_many([reg]))[0]
@@ -1,5 +1,26 @@
-from .clock import ClockDriver
-from .reset import ResetDriver
-from .simple_signal import SignalDriver
-from .vector_signal import VectorDriver
-from .aggregated_signal import AggregatedSignalDriver
\ No newline at end of file
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .clock import ClockDriver, ClockMode, HDL_CLOCK_GENERATOR
+	from .reset import ResetDriver
+	from .simple_signal import SignalDriver
+	from .clock_domain import ClockDomainDriver, DomainClock
+	from .vector_signal import VectorDriver
+	from .playback import PlaybackDriver
+	from .aggregated_signal import AggregatedSignalDriver
+
+__all__ = ["ClockDriver", "ClockMode", "HDL_CLOCK_GENERATOR", "ClockDomainDriver", "DomainClock", "ResetDriver", "SignalDriver", "VectorDriver", "AggregatedSignalDriver", "PlaybackDriver"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"ClockDriver" : ".clock",
+	"ClockMode" : ".clock",
+	"HDL_CLOCK_GENERATOR" : ".clock",
+	"ClockDomainDriver" : ".clock_domain",
+	"DomainClock" : ".clock_domain",
+	"ResetDriver" : ".reset",
+	"SignalDriver" : ".simple_signal",
+	"VectorDriver" : ".vector_signal",
+	"AggregatedSignalDriver" : ".aggregated_signal",
+	"PlaybackDriver" : ".playback",
+})
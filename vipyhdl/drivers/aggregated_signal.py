@@ -1,10 +1,10 @@
 import typing as T
 from cocotb.handle import ModifiableObject
-from cocotb.triggers import *
+from cocotb.triggers import Timer
+from cocotb.utils import get_sim_time
 from .simple_signal import SignalDriver
 from vipyhdl.structure import drive_method
-
-from vipyhdl.regbank.structure import Register, Field
+from vipyhdl.structure.handles import handle_info
 
 
 class AggregatedSignalDriver(SignalDriver):
@@ -19,55 +19,64 @@ class AggregatedSignalDriver(SignalDriver):
 		super().__init__(None)
 		self.itf = None
 
-		"""List of nets used, the order will be retained by the _value_interface"""
+		"""Nets used, by name"""
 		self._nets = {n._name : n for n in nets}
 
+		"""Packing layout, LSB first : (net, shift, mask) for each net. The widths are only read here."""
+		self._layout : T.List[T.Tuple[ModifiableObject, int, int]] = list()
+		offset = 0
+		for signal in nets :
+			width = handle_info(signal).width
+			self._layout.append((signal, offset, (1 << width) - 1))
+			offset += width
+		self._width = offset
+		self._mask = (1 << offset) - 1
 
-		"""As the expected behavior is similar to a Register, we just use this as a base"""
-		self._value_interface = Register("",0,sum([f.value.n_bits for f in nets]),reset_value)
+		self.reset_value = reset_value & self._mask
 
-		# The value interface shall be built while we have the list of fields as an (ordered) list
-		foffset = 0
-		for signal in nets :
-			name = signal._name
-			f = Field(name,f"{foffset}:{foffset-1+signal.value.n_bits}")
-			self._value_interface.add_field(f)
-			foffset = f.size.next
+		"""Value of each net as last written or read, None if unknown. Only the nets whose value changes are written."""
+		self._net_values : T.List[T.Optional[int]] = [None] * len(self._layout)
 
-		"""Raw "int" value, used to avoir some recomputation when syncing cache"""
-		self._cached_raw_value = reset_value
+		"""Aggregated value, valid for the simulation time _last_updated"""
+		self._cached_value = self.reset_value
+		self._last_updated = -1
 
 		"""All provided signals will be driven"""
 		for signal in self._nets.values() :
 			self.register_signal_as_driven(signal)
 
 	async def reset(self):
-		self._value_interface.reset()
-		await self._push_cached_values()
+		await self.set(self.reset_value)
 
 	def __len__(self) -> int:
 		""":return: The number of bits of the aggregated signal"""
-		return sum([n.value.n_bits for n in self._nets.values()])
+		return self._width
 
 	@drive_method
 	async def _push_cached_values(self):
 		"""
-		Push each cached value to its actual net
+		Push the cached value to the nets whose slice changed
 		"""
-		self._log.debug(f"Require pushing value {self._value_interface.value} to design")
-		if self._value_interface.value != self._cached_raw_value:
-			self._cached_raw_value = self._value_interface.value
-			for field in self._value_interface:
-				self._log.debug(f"Setting field {field.name} to value {field.value}")
-				self._nets[field.name].value = field.value
-
-	def _pull_cached_values(self):
+		value = self._cached_value
+		for i, (net, shift, mask) in enumerate(self._layout) :
+			net_value = (value >> shift) & mask
+			if net_value != self._net_values[i] :
+				self._net_values[i] = net_value
+				self.write_signal(net, net_value)
+
+	def _update_cache(self):
 		"""
-		Read the design and update the cache from it.
+		Read the design and update the cache from it, once per simulation time step.
 		"""
-		for field in self._value_interface:
-			field.value = self._nets[field.name].value.integer
-		self._cached_raw_value = self._value_interface.value
+		new_time = get_sim_time()
+		if new_time != self._last_updated :
+			value = 0
+			for i, (net, shift, mask) in enumerate(self._layout) :
+				net_value = net.value.integer
+				self._net_values[i] = net_value
+				value |= net_value << shift
+			self._cached_value = value
+			self._last_updated = new_time
 
 	async def set(self,value):
 		"""
@@ -75,16 +84,18 @@ class AggregatedSignalDriver(SignalDriver):
 		:param value: Value to set the aggregated signal to
 		"""
 		self._log.debug(f"Set to value {value}")
-		self._value_interface.value = value
+		# The design only sees the new value in the ReadWrite phase, the cache holds it for the current time step.
+		self._cached_value = int(value) & self._mask
+		self._last_updated = get_sim_time()
 		await self._push_cached_values()
 
 	@property
 	def value(self) -> int:
 		"""
-		:return: Pull and return the integer value of the aggregated signal
+		:return: The integer value of the aggregated signal
 		"""
-		self._pull_cached_values()
-		return self._value_interface.value
+		self._update_cache()
+		return self._cached_value
 
 	async def pulse(self,value, time = 1, unit = "step"):
 		prev_val = self.value
@@ -98,6 +109,3 @@ class AggregatedSignalDriver(SignalDriver):
 		await self.set(value)
 		await evt
 		await self.set(prev_val)
-
-
-
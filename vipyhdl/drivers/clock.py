@@ -1,18 +1,51 @@
+import enum
+import os
 from dataclasses import dataclass
-from cocotb.handle import ModifiableObject
-from cocotb.triggers import *
-from cocotb.clock import *
-from cocotb import *
-from vipyhdl.structure import GenericDriver, GlobalEnv, drive_method
+from cocotb import simulator
+from cocotb.handle import ModifiableObject, HierarchyObject
+from cocotb.triggers import Timer, FallingEdge, RisingEdge
+from cocotb.clock import Clock
+from cocotb.utils import get_sim_steps, get_time_from_sim_steps
+from cocotb import Task
+from vipyhdl.structure import GenericDriver, drive_method
 
 import typing as T
 
+"""Source of the HDL clock generator used in ClockMode.HDL, to be added to the simulated sources"""
+HDL_CLOCK_GENERATOR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "hdl", "vipy_clock_gen.sv")
+
+
+class ClockMode(enum.Enum):
+	"""cocotb Clock coroutine, Python is resumed on every clock edge"""
+	PYTHON = enum.auto()
+	"""Native clock of the simulator interface (cocotb 2.0+), the clock toggles without Python involvement"""
+	SIMULATOR = enum.auto()
+	"""Bundled HDL clock generator (see HDL_CLOCK_GENERATOR), the clock toggles without Python involvement"""
+	HDL = enum.auto()
+	"""HDL if a generator is provided, else PYTHON. SIMULATOR is only used when requested explicitly."""
+	AUTO = enum.auto()
+
+
+def simulator_clock_available() -> bool:
+	""":return: True if the simulator interface provides native clocks"""
+	return hasattr(simulator, "clock_create")
+
+
 class ClockDriver(GenericDriver):
 	@dataclass
 	class Interface:
 		clock: ModifiableObject
 
-	def __init__(self, clock_net: ModifiableObject, idle = 0, period : T.Tuple[int,str] = (1,"ns")):
+	def __init__(self, clock_net: ModifiableObject, idle = 0, period : T.Tuple[int,str] = (1,"ns"),
+				 mode : ClockMode = ClockMode.AUTO, generator : T.Optional[HierarchyObject] = None):
+		"""
+		Drive a clock with a 50% duty cycle.
+		:param clock_net: Clock signal
+		:param idle: Idle state of the clock
+		:param period: Period of the clock
+		:param mode: Clock generation mode
+		:param generator: Instance of the HDL clock generator driving clock_net, required in ClockMode.HDL
+		"""
 		super().__init__()
 
 		self.itf = ClockDriver.Interface(clock_net)
@@ -21,33 +54,101 @@ class ClockDriver(GenericDriver):
 		self.register_itf_as_driven()
 		self.period = get_sim_steps(*period)
 
+		if mode == ClockMode.AUTO :
+			if generator is not None :
+				mode = ClockMode.HDL
+			else :
+				mode = ClockMode.PYTHON
+		if mode == ClockMode.SIMULATOR and not simulator_clock_available() :
+			raise ValueError(f"The simulator interface of cocotb {simulator!r} does not provide native clocks")
+		if mode == ClockMode.HDL and generator is None :
+			raise ValueError(f"ClockMode.HDL requires the instance of the HDL clock generator")
+		self.mode = mode
+		self.generator = generator
+
+		"""Native simulator clock object, in ClockMode.SIMULATOR"""
+		self._gpi_clock = None
+
+		"""Generator enable state, in ClockMode.HDL. Kept on the Python side as the writes are only applied in ReadWrite."""
+		self._hdl_enabled = False
+
+	@property
+	def running(self) -> bool:
+		if self.mode == ClockMode.PYTHON :
+			return self._clk_process is not None
+		elif self.mode == ClockMode.SIMULATOR :
+			return self._gpi_clock is not None
+		else :
+			return self._hdl_enabled
+
+	def _halt(self):
+		"""Stop the clock generation immediately, leaving the clock value untouched"""
+		if self.mode == ClockMode.PYTHON :
+			if self._clk_process is not None :
+				self._clk_process.kill()
+				self._clk_process = None
+		elif self.mode == ClockMode.SIMULATOR :
+			if self._gpi_clock is not None :
+				self._gpi_clock.stop()
+				self._gpi_clock = None
+		elif self._hdl_enabled :
+			# The generator goes back to its idle value when disabled
+			self.generator.idle.value = self.idle_state
+			self.generator.enable.value = 0
+			self._hdl_enabled = False
+
 	@drive_method
 	async def stop(self, gracefully=True):
-		if self._clk_process is None :
+		if not self.running :
 			return
 
 		self._log.llow(f"Stopping clock")
 		if gracefully :
-			await FallingEdge(self.itf.clock) if self.idle_state == 0 else RisingEdge(self.itf.clock)
+			# Already in the idle half period (e.g. right after the trailing edge) : no other cycle is started
+			if self.itf.clock.value.binstr != str(self.idle_state) :
+				await FallingEdge(self.itf.clock) if self.idle_state == 0 else RisingEdge(self.itf.clock)
+			# Stopped right on the edge, so that no other edge occurs while completing the idle half period.
+			# In ClockMode.HDL, the generator holds its idle value and restarts on the next enable.
+			self._halt()
 			await Timer(self.period // 2)
-		self._clk_process.kill()
-		self.itf.clock.value = 0
+		self._halt()
+		# In ClockMode.HDL, the generator drives its idle value by itself
+		if self.mode != ClockMode.HDL :
+			self.itf.clock.value = self.idle_state
 
 	@drive_method
 	async def start(self, period : T.Tuple[int,str] = None):
 		self._log.llow(f"Starting clock")
+		restart = self.running
 		await self.stop(gracefully=False)
 		if period is not None :
 			self.period = get_sim_steps(*period)
-		self._clk_process = await cocotb.start(Clock(self.itf.clock,self.period).start())
+
+		if self.mode == ClockMode.PYTHON :
+			# The first half period is the opposite of the idle state, so that the clock leaves idle on the first edge
+			self._clk_process = await self.start_task_now(Clock(self.itf.clock,self.period).start(start_high=self.idle_state == 0),"clock")
+		elif self.mode == ClockMode.SIMULATOR :
+			self._gpi_clock = simulator.clock_create(self.itf.clock._handle)
+			self._gpi_clock.start(self.period, self.period // 2, self.idle_state == 0)
+		else :
+			if restart :
+				# Only the last write of a time step is applied : give the generator a step to see the disable,
+				# so that it restarts with the new phase durations.
+				await Timer(1, "step")
+			high = self.period // 2
+			self.generator.high_ns.value = get_time_from_sim_steps(high, "ns")
+			self.generator.low_ns.value = get_time_from_sim_steps(self.period - high, "ns")
+			self.generator.idle.value = self.idle_state
+			self.generator.enable.value = 1
+			self._hdl_enabled = True
 		self._log.llow(f"Clock started")
 
 	@drive_method
 	async def reset(self):
 		self._log.llow(f"Reset command")
 		await self.stop(gracefully=False)
-		self.itf.clock.value = 0
+		if self.mode == ClockMode.HDL :
+			self.generator.idle.value = self.idle_state
+		else :
+			self.itf.clock.value = self.idle_state
 		self._log.llow(f"Reset done")
-
-	
-
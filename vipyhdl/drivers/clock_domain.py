@@ -0,0 +1,190 @@
+import heapq
+import random
+from dataclasses import dataclass, field
+from cocotb.handle import ModifiableObject
+from cocotb.triggers import Timer
+from cocotb.utils import get_sim_steps, get_sim_time
+from cocotb import Task
+from vipyhdl.structure import GenericDriver, drive_method
+
+import typing as T
+
+
+@dataclass
+class DomainClock:
+	"""A clock of a ClockDomainDriver. All durations are in simulation steps."""
+	name : str
+	net : ModifiableObject
+	period : int
+	"""Duration of the high phase"""
+	high : int
+	"""Delay of the first rising edge after the start of the domain"""
+	phase : int = 0
+	"""Maximum deviation of each edge from its ideal time"""
+	jitter : int = 0
+	"""A gated clock keeps its schedule but is held low. Sampled on the rising edges, so no glitch is generated."""
+	gated : bool = False
+
+	"""Ideal time of the next rising edge"""
+	_next_rise : int = field(default=0, repr=False)
+	"""Actual time of the last scheduled edge, edges are kept ordered even with jitter"""
+	_last_edge : int = field(default=0, repr=False)
+	"""True while a high pulse is being generated"""
+	_high : bool = field(default=False, repr=False)
+
+	@property
+	def low(self) -> int:
+		return self.period - self.high
+
+
+class ClockDomainDriver(GenericDriver):
+	@dataclass
+	class Interface:
+		clocks : T.Dict[str, ModifiableObject]
+
+	def __init__(self, seed : T.Optional[int] = None):
+		"""
+		Drive several clocks from a single coroutine.
+		The edges of all the clocks are merged in one schedule and the coroutine only awaits the next edge time, so
+		related clocks keep their phase relationship and the number of timers is the number of distinct edge times.
+		:param seed: Seed of the jitter generator
+		"""
+		super().__init__()
+		self.itf = ClockDomainDriver.Interface(dict())
+		self.clocks : T.Dict[str, DomainClock] = dict()
+		self._rng = random.Random(seed)
+		self._process : T.Optional[Task] = None
+		self._stopping = False
+
+		"""Number of times the coroutine was resumed, i.e. the number of distinct edge times"""
+		self.wakeups = 0
+
+	def add_clock(self, name : str, net : ModifiableObject, period : T.Tuple[int,str], phase : T.Tuple[int,str] = (0,"ns"),
+				  duty : float = 0.5, jitter : T.Optional[T.Tuple[int,str]] = None) -> DomainClock:
+		"""
+		Add a clock to the domain. Clocks should be added before the build.
+		:param name: Name of the clock in the domain
+		:param net: Clock signal
+		:param period: Period of the clock
+		:param phase: Delay of the first rising edge after the start of the domain
+		:param duty: Duty cycle, the ratio of the period spent high
+		:param jitter: Maximum deviation of each edge from its ideal time, uniformly distributed
+		:return: The clock
+		"""
+		if name in self.clocks :
+			raise KeyError(f"Clock {name} is already part of the domain")
+		period_steps = get_sim_steps(*period)
+		high = round(period_steps * duty)
+		if not 0 < high < period_steps :
+			raise ValueError(f"Duty cycle {duty} of clock {name} leaves an empty phase with a period of {period_steps} steps")
+		jitter_steps = get_sim_steps(*jitter) if jitter is not None else 0
+		if 2 * jitter_steps >= min(high, period_steps - high) :
+			raise ValueError(f"Jitter of clock {name} is too large for its high or low phase")
+
+		clk = DomainClock(name, net, period_steps, high, get_sim_steps(*phase), jitter_steps)
+		self.clocks[name] = clk
+		self.itf.clocks[name] = net
+		self.register_signal_as_driven(net)
+		return clk
+
+	def __getitem__(self, name : str) -> DomainClock:
+		return self.clocks[name]
+
+	@property
+	def running(self) -> bool:
+		return self._process is not None and not self._process.done()
+
+	def gate(self, name : str, gated : bool = True):
+		"""
+		Gate a clock, without affecting the others.
+		The clock is held low from its next rising edge and resumes on the first rising edge after being ungated.
+		:param name: Name of the clock
+		:param gated: Gating state
+		"""
+		self.clocks[name].gated = gated
+
+	def ungate(self, name : str):
+		self.gate(name, False)
+
+	def _edge_time(self, clk : DomainClock, ideal : int) -> int:
+		"""
+		:return: The actual time of an edge, with jitter, always after the previous edge of the clock
+		"""
+		if clk.jitter == 0 :
+			ret = ideal
+		else :
+			ret = ideal + self._rng.randint(-clk.jitter, clk.jitter)
+		ret = max(ret, clk._last_edge + 1)
+		clk._last_edge = ret
+		return ret
+
+	async def _generate(self):
+		now = get_sim_time("step")
+		schedule : T.List[T.Tuple[int, int, bool]] = list()
+		clocks = list(self.clocks.values())
+		for i, clk in enumerate(clocks) :
+			clk._high = False
+			clk._last_edge = now - 1
+			clk._next_rise = now + clk.phase
+			clk.net.value = 0
+			heapq.heappush(schedule, (self._edge_time(clk, clk._next_rise), i, True))
+
+		while len(schedule) > 0 :
+			t = schedule[0][0]
+			if t > now :
+				await Timer(t - now, "step")
+				self.wakeups += 1
+				now = t
+			while len(schedule) > 0 and schedule[0][0] == now :
+				_, i, rising = heapq.heappop(schedule)
+				clk = clocks[i]
+				if rising :
+					if clk.gated or self._stopping :
+						clk._high = False
+					else :
+						clk._high = True
+						clk.net.value = 1
+					heapq.heappush(schedule, (self._edge_time(clk, clk._next_rise + clk.high), i, False))
+					clk._next_rise += clk.period
+				else :
+					if clk._high :
+						clk._high = False
+						clk.net.value = 0
+					if not self._stopping :
+						heapq.heappush(schedule, (self._edge_time(clk, clk._next_rise), i, True))
+
+	@drive_method
+	async def start(self):
+		"""Start all the clocks, with their phase relative to the current time"""
+		self._log.llow(f"Starting {len(self.clocks)} clocks")
+		await self.stop(gracefully=False)
+		self._stopping = False
+		self._process = await self.start_task_now(self._generate(), "clocks")
+
+	@drive_method
+	async def stop(self, gracefully=True):
+		"""
+		Stop all the clocks
+		:param gracefully: Let the clocks end their current high pulse, else force them low right away
+		"""
+		if not self.running :
+			return
+		self._log.llow(f"Stopping clocks")
+		if gracefully :
+			self._stopping = True
+			await self._process
+		else :
+			self._process.kill()
+			for clk in self.clocks.values() :
+				clk._high = False
+				clk.net.value = 0
+		self._process = None
+
+	@drive_method
+	async def reset(self):
+		self._log.llow(f"Reset command")
+		await self.stop(gracefully=False)
+		for clk in self.clocks.values() :
+			clk.gated = False
+			clk.net.value = 0
+		self._log.llow(f"Reset done")
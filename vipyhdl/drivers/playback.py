@@ -0,0 +1,157 @@
+from dataclasses import dataclass
+from cocotb.handle import ModifiableObject
+from cocotb.triggers import Timer, ClockCycles, Event
+from cocotb.utils import get_sim_steps, get_sim_time
+from cocotb import Task
+from vipyhdl.structure import GenericDriver, drive_method
+
+import typing as T
+
+try :
+	import numpy as np
+except ImportError :
+	np = None
+
+
+class PlaybackDriver(GenericDriver):
+	@dataclass
+	class Interface:
+		nets : T.List[ModifiableObject]
+
+	def __init__(self, nets : T.Union[ModifiableObject, T.Sequence[ModifiableObject]], clock : T.Optional[ModifiableObject] = None,
+				 time_unit : str = "step", chunk_size : int = 65536):
+		"""
+		Replay pre-computed stimulus on one or more nets, from a single coroutine.
+
+		The records are a 2D integer array (or a path to a .npy file) of one row per event : the first column is the
+		time of the event, relative to the start of the playback, and the following columns are the values of the
+		nets, in order. The time is given in time_unit, or in rising edges of the clock if one is provided.
+
+		Rows are processed by chunks, so memory-mapped files larger than RAM are streamed. In each chunk, rows which
+		change no net are dropped and only the nets which actually change are written, so the coroutine is not
+		resumed when nothing changes.
+
+		:param nets: Nets to drive, in the order of the value columns
+		:param clock: If provided, times are counted in rising edges of this clock
+		:param time_unit: Unit of the times, if no clock is provided
+		:param chunk_size: Number of rows loaded at once
+		"""
+		super().__init__()
+		if np is None :
+			raise ImportError("NumPy is required by PlaybackDriver")
+
+		if isinstance(nets, ModifiableObject) or not isinstance(nets, (list, tuple)) :
+			nets = [nets]
+		self.itf = PlaybackDriver.Interface(list(nets))
+		for net in self.itf.nets :
+			self.register_signal_as_driven(net)
+
+		self.clock = clock
+		self.time_unit = time_unit
+		self.chunk_size = chunk_size
+
+		self._process : T.Optional[Task] = None
+
+		"""Set when the playback reaches the end of the records"""
+		self.evt_done = Event("playback_done")
+
+		"""Number of rows read, applied (changing at least one net) and of nets written during the last playback"""
+		self.rows_read = 0
+		self.rows_applied = 0
+		self.writes = 0
+
+	@staticmethod
+	def open(path : str) -> "np.ndarray":
+		"""
+		:param path: Path of a .npy file holding the records
+		:return: The records, memory-mapped read only
+		"""
+		if np is None :
+			raise ImportError("NumPy is required by PlaybackDriver")
+		return np.load(path, mmap_mode="r")
+
+	def _chunks(self, records : "np.ndarray") -> T.Iterator["np.ndarray"]:
+		for start in range(0, records.shape[0], self.chunk_size) :
+			# Only the chunk is loaded in memory, even for memory-mapped records
+			yield np.asarray(records[start:start + self.chunk_size])
+
+	async def _play(self, records : "np.ndarray"):
+		nets = self.itf.nets
+		scale = get_sim_steps(1, self.time_unit) if self.clock is None else 1
+		start = get_sim_time("step") if self.clock is None else 0
+		now = start
+		last : T.Optional["np.ndarray"] = None
+
+		for chunk in self._chunks(records) :
+			self.rows_read += chunk.shape[0]
+			values = chunk[:, 1:]
+			if values.dtype.kind not in "iu" :
+				values = values.astype(np.int64)
+			previous = np.empty_like(values)
+			previous[1:] = values[:-1]
+			changed = values != previous
+			if last is None :
+				changed[0] = True
+			else :
+				changed[0] = values[0] != last
+			last = values[-1].copy()
+
+			rows = np.flatnonzero(changed.any(axis=1))
+			times = (np.rint(chunk[rows, 0] * scale).astype(np.int64) + start).tolist()
+			for t, row, row_changed in zip(times, values[rows].tolist(), changed[rows].tolist()) :
+				if t > now :
+					if self.clock is None :
+						await Timer(t - now, "step")
+					else :
+						await ClockCycles(self.clock, t - now)
+					now = t
+				elif t < now :
+					raise ValueError(f"Playback records are not sorted by time : got {t} after {now}")
+				for net, value, net_changed in zip(nets, row, row_changed) :
+					if net_changed :
+						self.write_signal(net, value)
+						self.writes += 1
+				self.rows_applied += 1
+
+		self._log.llow(f"Playback done : {self.rows_applied}/{self.rows_read} rows applied, {self.writes} writes")
+		self.evt_done.set()
+
+	@drive_method
+	async def start(self, records : T.Union["np.ndarray", str]):
+		"""
+		Start the playback of some records, from the current time.
+		:param records: Records array or path of a .npy file to memory-map
+		"""
+		await self.stop()
+		if isinstance(records, str) :
+			records = self.open(records)
+		n_nets = len(self.itf.nets)
+		if records.ndim != 2 or records.shape[1] != n_nets + 1 :
+			raise ValueError(f"Expecting records of {n_nets + 1} columns (time and one value per net), got shape {records.shape}")
+		self.rows_read = 0
+		self.rows_applied = 0
+		self.writes = 0
+		self.evt_done.clear()
+		self._process = await self.start_task_now(self._play(records), "playback")
+
+	async def play(self, records : T.Union["np.ndarray", str]):
+		"""
+		Play some records and wait for the end of the playback. Returns right away if the driver is inactive.
+		:param records: Records array or path of a .npy file to memory-map
+		"""
+		if not self.is_active :
+			return
+		await self.start(records)
+		await self.evt_done.wait()
+
+	async def stop(self):
+		"""Stop the playback, the nets keep their current value"""
+		if self._process is not None :
+			self._process.kill()
+			self._process = None
+
+	@drive_method
+	async def reset(self):
+		self._log.llow(f"Reset command")
+		await self.stop()
+		self.evt_done.clear()
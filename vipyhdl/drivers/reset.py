@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from cocotb.handle import ModifiableObject
-from cocotb.triggers import *
-from vipyhdl.structure import GenericDriver, GlobalEnv, drive_method
+from cocotb.triggers import Timer
+from vipyhdl.structure import GenericDriver, drive_method
 
 
 class ResetDriver(GenericDriver):
@@ -23,8 +23,8 @@ class ResetDriver(GenericDriver):
 	async def reset(self):
 		self._log.llow(f"Reset command")
 
-		self.itf.reset.value = 1 - self.active_state
+		self.write_signal(self.itf.reset, 1 - self.active_state)
 		await Timer(10, "ns")
-		self.itf.reset.value = self.active_state
+		self.write_signal(self.itf.reset, self.active_state)
 		await Timer(10,"ns")
-		self.itf.reset.value = 1-self.active_state
+		self.write_signal(self.itf.reset, 1-self.active_state)
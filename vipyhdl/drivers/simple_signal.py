@@ -1,7 +1,8 @@
 from dataclasses import dataclass
 from cocotb.handle import ModifiableObject
-from cocotb.triggers import *
-from vipyhdl.structure import GenericDriver, GlobalEnv, drive_method
+from cocotb.triggers import Timer, ReadWrite
+from vipyhdl.structure import GenericDriver, drive_method
+from vipyhdl.structure.handles import handle_info
 
 
 class SignalDriver(GenericDriver):
@@ -22,29 +23,29 @@ class SignalDriver(GenericDriver):
 	@drive_method
 	async def reset(self):
 		self._log.llow(f"Reset command")
-		self.itf.sig.value = self.reset_state
+		self.write_signal(self.itf.sig, self.reset_state)
 
 	@drive_method
 	async def set(self,value):
-		self._log.debug(f"Set {self.name} to 0b{value:0{self.itf.sig.value.n_bits}b}")
-		self.itf.sig.value = value
+		self._log.debug(f"Set {self.name} to 0b{value:0{handle_info(self.itf.sig).width}b}")
+		self.write_signal(self.itf.sig, value)
 
 	@drive_method
 	async def pulse(self,value, time = 1, unit = "step"):
-		prev_val = self.itf.sig.value
-		self.itf.sig.value = value
+		prev_val = self._writes.value(self.itf.sig)
+		self.write_signal(self.itf.sig, value)
 		await Timer(time,unit)
-		self.itf.sig.value = prev_val
+		self.write_signal(self.itf.sig, prev_val)
 
 	@drive_method
 	async def pulse_evt(self,value,evt):
-		prev_val = self.itf.sig.value
+		prev_val = self._writes.value(self.itf.sig)
 		await evt
-		self.itf.sig.value = value
+		self.write_signal(self.itf.sig, value)
 		await ReadWrite()
 		await evt
-		self.itf.sig.value = prev_val
+		self.write_signal(self.itf.sig, prev_val)
 		await ReadWrite()
 
 	def __len__(self) :
-		return self.itf.sig.value.n_bits
+		return handle_info(self.itf.sig).width
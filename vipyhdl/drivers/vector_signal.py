@@ -1,11 +1,24 @@
+from array import array
 from dataclasses import dataclass
 from cocotb.handle import ModifiableObject
-from cocotb.triggers import *
-from vipyhdl.structure import GenericDriver, GlobalEnv, drive_method
-from vipyhdl.utils.workarounds import *
+from vipyhdl.structure import GenericDriver
+from vipyhdl.utils.workarounds import VectorCodec
 import typing as T
-from cocotb.binary import BinaryValue
-from cocotb.utils import *
+from cocotb.binary import BinaryValue, BinaryRepresentation
+from cocotb.utils import get_sim_time
+
+try :
+	import numpy as np
+except ImportError :
+	np = None
+
+
+def _typecode(wsize : int, signed : bool) -> T.Optional[str]:
+	""":return: The typecode of the smallest array type able to hold a word, None if words exceed 64 bits"""
+	for code in "bhilq" :
+		if wsize <= array(code).itemsize * 8 :
+			return code if signed else code.upper()
+	return None
 
 
 class VectorDriver(GenericDriver):
@@ -14,6 +27,19 @@ class VectorDriver(GenericDriver):
 		sig : ModifiableObject
 
 	def __init__(self,net : ModifiableObject,dim : T.List[int], reset_state : T.List[int] = None, read_only = False,signed=False):
+		"""
+		Drive a packed vector as an array of words.
+		The words are held in a typed array along with the packed value, so writing an element only re-encodes
+		this element. The design is read back at most once per simulation time step, and only decoded if it changed.
+
+		Reading value or an element returns BinaryValue objects. int_value, get_int() and get_array() provide the
+		same content as plain integers, without allocating a BinaryValue per element.
+		:param net: Packed vector
+		:param dim: Dimensions of the array, the last one being the word size in bits
+		:param reset_state: Values of the elements of the first dimension on reset, missing ones are 0
+		:param read_only: Never drive the vector
+		:param signed: Words are two's complement signed values
+		"""
 		super().__init__()
 
 		if reset_state is None :
@@ -26,11 +52,33 @@ class VectorDriver(GenericDriver):
 		self.register_itf_as_driven()
 
 		self.signed = signed
+		self._codec = VectorCodec.get(tuple(dim), signed)
+		self._wsize = self._codec.wsize
+		self._mask = self._codec.mask
+
+		"""Number of words per element of the first dimension"""
+		self._row = self._codec.count // dim[0] if len(dim) > 1 else 1
+		self._row_codec = VectorCodec.get(tuple(dim[1:]), signed) if self._row > 1 else None
+		self._typecode = _typecode(self._wsize, signed)
+
+		"""Packed value of the vector, matching _words"""
+		self._packed = self._codec.pack_flat(VectorCodec.flatten(self.reset_state))
 
-		self._cached_value = self.reset_state
+		"""Words, flat and element 0 first, as read back for signed vectors"""
+		self._words = self._new_words(self._codec.unpack_flat(self._packed))
 		self._last_updated = -1
 		self._user_active = not read_only
 
+	def _new_words(self, values : T.List[int]) -> T.Union[array, T.List[int]]:
+		return array(self._typecode, values) if self._typecode is not None else list(values)
+
+	def _normalize(self, value) -> int:
+		""":return: The word as stored, masked and sign extended as required"""
+		value = int(value) & self._mask
+		if self.signed and value >> (self._wsize - 1) :
+			value -= 1 << self._wsize
+		return value
+
 	async def reset(self):
 		self._log.llow(f"Reset command")
 		self.value = self.reset_state
@@ -38,56 +86,126 @@ class VectorDriver(GenericDriver):
 	async def set(self,value):
 		self.value = value
 
+	def _binary(self, item : int) -> BinaryValue:
+		""":return: An element of the first dimension as a BinaryValue, the cache being up to date"""
+		if self._row == 1 :
+			representation = BinaryRepresentation.TWOS_COMPLEMENT if self.signed else BinaryRepresentation.UNSIGNED
+			return BinaryValue(self._words[item], n_bits=self._wsize, bigEndian=False, binaryRepresentation=representation)
+		n_bits = self._row * self._wsize
+		row = (self._packed >> (item * n_bits)) & ((1 << n_bits) - 1)
+		return BinaryValue(row, n_bits=n_bits, bigEndian=False)
+
 	@property
 	def value(self):
 		if self._is_cocotb_handled :
 			return self.itf.sig.value
 		else :
 			self._update_cache()
-			return [BinaryValue(x) for x in self._cached_value]
+			return [self._binary(i) for i in range(self.dim[0])]
 
 	@value.setter
 	def value(self,val : T.Union[int,BinaryValue,T.List[int]]):
 		self._update_cache()
 		if isinstance(val,(int,BinaryValue)) :
-			self._cached_value = int_to_vector(int(val),self.dim)
+			self._set_packed(int(val) & self._codec.vector_mask)
+		elif np is not None and isinstance(val, np.ndarray) :
+			self._set_packed(self._codec.pack_array(val))
 		elif isinstance(val,list) :
-			if len(val) > len(self._cached_value) :
-				self._log.warning(f"Value overflow. Got a list of {len(val)} values while expecting a maximum of {len(self._cached_value)}.\nResults might be unexpected.")
+			if len(val) > self.dim[0] :
+				self._log.warning(f"Value overflow. Got a list of {len(val)} values while expecting a maximum of {self.dim[0]}.\nResults might be unexpected.")
 
-			for i in range(len(val)):
-				if i >= self.dim[0]:
-					break
-				else:
-					self._cached_value[i] = val[i]
-		self._write_output(vector_to_int(self._cached_value,self.dim[-1]))
+			if len(val) >= self.dim[0] :
+				self._set_packed(self._codec.pack_flat(VectorCodec.flatten(val[:self.dim[0]])))
+			else :
+				for i in range(len(val)):
+					self._set_element(i, val[i])
+		self._write_output(self._packed)
+
+	@property
+	def int_value(self) -> T.Union[int, T.List[T.Any]]:
+		"""
+		:return: The words as plain integers, nested as the vector dimensions (a single word for 1D vectors),
+		signed if the vector is
+		"""
+		self._update_cache()
+		return self._codec.nest(list(self._words)) if len(self.dim) > 1 else self._words[0]
+
+	def _set_packed(self, packed : int):
+		self._packed = packed
+		self._words = self._new_words(self._codec.unpack_flat(packed))
+
+	def _set_word(self, index : int, value):
+		"""Set a single word and re-encode it in the packed value"""
+		value = self._normalize(value)
+		self._words[index] = value
+		shift = index * self._wsize
+		self._packed = (self._packed & ~(self._mask << shift)) | ((value & self._mask) << shift)
+
+	def _set_element(self, item : int, value):
+		"""Set an element of the first dimension, which is a single word for 2D vectors"""
+		if self._row == 1 :
+			self._set_word(item, value)
+		else :
+			base = item * self._row
+			for i, v in enumerate(VectorCodec.flatten(value)[:self._row]) :
+				self._set_word(base + i, v)
 
 	def _update_cache(self):
 		new_time = get_sim_time()
 		if new_time != self._last_updated :
-			self._cached_value = self._cached_value = int_to_vector(int(self.itf.sig.value),self.dim,self.signed)
 			self._last_updated = new_time
+			packed = int(self.itf.sig.value)
+			if packed != self._packed :
+				self._set_packed(packed)
 
 	def _write_cache_to_output(self):
-		self.value = self._cached_value
+		self._write_output(self._packed)
 
 	def _write_output(self,value):
 		if self.is_active :
-			self.itf.sig.value = value
+			self.write_signal(self.itf.sig, value)
 
-	def __getitem__(self, item : int):
+	def set_array(self, values : "np.ndarray"):
+		"""
+		Set the whole vector from a NumPy array, of vector shape or flat
+		:param values: Array of words, signed values are packed as two's complement
+		"""
 		self._update_cache()
-		return BinaryValue(self._cached_value[item])
+		self._set_packed(self._codec.pack_array(values))
+		self._write_output(self._packed)
 
-	def __setitem__(self, item : int,value):
+	def get_array(self) -> "np.ndarray":
+		"""
+		:return: The words as a NumPy array of vector shape, signed if the vector is
+		"""
+		self._update_cache()
+		return self._codec.unpack_array(self._packed)
+
+	def get_int(self, item : int) -> T.Union[int, T.List[T.Any]]:
+		"""
+		:param item: Index in the first dimension
+		:return: The element as a plain integer, or nested lists of integers for vectors of 3 dimensions or more
+		"""
 		self._update_cache()
+		if self._row == 1 :
+			return self._words[item]
+		base = item * self._row
+		return self._row_codec.nest(list(self._words[base:base + self._row]))
 
-		self._cached_value[item] = int(value)
+	def __getitem__(self, item : int) -> BinaryValue:
+		self._update_cache()
+		return self._binary(item)
+
+	def __setitem__(self, item : int,value):
+		self._update_cache()
+		self._set_element(item, value)
 		self._write_cache_to_output()
 
 	def __iter__(self):
 		self._update_cache()
-		return self._cached_value.__iter__()
+		if self._row == 1 :
+			return iter(list(self._words))
+		return iter(self._codec.nest(list(self._words)))
 
 	def __len__(self):
-		return self.dim[0]
\ No newline at end of file
+		return self.dim[0]
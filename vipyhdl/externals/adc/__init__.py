@@ -1,2 +1,13 @@
-from .adc_sar_base import AdcSarBase
-from .adc_sar_base import AdcSarBaseMonitor
\ No newline at end of file
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .adc_sar_base import AdcSarBase
+	from .adc_sar_base import AdcSarBaseMonitor
+
+__all__ = ["AdcSarBase", "AdcSarBaseMonitor"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"AdcSarBase" : ".adc_sar_base",
+	"AdcSarBaseMonitor" : ".adc_sar_base",
+})
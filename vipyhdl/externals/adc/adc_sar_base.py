@@ -3,12 +3,15 @@ from secrets import randbits
 
 from cocotb import Task
 from cocotb.handle import ModifiableObject
-from cocotb.clock import get_sim_steps
-from cocotb.triggers import *
-from vipyhdl.structure import *
-from vipyhdl.drivers import *
+from cocotb.utils import get_sim_steps, get_time_from_sim_steps
+from cocotb.triggers import Event, Timer, RisingEdge, FallingEdge, First, ClockCycles
+from vipyhdl.structure import GenericDriver, Monitor, drive_method
+from vipyhdl.structure.handles import handle_info
+from vipyhdl.drivers import SignalDriver
 import typing as T
 
+from vipyhdl.utils.event import PulseEvent
+
 class AdcSarBase(GenericDriver):
 	@dataclass
 	class Interface:
@@ -23,7 +26,7 @@ class AdcSarBase(GenericDriver):
 		super().__init__()
 		self.itf = itf
 
-		self.resolution = self.itf.o_data.value.n_bits
+		self.resolution = handle_info(self.itf.o_data).width
 		self.req_enable_len = get_sim_steps(100,"ns")
 		self.req_start_time = get_sim_steps(10, "ns")
 		self.req_clk_cycles_conversion = self.resolution
@@ -41,7 +44,7 @@ class AdcSarBase(GenericDriver):
 		self._power_process : Task = None
 		self._adc_process : Task = None
 
-		self.queued_values : T.Dict[int, T.List[int]] = {i:list() for i in range(2 ** self.itf.i_chan.value.n_bits)}
+		self.queued_values : T.Dict[int, T.List[int]] = {i:list() for i in range(2 ** handle_info(self.itf.i_chan).width)}
 
 	def fit_timings(self,clk_period,cycles_pu,cycles_start,cycles_conversion) :
 		base_time = clk_period
@@ -70,7 +73,7 @@ class AdcSarBase(GenericDriver):
 		await self.reset_all()
 		self.clear_queued_values()
 		self._log.debug(f"Restart power process")
-		self._power_process = cocotb.start_soon(self.handle_enable())
+		self._power_process = self.start_task(self.handle_enable())
 
 	async def handle_enable(self):
 		self._log.debug(f"Start power handler")
@@ -90,7 +93,7 @@ class AdcSarBase(GenericDriver):
 			if trigger is pd_evt :
 				continue
 			self.evt_pu_done.set()
-			self._adc_process = await cocotb.start(self.adc_process())
+			self._adc_process = await self.start_task_now(self.adc_process())
 			await pd_evt
 			self._log.llow("Power down event detected")
 			self.evt_pu_done.clear()
@@ -145,7 +148,7 @@ class AdcSarBaseMonitor(Monitor) :
 		super().__init__()
 		self.itf = itf
 
-		self.evt = AdcSarBaseMonitor.Eventlist(start=Event("start"),eoc=Event("eoc"))
+		self.evt = AdcSarBaseMonitor.Eventlist(start=PulseEvent("start"),eoc=PulseEvent("eoc"))
 
 		self.add_edge_to_sensitivity(RisingEdge,[self.itf.o_eoc,self.itf.i_start])
 		self.add_evt_to_autoreset([self.evt.eoc,self.evt.start])
@@ -1,2 +1,13 @@
-from .enc_base import EncoderBase
-from .enc_abi import EncoderABI
\ No newline at end of file
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .enc_base import EncoderBase
+	from .enc_abi import EncoderABI
+
+__all__ = ["EncoderBase", "EncoderABI"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"EncoderBase" : ".enc_base",
+	"EncoderABI" : ".enc_abi",
+})
@@ -1,10 +1,9 @@
 from dataclasses import dataclass
 
-import cocotb
 from cocotb import Task
 from cocotb.handle import ModifiableObject
-from cocotb.triggers import NextTimeStep
 from .enc_base import EncoderBase
+from vipyhdl.structure.globalenv import GlobalEnv
 
 
 class EncoderABI(EncoderBase):
@@ -29,12 +28,13 @@ class EncoderABI(EncoderBase):
 
 	async def update_abi(self):
 		while True:
+			writes = GlobalEnv().writes
+			for net, value in zip((self.itf.a, self.itf.b, self.itf.i), self.abi_from_position()) :
+				writes.write(net, value)
 			await self.evt.pos_changed.wait()
-			(self.itf.a.value,self.itf.b.value,self.itf.i.value) = self.abi_from_position()
-			await NextTimeStep()
 
 	async def start(self):
-		self.drive_process = await cocotb.start(self.update_abi())
+		self.drive_process = await GlobalEnv().tasks.start(self,self.update_abi())
 		await super().start()
 
 
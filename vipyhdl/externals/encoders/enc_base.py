@@ -1,19 +1,22 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 import typing as T
 import cocotb
 from cocotb import Task
-from cocotb.triggers import Event, First, Timer, _Event
+from cocotb.triggers import Timer
 from fractions import Fraction
 
 from cocotb.utils import get_sim_steps
 
+from vipyhdl.structure.globalenv import GlobalEnv
+from vipyhdl.utils.event import PulseEvent
+
 
 class EncoderBase:
 
 	@dataclass
 	class EncoderEvents:
-		pos_changed: Event = Event("enc_pos_changed")
-		spd_changed: Event = Event("enc_spd_changed")
+		pos_changed: PulseEvent = field(default_factory=lambda: PulseEvent("enc_pos_changed"))
+		spd_changed: PulseEvent = field(default_factory=lambda: PulseEvent("enc_spd_changed"))
 
 	def __init__(self, resolution = 360, position = 0):
 		self.resolution = resolution
@@ -23,11 +26,6 @@ class EncoderBase:
 		self.evt = EncoderBase.EncoderEvents()
 		self._update_period : T.Tuple[int,str] = None
 
-		self._monitored_events = [
-			self.evt.pos_changed.wait(),
-			self.evt.spd_changed.wait()
-		]
-
 		self._update_position : Task = None
 		self.position = position
 
@@ -40,12 +38,6 @@ class EncoderBase:
 		self._position = value % self.resolution
 		self.evt.pos_changed.set()
 
-	@cocotb.coroutine
-	async def _clear_toogled_events(self):
-		while True :
-			evt : _Event = await First(*self._monitored_events)
-			evt.parent.clear()
-
 	@property
 	def speed_tr_per_sec(self):
 		return 1/self._update_period[0] if self._update_period is not None else 0
@@ -63,4 +55,4 @@ class EncoderBase:
 			self.position += 1 if self.direction > 0 else -1
 
 	async def start(self):
-		self._update_position = await cocotb.start(self.run_update_position())
+		self._update_position = await GlobalEnv().tasks.start(self,self.run_update_position())
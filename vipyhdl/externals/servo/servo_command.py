@@ -1,10 +1,11 @@
 import typing as T
 
-import cocotb
-from cocotb import RunningTask
+from cocotb import Task
 from cocotb.handle import ModifiableObject
-from cocotb.utils import *
-from cocotb.triggers import *
+from cocotb.utils import get_sim_steps
+from cocotb.triggers import Timer
+
+from vipyhdl.structure.globalenv import GlobalEnv
 
 class ServoDriver:
 
@@ -14,7 +15,7 @@ class ServoDriver:
 		self._min = get_sim_steps(*min)
 		self._max = get_sim_steps(*max)
 		self.value = 0
-		self._driver_process : RunningTask = None
+		self._driver_process : Task = None
 
 	def reset(self):
 		self.net.value = 0
@@ -23,7 +24,7 @@ class ServoDriver:
 		if self._driver_process is not None :
 			self.stop()
 
-		self._driver_process = cocotb.start_soon(self._running_process())
+		self._driver_process = GlobalEnv().tasks.start_soon(self,self._running_process())
 
 	def stop(self):
 		if self._driver_process is not None :
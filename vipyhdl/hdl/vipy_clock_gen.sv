@@ -0,0 +1,45 @@
+// Clock generator controlled by vipyhdl.drivers.ClockDriver in ClockMode.HDL.
+// The clock toggles without any Python involvement : the driver only sets the phase durations, the idle value and
+// the enable.
+//
+// Instantiate it in the testbench and pass the instance to the driver :
+//     vipy_clock_gen u_clk_gen (.clk(clk));
+//     ClockDriver(dut.clk, mode=ClockMode.HDL, generator=dut.u_clk_gen)
+`timescale 1ns/1ps
+
+module vipy_clock_gen (
+	output logic clk
+);
+	// Durations of the active (not idle) and idle phases, in ns. Set from Python.
+	real high_ns = 0.5;
+	real low_ns  = 0.5;
+
+	// Value of the clock while disabled. Set from Python.
+	logic idle = 1'b0;
+
+	// The clock leaves its idle value on the rising edge of enable and goes back to it on its falling edge.
+	logic enable = 1'b0;
+
+	initial clk = idle;
+
+	always begin : generator
+		wait (enable === 1'b1);
+		while (enable === 1'b1) begin
+			clk = ~idle;
+			#(high_ns * 1ns);
+			clk = idle;
+			#(low_ns * 1ns);
+		end
+	end
+
+	always @(negedge enable) begin
+		disable generator;
+		clk = idle;
+	end
+
+	always @(idle) begin
+		if (enable !== 1'b1)
+			clk = idle;
+	end
+
+endmodule
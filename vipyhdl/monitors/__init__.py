@@ -0,0 +1,11 @@
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .sampler import SamplerMonitor
+
+__all__ = ["SamplerMonitor"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"SamplerMonitor" : ".sampler",
+})
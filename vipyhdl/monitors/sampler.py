@@ -0,0 +1,315 @@
+import queue
+import threading
+import typing as T
+import zipfile
+from dataclasses import dataclass
+
+from cocotb.handle import ModifiableObject
+from cocotb.triggers import RisingEdge, Timer
+from cocotb.utils import get_sim_time, get_sim_steps
+
+from vipyhdl.structure import Monitor
+from vipyhdl.structure.handles import handle_info
+from vipyhdl.utils.queue import DataPort
+
+try :
+	import numpy as np
+except ImportError :
+	np = None
+
+
+def _sample_dtype(width : int, signed : bool) -> str:
+	""":return: The smallest NumPy integer type able to hold a sample of the given width"""
+	for size in (8, 16, 32, 64) :
+		if width <= size :
+			return f"{'i' if signed else 'u'}{size // 8}"
+	raise ValueError(f"Unable to sample signals of more than 64 bits, got {width} bits")
+
+
+class _NpyWriter:
+	def __init__(self, path : str, dtype : "np.dtype"):
+		"""
+		Write a 1D .npy file by chunks. The header is reserved for the largest possible shape and rewritten with the
+		actual number of samples on close, so the file is a regular .npy that may be memory-mapped.
+		:param path: Path of the file
+		:param dtype: Type of the samples
+		"""
+		self.dtype = dtype
+		self._file = open(path, "wb")
+
+		"""Size of the header, the samples start right after it"""
+		self.offset = -(-(13 + len(self._header_dict(2 ** 63 - 1))) // 64) * 64
+		self._file.write(self._header(0))
+		self.count = 0
+
+	def _header_dict(self, count : int) -> str:
+		return repr({"descr" : np.lib.format.dtype_to_descr(self.dtype), "fortran_order" : False, "shape" : (count,)})
+
+	def _header(self, count : int) -> bytes:
+		# Format 1.0 : magic string and version, header length on 2 bytes, then the header padded with spaces and a newline
+		header = self._header_dict(count).ljust(self.offset - 11) + "\n"
+		return np.lib.format.magic(1, 0) + len(header).to_bytes(2, "little") + header.encode("latin1")
+
+	def write(self, samples : "np.ndarray"):
+		self._file.write(samples.tobytes())
+		# Flushed so that the samples may be read back while recording
+		self._file.flush()
+		self.count += samples.shape[0]
+
+	def close(self):
+		self._file.seek(0)
+		self._file.write(self._header(self.count))
+		self._file.close()
+
+
+class _NpzWriter:
+	def __init__(self, path : str, dtype : "np.dtype"):
+		"""
+		Write an .npz file holding one array per chunk, named chunk_000000 onward.
+		:param path: Path of the file
+		:param dtype: Type of the samples
+		"""
+		self._zip = zipfile.ZipFile(path, "w", zipfile.ZIP_STORED, allowZip64=True)
+		self.count = 0
+		self._chunks = 0
+
+	def write(self, samples : "np.ndarray"):
+		with self._zip.open(f"chunk_{self._chunks:06d}.npy", "w", force_zip64=True) as f :
+			np.lib.format.write_array(f, samples)
+		self._chunks += 1
+		self.count += samples.shape[0]
+
+	def close(self):
+		self._zip.close()
+
+
+class SamplerMonitor(Monitor):
+	@dataclass
+	class Interface:
+		nets : T.List[ModifiableObject]
+
+	@dataclass
+	class Events:
+		pass
+
+	def __init__(self, nets : T.Union[ModifiableObject, T.Sequence[ModifiableObject]], clock : T.Optional[ModifiableObject] = None,
+				 period : T.Optional[float] = None, unit : str = "ns", path : T.Optional[str] = None,
+				 chunk_size : int = 65536, buffers : int = 4, names : T.Optional[T.Sequence[str]] = None):
+		"""
+		Sample a set of signals on the rising edges of a clock, or at a fixed period, into NumPy arrays.
+		The signals are read right on the edge, as a flip-flop would, so registered outputs hold their previous value.
+
+		The samples are stored in preallocated chunks of a structured type, with a "time" field (in simulator steps)
+		and one field per signal, of the smallest integer type holding the signal. Each sample costs one value read
+		per signal. Full chunks are handed over to a background thread which appends them to the file, if any, then
+		recycles them : at most `buffers` chunks are allocated, whatever the length of the simulation.
+
+		The file is a .npy of the samples, or an .npz holding one array per chunk if the path ends with .npz.
+		Full chunks are also published on the `chunks` data port, as copies, if anything is connected to it.
+
+		X and Z values are recorded as 0 and counted in `unresolved`.
+
+		:param nets: Signals to sample, of at most 64 bits
+		:param clock: Clock on which rising edges the signals are sampled
+		:param period: Sampling period, used if no clock is provided
+		:param unit: Unit of the period
+		:param path: Path of the .npy or .npz file to record the samples to, None to only publish the chunks
+		:param chunk_size: Number of samples per chunk
+		:param buffers: Number of chunks allocated, at least 2
+		:param names: Names of the signal fields, default to the signal names
+		"""
+		super().__init__()
+		if np is None :
+			raise ImportError("NumPy is required by SamplerMonitor")
+		if clock is None and period is None :
+			raise ValueError("SamplerMonitor requires either a clock or a sampling period")
+
+		if isinstance(nets, ModifiableObject) or not isinstance(nets, (list, tuple)) :
+			nets = [nets]
+		self.itf = SamplerMonitor.Interface(list(nets))
+		self.evt = SamplerMonitor.Events()
+
+		self.clock = clock
+		self.period = period
+		self.unit = unit
+		self.path = path
+		self.chunk_size = chunk_size
+
+		infos = [handle_info(n) for n in self.itf.nets]
+		if names is None :
+			names = [info.name.split(".")[-1] for info in infos]
+		if len(set(names)) != len(names) or "time" in names :
+			raise ValueError(f"Sampled signal names must be unique and not 'time', got {names}")
+		self.names = list(names)
+
+		"""Structured type of a sample"""
+		self.dtype = np.dtype([("time", "i8")] + [(name, _sample_dtype(info.width, info.signed)) for name, info in zip(self.names, infos)])
+		self._signed = [info.signed for info in infos]
+
+		"""Free chunks, filled by the background thread once written"""
+		self._free : "queue.Queue[np.ndarray]" = queue.Queue()
+		for _ in range(max(2, buffers)) :
+			self._free.put(np.zeros(chunk_size, dtype=self.dtype))
+
+		"""Full chunks to write, as (chunk, number of samples), None to stop the thread"""
+		self._pending : "queue.Queue[T.Optional[T.Tuple[np.ndarray, int]]]" = queue.Queue()
+		self._thread : T.Optional[threading.Thread] = None
+		self._writer : T.Optional[T.Union[_NpyWriter, _NpzWriter]] = None
+		self._error : T.Optional[BaseException] = None
+
+		self._chunk : "np.ndarray" = self._free.get()
+		self._columns : T.List["np.ndarray"] = self._split(self._chunk)
+		self._index = 0
+
+		"""Full chunks, published as read-only copies"""
+		self.chunks = DataPort()
+
+		"""Number of samples taken, and of signal values which could not be resolved to an integer"""
+		self.samples = 0
+		self.unresolved = 0
+
+	def _split(self, chunk : "np.ndarray") -> T.List["np.ndarray"]:
+		""":return: The views on each field of a chunk, time first"""
+		return [chunk[name] for name in self.dtype.names]
+
+	def _read(self, i : int, net : ModifiableObject) -> int:
+		value = net.value
+		try :
+			return value.signed_integer if self._signed[i] else value.integer
+		except ValueError :
+			self.unresolved += 1
+			return 0
+
+	def monitor(self):
+		"""Take one sample of all the signals"""
+		index = self._index
+		columns = self._columns
+		columns[0][index] = get_sim_time("step")
+		for i, net in enumerate(self.itf.nets) :
+			columns[i + 1][index] = self._read(i, net)
+		self.samples += 1
+		self._index = index + 1
+		if self._index == self.chunk_size :
+			self._hand_over()
+
+	def _hand_over(self):
+		"""Queue the current chunk to the background thread and take a free one, waiting for it if required"""
+		if self._error is not None :
+			raise RuntimeError(f"Sampler {self.name} failed to record samples") from self._error
+		chunk, count = self._chunk, self._index
+		if len(self.chunks.queues) > 0 :
+			copy = chunk[:count].copy()
+			copy.flags.writeable = False
+			self.chunks.put(copy)
+		self._pending.put((chunk, count))
+		self._chunk = self._free.get()
+		self._columns = self._split(self._chunk)
+		self._index = 0
+
+	def _write_loop(self):
+		while True :
+			item = self._pending.get()
+			if item is None :
+				self._pending.task_done()
+				return
+			chunk, count = item
+			try :
+				if self._writer is not None and self._error is None :
+					self._writer.write(chunk[:count])
+			except BaseException as e :
+				self._error = e
+			finally :
+				self._free.put(chunk)
+				self._pending.task_done()
+
+	def _open(self):
+		if self._thread is not None :
+			return
+		if self.path is not None :
+			writer_type = _NpzWriter if self.path.endswith(".npz") else _NpyWriter
+			self._writer = writer_type(self.path, self.dtype)
+		self._thread = threading.Thread(target=self._write_loop, name=f"{self.name}.writer", daemon=True)
+		self._thread.start()
+
+	async def _run(self):
+		trigger = RisingEdge(self.clock) if self.clock is not None else Timer(get_sim_steps(self.period, self.unit), "step")
+		while True :
+			await trigger
+			self.monitor()
+
+	def start(self):
+		self._open()
+		super().start()
+
+	def flush(self):
+		"""
+		Hand over the samples taken so far and wait until all of them are written.
+		"""
+		if self._index > 0 :
+			self._hand_over()
+		self._pending.join()
+		if self._error is not None :
+			raise RuntimeError(f"Sampler {self.name} failed to record samples") from self._error
+
+	def close(self):
+		"""
+		Stop sampling, write the remaining samples and close the file.
+		"""
+		self.stop()
+		if self._thread is None :
+			return
+		self.flush()
+		self._pending.put(None)
+		self._thread.join()
+		self._thread = None
+		if self._writer is not None :
+			self._writer.close()
+			self._writer = None
+
+	@property
+	def current(self) -> "np.ndarray":
+		""":return: The samples of the current chunk, not handed over yet"""
+		return self._chunk[:self._index]
+
+	def stream(self, chunk_size : T.Optional[int] = None) -> T.Iterator["np.ndarray"]:
+		"""
+		Iterate over the recorded samples, by chunks. The samples taken so far are flushed first.
+		:param chunk_size: Number of samples per chunk, default to the sampler chunk size
+		:return: An iterator on arrays of samples
+		"""
+		if self.path is None :
+			raise ValueError(f"Sampler {self.name} does not record to a file, connect to its chunks data port instead")
+		chunk_size = chunk_size if chunk_size is not None else self.chunk_size
+		if self._writer is None :
+			return SamplerMonitor.load(self.path, chunk_size)
+		if isinstance(self._writer, _NpzWriter) :
+			raise RuntimeError(f"Sampler {self.name} records to an .npz file, which can only be read once closed")
+
+		# The header of the file being written does not hold the number of samples yet
+		self.flush()
+		samples = np.memmap(self.path, dtype=self.dtype, mode="r", offset=self._writer.offset, shape=(self._writer.count,)) \
+			if self._writer.count > 0 else np.empty(0, self.dtype)
+		return SamplerMonitor._slices(samples, chunk_size)
+
+	@staticmethod
+	def _slices(samples : "np.ndarray", chunk_size : int) -> T.Iterator["np.ndarray"]:
+		for start in range(0, samples.shape[0], chunk_size) :
+			# Only the chunk is loaded in memory, the samples are memory-mapped
+			yield np.asarray(samples[start:start + chunk_size])
+
+	@staticmethod
+	def load(path : str, chunk_size : int = 65536) -> T.Iterator["np.ndarray"]:
+		"""
+		Iterate over the samples of a file written by a SamplerMonitor, without loading the whole file.
+		:param path: Path of the .npy or .npz file
+		:param chunk_size: Number of samples per chunk, for .npy files. .npz files are read as recorded.
+		:return: An iterator on arrays of samples
+		"""
+		if np is None :
+			raise ImportError("NumPy is required by SamplerMonitor")
+		if path.endswith(".npz") :
+			with np.load(path) as data :
+				for name in sorted(data.files) :
+					yield data[name]
+		else :
+			yield from SamplerMonitor._slices(np.load(path, mmap_mode="r"), chunk_size)
@@ -1 +1,11 @@
-from .csv_reader import CSVReader
\ No newline at end of file
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .csv_reader import CSVReader
+
+__all__ = ["CSVReader"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"CSVReader" : ".csv_reader",
+})
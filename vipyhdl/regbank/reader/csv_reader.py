@@ -1,7 +1,7 @@
 import os
 import logging
 import csv
-from ..structure import *
+from ..structure import RegisterBank, Register, Field, FieldSize, ShadowGroup
 import typing as T
 log = logging.getLogger(__name__)
 
@@ -1,9 +1,25 @@
-from .access import Access
-from .access import access_mapping
+import typing as T
 
-from .field import FieldSize
-from .field import Field
-from .register import Register
-from .regbank import RegisterBank
-from .shadow_register_group import ShadowGroup
-from .register import MultiRegSizeDescriptor
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .access import Access
+	from .access import access_mapping
+	from .field import FieldSize
+	from .field import Field
+	from .register import Register
+	from .regbank import RegisterBank
+	from .shadow_register_group import ShadowGroup
+	from .register import MultiRegSizeDescriptor
+
+__all__ = ["Access", "access_mapping", "FieldSize", "Field", "Register", "RegisterBank", "ShadowGroup", "MultiRegSizeDescriptor"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"Access" : ".access",
+	"access_mapping" : ".access",
+	"FieldSize" : ".field",
+	"Field" : ".field",
+	"Register" : ".register",
+	"RegisterBank" : ".regbank",
+	"ShadowGroup" : ".shadow_register_group",
+	"MultiRegSizeDescriptor" : ".register",
+})
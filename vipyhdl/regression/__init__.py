@@ -0,0 +1,19 @@
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .runner import RegressionRunner
+	from .runner import RegressionJob
+	from .runner import RegressionSummary
+	from .runner import JobResult
+	from .runner import TestcaseResult
+
+__all__ = ["RegressionRunner", "RegressionJob", "RegressionSummary", "JobResult", "TestcaseResult"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"RegressionRunner" : ".runner",
+	"RegressionJob" : ".runner",
+	"RegressionSummary" : ".runner",
+	"JobResult" : ".runner",
+	"TestcaseResult" : ".runner",
+})
@@ -0,0 +1,54 @@
+import argparse
+import json
+import sys
+
+from .runner import RegressionRunner
+
+
+def main():
+	parser = argparse.ArgumentParser(prog="python -m vipyhdl.regression",
+									 description="Run a cocotb regression in parallel simulator processes")
+	parser.add_argument("config", help="JSON regression description")
+	parser.add_argument("-j", "--workers", type=int, default=None, help="Number of parallel simulators, default to the number of cores")
+	parser.add_argument("-o", "--output", default=None, help="Path of the JSON summary to write")
+	args = parser.parse_args()
+
+	with open(args.config) as f :
+		config = json.load(f)
+
+	# Expected format :
+	# {
+	#   "simulator" : "icarus", "sources" : ["top.sv"], "hdl_toplevel" : "top", "work_dir" : "regression",
+	#   "jobs" : [
+	#     {"test_module" : "test_spi", "testcases" : null, "seeds" : [1,2], "parameters" : {"WIDTH" : [8,16]},
+	#      "extra_env" : {"SPI_MODE" : ["0","3"]}, "split_testcases" : false}
+	#   ]
+	# }
+	runner = RegressionRunner(
+		simulator=config["simulator"],
+		sources=config["sources"],
+		hdl_toplevel=config["hdl_toplevel"],
+		work_dir=config.get("work_dir", "regression"),
+		workers=args.workers if args.workers is not None else config.get("workers"),
+		build_args=config.get("build_args"),
+		test_args=config.get("test_args")
+	)
+	for job in config["jobs"] :
+		runner.add_matrix(
+			test_module=job["test_module"],
+			testcases=job.get("testcases"),
+			seeds=job.get("seeds", [None]),
+			parameters=job.get("parameters"),
+			extra_env=job.get("extra_env"),
+			split_testcases=job.get("split_testcases", False)
+		)
+
+	summary = runner.run()
+	print(summary.as_report)
+	if args.output is not None :
+		summary.to_json(args.output)
+	return 0 if summary.passed else 1
+
+
+if __name__ == "__main__" :
+	sys.exit(main())
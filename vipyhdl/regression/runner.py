@@ -0,0 +1,326 @@
+import hashlib
+import inspect
+import itertools
+import json
+import os
+import re
+import time
+import typing as T
+import xml.etree.ElementTree as ET
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field, asdict
+
+try :
+	from cocotb_tools.runner import get_runner
+except ImportError :
+	from cocotb.runner import get_runner
+
+
+PROFILE_FILENAME = "vipy_profile.json"
+RESULTS_FILENAME = "results.xml"
+
+
+@dataclass
+class RegressionJob:
+	"""A single simulator run : one test module, optionally restricted to some testcases."""
+	test_module : str
+	testcases : T.Optional[T.List[str]] = None
+	seed : T.Optional[int] = None
+	"""HDL parameters (generics), the design is built once per distinct set of parameters"""
+	parameters : T.Dict[str, T.Any] = field(default_factory=dict)
+	"""Extra environment variables, used to pass parameters (SPI mode...) to the test module"""
+	extra_env : T.Dict[str, str] = field(default_factory=dict)
+
+	@property
+	def name(self) -> str:
+		ret = self.test_module
+		if self.testcases :
+			ret += "." + "+".join(self.testcases)
+		for k, v in sorted(self.parameters.items()) :
+			ret += f"_{k}={v}"
+		for k, v in sorted(self.extra_env.items()) :
+			ret += f"_{k}={v}"
+		if self.seed is not None :
+			ret += f"_s{self.seed}"
+		return re.sub(r"[^\w.=+-]", "_", ret)
+
+	@property
+	def build_key(self) -> str:
+		""":return: A key identifying the build required by the job"""
+		return hashlib.sha1(json.dumps(self.parameters, sort_keys=True, default=str).encode()).hexdigest()[:12]
+
+
+@dataclass
+class TestcaseResult:
+	name : str
+	passed : bool
+	sim_time_ns : float = 0.0
+	wall_time : float = 0.0
+
+
+@dataclass
+class JobResult:
+	job : RegressionJob
+	passed : bool
+	testcases : T.List[TestcaseResult] = field(default_factory=list)
+	"""Wall time of the whole simulator run, including start-up, in seconds"""
+	wall_time : float = 0.0
+	"""Task registry data dumped by the simulator process, if any"""
+	profile : T.List[T.Dict[str, T.Any]] = field(default_factory=list)
+	error : T.Optional[str] = None
+	"""Directory in which the simulator was run, holding its outputs"""
+	test_dir : T.Optional[str] = None
+
+	@property
+	def sim_time_ns(self) -> float:
+		return sum(t.sim_time_ns for t in self.testcases)
+
+
+class RegressionSummary:
+	def __init__(self, results : T.List[JobResult], wall_time : float = 0.0):
+		"""
+		Gather the results of all the jobs of a regression.
+		:param results: Results of each job
+		:param wall_time: Wall time of the whole regression, in seconds
+		"""
+		self.results = results
+		self.wall_time = wall_time
+
+	@property
+	def passed(self) -> bool:
+		return all(r.passed for r in self.results)
+
+	@property
+	def failed_jobs(self) -> T.List[JobResult]:
+		return [r for r in self.results if not r.passed]
+
+	@property
+	def profile(self) -> T.List[T.Dict[str, T.Any]]:
+		"""
+		:return: The task registry data of all the jobs, merged by owner and task name.
+		"""
+		merged : T.Dict[T.Tuple[str,str], T.Dict[str, T.Any]] = dict()
+		for r in self.results :
+			for entry in r.profile :
+				key = (entry["owner"], entry["name"])
+				if key not in merged :
+					merged[key] = {"owner" : entry["owner"], "name" : entry["name"], "started" : 0, "resumptions" : 0, "wall_time" : 0.0}
+				for k in ["started", "resumptions", "wall_time"] :
+					merged[key][k] += entry[k]
+		return sorted(merged.values(), key=lambda x: x["wall_time"], reverse=True)
+
+	def as_dict(self) -> T.Dict[str, T.Any]:
+		return {
+			"passed" : self.passed,
+			"wall_time" : self.wall_time,
+			"jobs" : [dict(asdict(r), name=r.job.name, sim_time_ns=r.sim_time_ns) for r in self.results],
+			"profile" : self.profile
+		}
+
+	def to_json(self, path : str):
+		with open(path, "w") as f :
+			json.dump(self.as_dict(), f, indent=1, default=str)
+
+	@property
+	def as_report(self) -> str:
+		"""
+		:return: a report of the regression results
+		"""
+		ret = f"{'':#<80s}\n" \
+		      f"#{' Regression report ': ^78s}#\n" \
+		      f"{'':#<80s}\n"
+		ret += f"{'Job':46s} {'Status':>6s} {'Sim (ns)':>12s} {'Wall (s)':>9s} {'ns/s':>10s}\n"
+		for r in self.results :
+			name = r.job.name if len(r.job.name) <= 46 else "..." + r.job.name[-43:]
+			status = "PASS" if r.passed else "FAIL"
+			ratio = r.sim_time_ns / r.wall_time if r.wall_time > 0 else 0
+			ret += f"{name:46s} {status:>6s} {r.sim_time_ns:12.1f} {r.wall_time:9.2f} {ratio:10.1f}\n"
+			if r.error is not None :
+				ret += f"    {r.error}\n"
+			for t in r.testcases :
+				if not t.passed :
+					ret += f"    failed testcase {t.name}\n"
+
+		profile = self.profile
+		if len(profile) > 0 :
+			ret += f"{'':#<80s}\n" \
+			       f"#{' Task profile (all jobs) ': ^78s}#\n" \
+			       f"{'':#<80s}\n"
+			for p in profile[:20] :
+				tname = f"{p['owner']}:{p['name']}"
+				if len(tname) > 50 :
+					tname = "..." + tname[-47:]
+				ret += f"{tname:50s} {p['resumptions']:12d} {p['wall_time'] * 1e3:12.3f} ms\n"
+
+		ret += f"{'':#<80s}\n"
+		ret += f"{len(self.results) - len(self.failed_jobs)}/{len(self.results)} jobs passed in {self.wall_time:.2f} s\n"
+		return ret
+
+
+def _parse_results(path : str) -> T.List[TestcaseResult]:
+	"""Extract the testcases results from a cocotb results.xml file"""
+	ret = list()
+	for tc in ET.parse(path).getroot().iter("testcase") :
+		failed = tc.find("failure") is not None or tc.find("error") is not None
+		ret.append(TestcaseResult(
+			name=tc.get("name"),
+			passed=not failed,
+			sim_time_ns=float(tc.get("sim_time_ns", 0)),
+			wall_time=float(tc.get("time", 0))
+		))
+	return ret
+
+
+def _build_sources_kwargs(build_fn, sources : T.List[str]) -> T.Dict[str, T.List[str]]:
+	"""Map the sources on the build arguments supported by the installed cocotb runner"""
+	if "sources" in inspect.signature(build_fn).parameters :
+		return {"sources" : sources}
+	vhdl_ext = (".vhd", ".vhdl")
+	return {
+		"verilog_sources" : [s for s in sources if not s.lower().endswith(vhdl_ext)],
+		"vhdl_sources" : [s for s in sources if s.lower().endswith(vhdl_ext)]
+	}
+
+
+def _build(simulator : str, build_dir : str, sources : T.List[str], hdl_toplevel : str,
+		   parameters : T.Dict[str, T.Any], build_args : T.List[str]):
+	runner = get_runner(simulator)
+	runner.build(
+		hdl_toplevel=hdl_toplevel,
+		build_dir=build_dir,
+		parameters=parameters,
+		build_args=build_args,
+		**_build_sources_kwargs(runner.build, sources)
+	)
+
+
+def _run_job(simulator : str, build_dir : str, test_dir : str, hdl_toplevel : str,
+			 job : RegressionJob, test_args : T.List[str]) -> JobResult:
+	os.makedirs(test_dir, exist_ok=True)
+	results_xml = os.path.join(test_dir, RESULTS_FILENAME)
+	profile_file = os.path.join(test_dir, PROFILE_FILENAME)
+	for f in [results_xml, profile_file] :
+		if os.path.exists(f) :
+			os.remove(f)
+
+	extra_env = dict(job.extra_env)
+	extra_env["VIPY_PROFILE_FILE"] = profile_file
+
+	ret = JobResult(job=job, passed=False, test_dir=test_dir)
+	start = time.perf_counter()
+	try :
+		runner = get_runner(simulator)
+		runner.test(
+			test_module=job.test_module,
+			hdl_toplevel=hdl_toplevel,
+			testcase=job.testcases,
+			seed=job.seed,
+			extra_env=extra_env,
+			parameters=job.parameters,
+			build_dir=build_dir,
+			test_dir=test_dir,
+			results_xml=results_xml,
+			test_args=test_args
+		)
+	except BaseException as e :
+		ret.error = f"{type(e).__name__}: {e!s}"
+	ret.wall_time = time.perf_counter() - start
+
+	if os.path.exists(results_xml) :
+		ret.testcases = _parse_results(results_xml)
+		ret.passed = ret.error is None and len(ret.testcases) > 0 and all(t.passed for t in ret.testcases)
+	elif ret.error is None :
+		ret.error = f"No result file found in {test_dir}"
+
+	if os.path.exists(profile_file) :
+		with open(profile_file) as f :
+			ret.profile = json.load(f)
+	return ret
+
+
+class RegressionRunner:
+	def __init__(self, simulator : str, sources : T.List[str], hdl_toplevel : str, work_dir : str = "regression",
+				 workers : T.Optional[int] = None, build_args : T.List[str] = None, test_args : T.List[str] = None):
+		"""
+		Run a set of cocotb test modules in parallel, each one in its own simulator process.
+		The design is built once per distinct set of HDL parameters, then all the jobs are dispatched on a process pool.
+
+		:param simulator: Simulator name, as understood by the cocotb runner (i.e. "icarus", "verilator")
+		:param sources: HDL sources of the design
+		:param hdl_toplevel: Name of the HDL toplevel
+		:param work_dir: Directory holding the builds and the test directories
+		:param workers: Number of parallel simulator processes, default to the number of cores.
+		:param build_args: Extra simulator build arguments
+		:param test_args: Extra simulator run arguments
+		"""
+		self.simulator = simulator
+		self.sources = [os.path.abspath(s) for s in sources]
+		self.hdl_toplevel = hdl_toplevel
+		self.work_dir = os.path.abspath(work_dir)
+		self.workers = workers if workers is not None else os.cpu_count()
+		self.build_args = build_args if build_args is not None else list()
+		self.test_args = test_args if test_args is not None else list()
+
+		self.jobs : T.List[RegressionJob] = list()
+
+	def add(self, job : RegressionJob) -> RegressionJob:
+		"""Add a job to the regression"""
+		self.jobs.append(job)
+		return job
+
+	def add_matrix(self, test_module : str, testcases : T.Optional[T.List[str]] = None, seeds : T.Iterable[T.Optional[int]] = (None,),
+				   parameters : T.Dict[str, T.Iterable[T.Any]] = None, extra_env : T.Dict[str, T.Iterable[str]] = None,
+				   split_testcases : bool = False) -> T.List[RegressionJob]:
+		"""
+		Add one job per combination of seeds, parameter values and environment values::
+
+			runner.add_matrix("test_spi", seeds=range(4), extra_env={"SPI_MODE" : ["0","1","2","3"]})
+			# 16 jobs
+
+		:param test_module: Test module to run
+		:param testcases: Testcases to run, all of them if None
+		:param seeds: Seeds to use
+		:param parameters: Lists of values to use for each HDL parameter
+		:param extra_env: Lists of values to use for each environment variable
+		:param split_testcases: Run each testcase in its own job
+		:return: The added jobs
+		"""
+		parameters = parameters if parameters is not None else dict()
+		extra_env = extra_env if extra_env is not None else dict()
+		tc_sets = [[t] for t in testcases] if split_testcases and testcases else [testcases]
+
+		ret = list()
+		pnames = list(parameters.keys())
+		enames = list(extra_env.keys())
+		for tcs, seed, pvals, evals in itertools.product(tc_sets, seeds,
+				itertools.product(*parameters.values()), itertools.product(*extra_env.values())) :
+			ret.append(self.add(RegressionJob(
+				test_module=test_module,
+				testcases=tcs,
+				seed=seed,
+				parameters=dict(zip(pnames, pvals)),
+				extra_env={k : str(v) for k, v in zip(enames, evals)}
+			)))
+		return ret
+
+	def _build_dir(self, job : RegressionJob) -> str:
+		return os.path.join(self.work_dir, "build", job.build_key)
+
+	def run(self) -> RegressionSummary:
+		"""
+		Build the required designs then run all the jobs.
+		:return: The summary of the regression
+		"""
+		start = time.perf_counter()
+		builds = {self._build_dir(j) : j.parameters for j in self.jobs}
+		with ProcessPoolExecutor(max_workers=self.workers) as pool :
+			for f in [pool.submit(_build, self.simulator, bdir, self.sources, self.hdl_toplevel, params, self.build_args)
+					  for bdir, params in builds.items()] :
+				f.result()
+
+			# The job index keeps the test directories unique even if a job is added twice
+			futures = [pool.submit(_run_job, self.simulator, self._build_dir(j), os.path.join(self.work_dir, "tests", f"{i:04d}_{j.name}"),
+								   self.hdl_toplevel, j, self.test_args) for i, j in enumerate(self.jobs)]
+			results = [f.result() for f in futures]
+
+		return RegressionSummary(results, time.perf_counter() - start)
@@ -0,0 +1,15 @@
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .kernel import StandinSimulator, StandinCallback
+	from .handles import StandinSignalHandle, StandinScopeHandle
+
+__all__ = ["StandinSimulator", "StandinCallback", "StandinSignalHandle", "StandinScopeHandle"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"StandinSimulator" : ".kernel",
+	"StandinCallback" : ".kernel",
+	"StandinSignalHandle" : ".handles",
+	"StandinScopeHandle" : ".handles",
+})
@@ -0,0 +1,174 @@
+import typing as T
+
+from cocotb import simulator as gpi
+
+if T.TYPE_CHECKING :
+	from .kernel import StandinSimulator
+
+
+class StandinSignalHandle:
+	"""Values of the set action argument of set_signal_val_*, as passed by cocotb"""
+	DEPOSIT = 0
+	FORCE = 1
+	RELEASE = 2
+
+	def __init__(self, kernel : "StandinSimulator", name : str, width : int = 1, value : T.Optional[int] = 0, signal_type : int = gpi.NET):
+		"""
+		Stand-in for the GPI handle of a signal, wrapped by cocotb in a ModifiableObject.
+		The value is held as a binary string, so X and Z values are supported.
+		:param kernel: Stand-in simulator notified of the value changes
+		:param name: Name of the signal
+		:param width: Number of bits
+		:param value: Initial value, None for X
+		:param signal_type: GPI type, gpi.NET or gpi.REG
+		"""
+		self.kernel = kernel
+		self.name = name
+		self.width = width
+		self.signal_type = signal_type
+		self._binstr = "x" * width if value is None else self._to_binstr(value)
+		self._forced = False
+
+		"""Loopback connections : (target handle, delay in steps, optional value transform)"""
+		self.fanout : T.List[T.Tuple["StandinSignalHandle", int, T.Optional[T.Callable[[int], int]]]] = list()
+
+		"""Number of value changes"""
+		self.changes = 0
+
+	def _to_binstr(self, value : int) -> str:
+		return format(value & ((1 << self.width) - 1), f"0{self.width}b")
+
+	@property
+	def binstr(self) -> str:
+		return self._binstr
+
+	@property
+	def integer(self) -> int:
+		return int(self._binstr, 2)
+
+	def drive(self, binstr : str):
+		"""
+		Change the value of the signal and notify the kernel if it actually changed.
+		Used by the writes from cocotb and by the loopback connections.
+		:param binstr: New value as a binary string of the signal width
+		"""
+		if binstr == self._binstr :
+			return
+		old = self._binstr
+		self._binstr = binstr
+		self.changes += 1
+		self.kernel._value_changed(self, old)
+
+	# GPI handle interface used by cocotb
+	def get_name_string(self) -> str:
+		return self.name
+
+	def get_type_string(self) -> str:
+		return "GPI_NET" if self.signal_type == gpi.NET else "GPI_REGISTER"
+
+	def get_type(self) -> int:
+		return self.signal_type
+
+	def get_const(self) -> bool:
+		return False
+
+	def get_definition_name(self) -> str:
+		return ""
+
+	def get_definition_file(self) -> str:
+		return ""
+
+	def get_num_elems(self) -> int:
+		return self.width
+
+	def get_range(self) -> T.Tuple[int, int]:
+		return (self.width - 1, 0)
+
+	def get_signal_val_binstr(self) -> str:
+		return self._binstr
+
+	def get_signal_val_long(self) -> int:
+		return int(self._binstr, 2)
+
+	def _set(self, action : int, binstr : str):
+		if action == self.RELEASE :
+			self._forced = False
+			return
+		if action == self.FORCE :
+			self._forced = True
+		elif self._forced :
+			return
+		self.drive(binstr)
+
+	def set_signal_val_int(self, action : int, value : int):
+		self._set(action, self._to_binstr(value))
+
+	def set_signal_val_binstr(self, action : int, value : str):
+		if len(value) != self.width :
+			raise ValueError(f"Invalid value {value!r} for the {self.width} bits signal {self.name}")
+		self._set(action, value.lower())
+
+	def iterate(self, mode : int) -> T.Iterator:
+		return iter(())
+
+	def get_handle_by_name(self, name : str):
+		return None
+
+	def get_handle_by_index(self, index : int):
+		return None
+
+	def __repr__(self):
+		return f"<StandinSignalHandle {self.name}[{self.width}] = {self._binstr}>"
+
+
+class StandinScopeHandle:
+	def __init__(self, name : str, path : T.Optional[str] = None):
+		"""
+		Stand-in for the GPI handle of a module, wrapped by cocotb in a HierarchyObject.
+		:param name: Name of the scope
+		:param path: Hierarchical path of the scope, default to its name
+		"""
+		self.name = name
+		self.path = path if path is not None else name
+		self.children : T.Dict[str, T.Union[StandinSignalHandle, "StandinScopeHandle"]] = dict()
+
+	def add(self, handle : T.Union[StandinSignalHandle, "StandinScopeHandle"]):
+		if handle.name in self.children :
+			raise ValueError(f"Scope {self.name} already holds an object named {handle.name}")
+		self.children[handle.name] = handle
+		return handle
+
+	def get_name_string(self) -> str:
+		return self.name
+
+	def get_type_string(self) -> str:
+		return "GPI_MODULE"
+
+	def get_type(self) -> int:
+		return gpi.MODULE
+
+	def get_const(self) -> bool:
+		return False
+
+	def get_definition_name(self) -> str:
+		return self.name
+
+	def get_definition_file(self) -> str:
+		return ""
+
+	def get_num_elems(self) -> int:
+		return len(self.children)
+
+	def iterate(self, mode : int) -> T.Iterator:
+		if mode != gpi.OBJECTS :
+			return iter(())
+		return iter(list(self.children.values()))
+
+	def get_handle_by_name(self, name : str):
+		return self.children.get(name)
+
+	def get_handle_by_index(self, index : int):
+		return None
+
+	def __repr__(self):
+		return f"<StandinScopeHandle {self.name} ({len(self.children)} objects)>"
@@ -0,0 +1,412 @@
+import heapq
+import itertools
+import logging
+import types
+import typing as T
+
+import cocotb
+import cocotb.handle
+import cocotb.log
+import cocotb.triggers
+import cocotb.utils
+from cocotb import simulator as gpi
+from cocotb.handle import SimHandle, ModifiableObject, HierarchyObject
+from cocotb.result import SimTimeoutError
+from cocotb.scheduler import Scheduler
+from cocotb.task import Task
+
+from .handles import StandinSignalHandle, StandinScopeHandle
+
+
+class StandinCallback:
+	__slots__ = ("func", "args", "active", "edge")
+
+	def __init__(self, func : T.Callable, args : tuple, edge : int = 0):
+		"""
+		Stand-in for a GPI callback handle, returned by the register_*_callback functions.
+		Callbacks are one-shot, as the GPI ones.
+		"""
+		self.func = func
+		self.args = args
+		self.active = True
+		self.edge = edge
+
+	def deregister(self):
+		self.active = False
+
+
+class StandinSimulator:
+	"""cocotb modules whose `simulator` global is replaced by the stand-in"""
+	_patched_modules = [cocotb.triggers, cocotb.utils, cocotb.handle, cocotb.log]
+
+	"""Edge types, as passed by the cocotb edge triggers"""
+	RISING = 1
+	FALLING = 2
+	VALUE_CHANGE = 3
+
+	def __init__(self, toplevel : str = "dut", precision : int = -12):
+		"""
+		In-process, pure-Python stand-in for an HDL simulator.
+
+		It implements the GPI functions cocotb calls on its `simulator` module (timed, read-write, read-only, next
+		time step and value change callbacks, simulation time and precision). The genuine cocotb scheduler then runs on
+		top of it, so all the cocotb triggers (Timer, RisingEdge, FallingEdge, Edge, ReadOnly, ReadWrite,
+		NextTimeStep, First, Combine, ClockCycles, Event, ...), Clock and the write scheduling behave as usual.
+
+		There is no HDL : signals are created from Python and may be wired to each other (loopback) so a driver and a
+		monitor can talk together::
+
+			sim = StandinSimulator()
+			clk = sim.signal("clk")
+			mosi = sim.signal("mosi")
+			miso = sim.signal("miso")
+			sim.connect(mosi, miso)
+
+			async def test():
+				...
+
+			sim.run(test(), timeout=(1, "ms"))
+
+		Each time step runs the timed callbacks, then delta cycles (value changes and read-write callbacks) until the
+		signals are stable, then the read-only callbacks.
+
+		:param toplevel: Name of the root scope, available as sim.dut
+		:param precision: Simulation precision, as a power of 10 of seconds (-12 is 1ps)
+		"""
+		self.toplevel = toplevel
+		self.precision = precision
+
+		"""Current simulation time, in steps"""
+		self.now = 0
+
+		self.root = StandinScopeHandle(toplevel)
+
+		self._seq = itertools.count()
+		self._timed : T.List[T.Tuple[int, int, StandinCallback]] = list()
+		self._nextstep : T.List[StandinCallback] = list()
+		self._rw : T.List[StandinCallback] = list()
+		self._ro : T.List[StandinCallback] = list()
+		self._value_cbs : T.Dict[StandinSignalHandle, T.List[StandinCallback]] = dict()
+		self._changes : T.List[T.Tuple[StandinSignalHandle, str]] = list()
+
+		"""Read-write and read-only callbacks registered during the read-only phase, run on the next time step"""
+		self._readonly = False
+		self._rw_next : T.List[StandinCallback] = list()
+		self._ro_next : T.List[StandinCallback] = list()
+
+		self._saved : T.Optional[T.Dict[str, T.Any]] = None
+		self._test_done = False
+		self._stop = False
+
+		self.stats = {
+			"timesteps" : 0,
+			"deltas" : 0,
+			"value_changes" : 0,
+			"callbacks" : {"timed" : 0, "nextstep" : 0, "rwsynch" : 0, "readonly" : 0, "value_change" : 0},
+		}
+
+	# GPI interface, as seen by cocotb through its `simulator` module
+	def __getattr__(self, name : str):
+		# GPI constants (MODULE, NET, OBJECTS, ...)
+		if name.isupper() :
+			return getattr(gpi, name)
+		raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
+	def get_precision(self) -> int:
+		return self.precision
+
+	def get_sim_time(self) -> T.Tuple[int, int]:
+		return (self.now >> 32, self.now & 0xFFFFFFFF)
+
+	def get_root_handle(self, name : T.Optional[str] = None) -> T.Optional[StandinScopeHandle]:
+		return self.root if name is None or name == self.toplevel else None
+
+	def get_simulator_product(self) -> str:
+		return "vipyhdl stand-in"
+
+	def get_simulator_version(self) -> str:
+		return "1"
+
+	def is_running(self) -> bool:
+		return self._saved is not None
+
+	def log_level(self, level : int):
+		pass
+
+	def log_msg(self, *args):
+		pass
+
+	def stop_simulator(self):
+		self._stop = True
+
+	def register_timed_callback(self, steps : int, func : T.Callable, *args) -> StandinCallback:
+		cb = StandinCallback(func, args)
+		heapq.heappush(self._timed, (self.now + int(steps), next(self._seq), cb))
+		return cb
+
+	def register_rwsynch_callback(self, func : T.Callable, *args) -> StandinCallback:
+		cb = StandinCallback(func, args)
+		(self._rw_next if self._readonly else self._rw).append(cb)
+		return cb
+
+	def register_readonly_callback(self, func : T.Callable, *args) -> StandinCallback:
+		cb = StandinCallback(func, args)
+		(self._ro_next if self._readonly else self._ro).append(cb)
+		return cb
+
+	def register_nextstep_callback(self, func : T.Callable, *args) -> StandinCallback:
+		cb = StandinCallback(func, args)
+		self._nextstep.append(cb)
+		return cb
+
+	def register_value_change_callback(self, handle : StandinSignalHandle, func : T.Callable, edge : int, *args) -> StandinCallback:
+		cb = StandinCallback(func, args, edge)
+		self._value_cbs.setdefault(handle, list()).append(cb)
+		return cb
+
+	# Design construction
+	@property
+	def dut(self) -> HierarchyObject:
+		""":return: The root scope, wrapped by cocotb"""
+		return SimHandle(self.root)
+
+	def scope(self, name : str, parent : T.Optional[StandinScopeHandle] = None) -> StandinScopeHandle:
+		"""
+		Create a sub-scope, reachable through the cocotb hierarchy (sim.dut.<name>)
+		:param name: Name of the scope
+		:param parent: Parent scope, the root scope by default
+		:return: The created scope handle, to be passed to signal()
+		"""
+		parent = parent if parent is not None else self.root
+		return parent.add(StandinScopeHandle(name, f"{parent.path}.{name}"))
+
+	def signal(self, name : str, width : int = 1, value : T.Optional[int] = 0, scope : T.Optional[StandinScopeHandle] = None) -> ModifiableObject:
+		"""
+		Create a signal.
+		:param name: Name of the signal
+		:param width: Number of bits
+		:param value: Initial value, None for X
+		:param scope: Scope holding the signal, the root scope by default
+		:return: The signal, as a cocotb ModifiableObject
+		"""
+		scope = scope if scope is not None else self.root
+		handle = scope.add(StandinSignalHandle(self, name, width, value))
+		return SimHandle(handle, f"{scope.path}.{name}")
+
+	@staticmethod
+	def _gpi_handle(signal : T.Union[ModifiableObject, StandinSignalHandle]) -> StandinSignalHandle:
+		handle = signal._handle if isinstance(signal, ModifiableObject) else signal
+		if not isinstance(handle, StandinSignalHandle) :
+			raise TypeError(f"{signal!r} is not a stand-in signal")
+		return handle
+
+	def connect(self, src : T.Union[ModifiableObject, StandinSignalHandle], dst : T.Union[ModifiableObject, StandinSignalHandle],
+				delay : int = 0, transform : T.Optional[T.Callable[[int], int]] = None):
+		"""
+		Wire src to dst (loopback) : each value change of src is copied to dst.
+		:param src: Source signal
+		:param dst: Destination signal, shall have the same width unless a transform is provided
+		:param delay: Propagation delay, in steps. 0 propagates in the same delta cycle.
+		:param transform: Function applied to the integer value of src, X and Z are then propagated as X.
+		"""
+		src = self._gpi_handle(src)
+		dst = self._gpi_handle(dst)
+		if transform is None and src.width != dst.width :
+			raise ValueError(f"Cannot connect {src.name}[{src.width}] to {dst.name}[{dst.width}] without a transform")
+		src.fanout.append((dst, delay, transform))
+		self._propagate(src, dst, delay, transform)
+
+	def _propagate(self, src : StandinSignalHandle, dst : StandinSignalHandle, delay : int, transform):
+		binstr = src.binstr
+		if transform is not None :
+			try :
+				binstr = dst._to_binstr(transform(int(binstr, 2)))
+			except ValueError :
+				binstr = "x" * dst.width
+		if delay == 0 :
+			dst.drive(binstr)
+		else :
+			self.register_timed_callback(delay, dst.drive, binstr)
+
+	def _value_changed(self, handle : StandinSignalHandle, old : str):
+		self.stats["value_changes"] += 1
+		self._changes.append((handle, old))
+		for dst, delay, transform in handle.fanout :
+			self._propagate(handle, dst, delay, transform)
+
+	# Kernel
+	def _fire(self, cbs : T.Iterable[StandinCallback], kind : str):
+		for cb in cbs :
+			if cb.active :
+				cb.active = False
+				self.stats["callbacks"][kind] += 1
+				cb.func(*cb.args)
+
+	def _fire_value_changes(self):
+		changes = self._changes
+		self._changes = list()
+		for handle, old in changes :
+			cbs = self._value_cbs.get(handle)
+			if not cbs :
+				continue
+			new = handle.binstr
+			rising = old[-1] != "1" and new[-1] == "1"
+			falling = old[-1] != "0" and new[-1] == "0"
+			fired = [cb for cb in cbs if cb.active and (cb.edge == self.VALUE_CHANGE or (cb.edge == self.RISING and rising) or (cb.edge == self.FALLING and falling))]
+			self._value_cbs[handle] = [cb for cb in cbs if cb.active and cb not in fired]
+			self._fire(fired, "value_change")
+
+	def _pending_now(self) -> bool:
+		return len(self._timed) > 0 and self._timed[0][0] <= self.now
+
+	def _run_timestep(self):
+		"""Run the current time step until nothing is left to do at this time"""
+		self.stats["timesteps"] += 1
+		while True :
+			while self._pending_now() :
+				_, _, cb = heapq.heappop(self._timed)
+				self._fire([cb], "timed")
+
+			while self._changes or self._rw :
+				self.stats["deltas"] += 1
+				self._fire_value_changes()
+				if self._rw :
+					cbs = self._rw
+					self._rw = list()
+					self._fire(cbs, "rwsynch")
+				while self._pending_now() :
+					_, _, cb = heapq.heappop(self._timed)
+					self._fire([cb], "timed")
+
+			if self._ro :
+				cbs = self._ro
+				self._ro = list()
+				self._readonly = True
+				try :
+					self._fire(cbs, "readonly")
+				finally :
+					self._readonly = False
+
+			if not (self._changes or self._rw or self._ro or self._pending_now()) :
+				return
+
+	def step(self) -> bool:
+		"""
+		Run the current time step and advance to the next one.
+		:return: False if there is nothing left to simulate
+		"""
+		self._run_timestep()
+		while self._timed and not self._timed[0][2].active :
+			heapq.heappop(self._timed)
+
+		# Unlike most simulators, pending NextTimeStep triggers alone keep the simulation going, one step later
+		deferred = self._rw_next or self._ro_next or self._nextstep
+		if not self._timed and not deferred :
+			return False
+
+		self.now = self._timed[0][0] if self._timed and not (self._rw_next or self._ro_next) else self.now + 1
+		if deferred and self._timed :
+			self.now = min(self.now, self._timed[0][0])
+		self._rw.extend(self._rw_next)
+		self._ro.extend(self._ro_next)
+		self._rw_next.clear()
+		self._ro_next.clear()
+		cbs = self._nextstep
+		self._nextstep = list()
+		self._fire(cbs, "nextstep")
+		return True
+
+	def _handle_result(self, test : Task):
+		self._test_done = True
+
+	# Installation
+	def install(self):
+		"""
+		Plug the stand-in below cocotb, with a fresh scheduler.
+		Prefer using the simulator as a context manager, or run() which installs it as required.
+		"""
+		if self._saved is not None :
+			return
+		self._saved = {
+			"modules" : [(m, m.simulator) for m in self._patched_modules],
+			"precision" : cocotb.utils._get_simulator_precision,
+			"scheduler" : cocotb.scheduler,
+			"top" : cocotb.top,
+			"log" : cocotb.log,
+			"sim_name" : getattr(cocotb, "SIM_NAME", None),
+		}
+		for m in self._patched_modules :
+			m.simulator = self
+		cocotb.utils._get_simulator_precision = self.get_precision
+		if isinstance(cocotb.log, types.ModuleType) :
+			cocotb.log = logging.getLogger("cocotb")
+		cocotb.SIM_NAME = self.get_simulator_product()
+		cocotb.top = self.dut
+		cocotb.scheduler = Scheduler(handle_result=self._handle_result)
+
+	def uninstall(self):
+		"""Restore cocotb as it was before install()"""
+		if self._saved is None :
+			return
+		for m, sim in self._saved["modules"] :
+			m.simulator = sim
+		cocotb.utils._get_simulator_precision = self._saved["precision"]
+		cocotb.scheduler = self._saved["scheduler"]
+		cocotb.top = self._saved["top"]
+		cocotb.log = self._saved["log"]
+		cocotb.SIM_NAME = self._saved["sim_name"]
+		self._saved = None
+
+	def __enter__(self) -> "StandinSimulator":
+		self.install()
+		return self
+
+	def __exit__(self, *exc_info):
+		self.uninstall()
+
+	def run(self, coro : T.Coroutine, timeout : T.Optional[T.Tuple[int, str]] = None) -> T.Any:
+		"""
+		Run a coroutine as a cocotb test, until it returns.
+		All the tasks started by the test are killed at its end, as with a regular cocotb test.
+		:param coro: Test coroutine
+		:param timeout: Maximum simulation time, relative to the current time, as a (value, unit) tuple.
+		:return: The test result
+		:raises SimTimeoutError: if the timeout is reached
+		:raises RuntimeError: if the simulation runs out of events before the end of the test
+		:raises Exception: any exception raised by the test or by its tasks
+		"""
+		self.install()
+		deadline = None
+		if timeout is not None :
+			deadline = self.now + cocotb.utils.get_sim_steps(*timeout)
+
+		test = cocotb.scheduler.create_task(coro)
+		self._test_done = False
+		self._stop = False
+		cocotb.scheduler._add_test(test)
+		aborted = False
+		while not self._test_done :
+			if self._stop and not aborted :
+				aborted = True
+				cocotb.scheduler._finish_test(RuntimeError("Simulation stopped by stop_simulator()"))
+			if not self.step() :
+				if self._test_done :
+					break
+				if aborted :
+					raise RuntimeError("Stand-in simulator failed to terminate the test")
+				aborted = True
+				cocotb.scheduler._finish_test(RuntimeError(f"Stand-in simulation ran out of events at {self.now} steps, the test is stuck"))
+			elif deadline is not None and self.now > deadline and not aborted :
+				aborted = True
+				cocotb.scheduler._finish_test(SimTimeoutError(f"Test timed out after {timeout[0]} {timeout[1]}"))
+
+		# Drop whatever the killed tasks left behind
+		self._timed.clear()
+		self._nextstep.clear()
+		self._rw.clear()
+		self._ro.clear()
+		self._rw_next.clear()
+		self._ro_next.clear()
+		self._value_cbs.clear()
+		self._changes.clear()
+		return test.result()
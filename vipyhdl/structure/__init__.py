@@ -1,6 +1,32 @@
-from .globalenv import GlobalEnv, VipyLogAdapter
-from .component import Component
-from .driver import GenericDriver
-from .monitor import Monitor
-from .checker import Checker
-from .driver import drive_method
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .globalenv import GlobalEnv, VipyLogAdapter
+	from .component import Component
+	from .driver import GenericDriver
+	from .monitor import Monitor
+	from .checker import Checker
+	from .driver import drive_method
+	from .tasks import TaskRegistry, TaskStats
+	from .writes import WriteBuffer
+	from .handles import HandleInfo, handle_info, bind_interface, scope_handles
+
+__all__ = ["GlobalEnv", "VipyLogAdapter", "Component", "GenericDriver", "Monitor", "Checker", "drive_method", "TaskRegistry", "TaskStats", "WriteBuffer", "HandleInfo", "handle_info", "bind_interface", "scope_handles"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"GlobalEnv" : ".globalenv",
+	"VipyLogAdapter" : ".globalenv",
+	"Component" : ".component",
+	"GenericDriver" : ".driver",
+	"Monitor" : ".monitor",
+	"Checker" : ".checker",
+	"drive_method" : ".driver",
+	"TaskRegistry" : ".tasks",
+	"TaskStats" : ".tasks",
+	"WriteBuffer" : ".writes",
+	"HandleInfo" : ".handles",
+	"handle_info" : ".handles",
+	"bind_interface" : ".handles",
+	"scope_handles" : ".handles",
+})
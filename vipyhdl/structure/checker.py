@@ -1,17 +1,12 @@
 import typing as T
 
-import logging
-
-
-import cocotb
-import functools
-from dataclasses import *
+from dataclasses import fields
 from fnmatch import fnmatch
 from . import  Component
 from abc import ABC, abstractmethod
 
-from cocotb.triggers import *
-from cocotb.handle import *
+from cocotb.triggers import Trigger, Event, First, ReadOnly, Edge
+from cocotb.handle import ModifiableObject
 from cocotb import Task
 
 
@@ -45,7 +40,7 @@ class Checker(Component, ABC) :
 			return
 		if self._run_process is not None :
 			self.stop()
-		self._run_process = cocotb.start_soon(self._run())
+		self._run_process = self.start_task(self._run())
 
 	def stop(self):
 		if self._run_process is not None:
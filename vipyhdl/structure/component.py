@@ -1,10 +1,13 @@
 import cocotb
-from cocotb.triggers import *
+from cocotb.triggers import Event, Combine
 
 from .globalenv import GlobalEnv, VipyLogAdapter
-from dataclasses import  *
+from .handles import HandleInfo, handle_info
+from dataclasses import fields, is_dataclass
 import typing as T
 
+from vipyhdl.utils.queue import QueueEvt, DataPort, BroadcastPort
+
 class Component(object):
 	def __init__(self):
 		"""
@@ -19,6 +22,9 @@ class Component(object):
 		"""Hold the interface. Typically a dataclass containing multiple cocotb.ModifiableObject"""
 		self.itf  = None
 
+		"""Static metadata of the interface handles, see itf_info"""
+		self._itf_info : T.Optional[T.Dict[str, HandleInfo]] = None
+
 		"""Provide a logger. By default, cocotb logger is used. Is updated by the build step"""
 		self._log : VipyLogAdapter = cocotb.log
 
@@ -44,6 +50,21 @@ class Component(object):
 			GlobalEnv()._namelen = max(GlobalEnv()._namelen,len(self._name))
 			self._refresh_sub_names()
 
+	@property
+	def itf_info(self) -> T.Dict[str, HandleInfo]:
+		"""
+		:return: The static metadata (width, path...) of the handles of the interface dataclass, by field name.
+		Scanned once, at the build at the latest, so hot paths never query the simulator for them.
+		"""
+		if self._itf_info is None :
+			self._itf_info = dict()
+			if self.itf is not None and is_dataclass(self.itf) :
+				for f in fields(self.itf) :
+					handle = getattr(self.itf, f.name)
+					if hasattr(handle, "_path") :
+						self._itf_info[f.name] = handle_info(handle)
+		return self._itf_info
+
 	@property
 	def subcomponents(self) -> T.Iterable["Component"]:
 		"""
@@ -51,6 +72,15 @@ class Component(object):
 		"""
 		return [x for name, x in vars(self).items() if not name.startswith("_") and isinstance(x,Component)]
 
+	@property
+	def hierarchy(self) -> T.Iterator["Component"]:
+		"""
+		:return: Iterator on the current component and all of its subcomponents, recursively. Parents come first.
+		"""
+		yield self
+		for comp in self.subcomponents :
+			yield from comp.hierarchy
+
 	@property
 	def is_driver(self) -> bool:
 		"""
@@ -79,6 +109,31 @@ class Component(object):
 		"""
 		pass
 
+	def arm(self):
+		"""
+		Start the background tasks that shall live as long as the component, regardless of resets.
+		Called at the end of the build and by GlobalEnv().rearm(), after teardown.
+		Subcomponents are armed on their own.
+		"""
+		pass
+
+	def teardown(self):
+		"""
+		Bring the component back to an idle state, without touching the build :
+		  - kill all the tasks owned by the component,
+		  - drop the content of all the queues and data ports held by the component,
+		  - clear all the events held by the component or by its evt dataclass.
+		Subcomponents are teared down on their own.
+		"""
+		GlobalEnv().tasks.kill_all(self)
+		members = list(vars(self).values())
+		evt = getattr(self, "evt", None)
+		if evt is not None and is_dataclass(evt) :
+			members.extend([getattr(evt, f.name) for f in fields(evt)])
+		for m in members :
+			if isinstance(m, (QueueEvt, DataPort, BroadcastPort, Event)) :
+				m.clear()
+
 	def build(self):
 		"""
 		Perform the bench build and elaboration.
@@ -106,12 +161,15 @@ class Component(object):
 
 		self._log = VipyLogAdapter(self)
 		self._log.debug(f"Set vipyhdl logger for component {self.name}")
+		self._itf_info = None
+		self.itf_info
 
 		self._refresh_sub_names()
 		for comp in self.subcomponents :
 			comp.build()
 
 		self.post_build()
+		self.arm()
 
 		# Report the build process
 		active_state = "  ACTIVE" if self.is_active else "INACTIVE"
@@ -119,6 +177,7 @@ class Component(object):
 		GlobalEnv()._log.lhigh(log_line) if self.is_active else GlobalEnv()._log.llow(log_line)
 
 		if GlobalEnv().top is self :
+			GlobalEnv().built = True
 			GlobalEnv()._log.lhigh(f"{' BUILD ENV COMPLETE ':#^80s}")
 			GlobalEnv()._log.lhigh(f"")
 
@@ -182,6 +241,31 @@ class Component(object):
 		"""
 		return [x for x in self.subcomponents if not (x.is_monitor or x.is_checker or x.is_driver)]
 
+	def start_task(self, coro, name : T.Optional[str] = None) -> cocotb.Task:
+		"""
+		Schedule a background task owned by this component, through the GlobalEnv task registry.
+		:param coro: Coroutine to run
+		:param name: Name of the task, default to the coroutine name.
+		:return: The created task
+		"""
+		return GlobalEnv().tasks.start_soon(self, coro, name)
+
+	async def start_task_now(self, coro, name : T.Optional[str] = None) -> cocotb.Task:
+		"""
+		Same as start_task, but yield control to the new task right away (see cocotb.start).
+		:param coro: Coroutine to run
+		:param name: Name of the task, default to the coroutine name.
+		:return: The created task
+		"""
+		return await GlobalEnv().tasks.start(self, coro, name)
+
+	@property
+	def live_tasks(self) -> int:
+		"""
+		:return: The number of running tasks owned by this component (subcomponents excluded)
+		"""
+		return GlobalEnv().tasks.live_count(self)
+
 	@property
 	def is_active(self):
 		"""
@@ -206,7 +290,7 @@ class Component(object):
 		rst_process_list = list()
 		self._log.debug(f"Reseting drivers for {self.name}")
 		for d in self.drivers :
-			rst_process_list.append(cocotb.start_soon(d.reset()).join())
+			rst_process_list.append(d.start_task(d.reset(),"reset").join())
 
 		if len(rst_process_list) > 0 :
 			await Combine(*rst_process_list)
@@ -218,7 +302,7 @@ class Component(object):
 		rst_process_list = list()
 		self._log.debug(f"Reseting monitors for {self.name}")
 		for d in self.monitors :
-			rst_process_list.append(cocotb.start_soon(d.reset()).join())
+			rst_process_list.append(d.start_task(d.reset(),"reset").join())
 
 		if len(rst_process_list) > 0 :
 			await Combine(*rst_process_list)
@@ -230,7 +314,7 @@ class Component(object):
 		rst_process_list = list()
 		self._log.debug(f"Reseting checkers for {self.name}")
 		for d in self.checkers :
-			rst_process_list.append(cocotb.start_soon(d.reset()).join())
+			rst_process_list.append(d.start_task(d.reset(),"reset").join())
 
 		if len(rst_process_list) > 0 :
 			await Combine(*rst_process_list)
@@ -242,7 +326,7 @@ class Component(object):
 		rst_process_list = list()
 		self._log.debug(f"Reseting simples components for {self.name}")
 		for d in self.simplecomponents :
-			rst_process_list.append(cocotb.start_soon(d.reset()).join())
+			rst_process_list.append(d.start_task(d.reset(),"reset").join())
 
 		if len(rst_process_list) > 0 :
 			await Combine(*rst_process_list)
@@ -252,8 +336,8 @@ class Component(object):
 		Parallel reset and await for the end of the reset of all subcomponents
 		"""
 		rst_process_list = list()
-		rst_process_list.append(cocotb.start_soon(self.reset_drivers()).join())
-		rst_process_list.append(cocotb.start_soon(self.reset_monitor()).join())
-		rst_process_list.append(cocotb.start_soon(self.reset_checkers()).join())
-		rst_process_list.append(cocotb.start_soon(self.reset_components()).join())
+		rst_process_list.append(self.start_task(self.reset_drivers()).join())
+		rst_process_list.append(self.start_task(self.reset_monitor()).join())
+		rst_process_list.append(self.start_task(self.reset_checkers()).join())
+		rst_process_list.append(self.start_task(self.reset_components()).join())
 		await Combine(*rst_process_list)
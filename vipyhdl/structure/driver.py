@@ -4,8 +4,7 @@ from .globalenv import GlobalEnv
 from cocotb.handle import ModifiableObject
 import typing as T
 import functools
-from dataclasses import *
-from fnmatch import fnmatch
+from .handles import interface_fields
 
 def drive_method(func):
 	"""
@@ -31,6 +30,9 @@ class GenericDriver(Component):
 		super().__init__()
 		self._driven_signals = set()
 
+		"""Write-combining buffer of the environment, see write_signal"""
+		self._writes = GlobalEnv().writes
+
 
 	@property
 	def is_driver(self) -> bool:
@@ -58,6 +60,16 @@ class GenericDriver(Component):
 			self._build_active = GlobalEnv().register_driver(self)
 		super().build()
 
+	def write_signal(self, signal : ModifiableObject, value):
+		"""
+		Write a net through the write-combining buffer of the environment.
+		If write-combining is disabled, this is the same as signal.value = value.
+
+		:param signal: Net to write
+		:param value: Value to write
+		"""
+		self._writes.write(signal, value)
+
 	def register_signal_as_driven(self,signal : ModifiableObject):
 		"""
 		Register a signal as being driven by the current driver.
@@ -77,8 +89,8 @@ class GenericDriver(Component):
 
 		:param pattern: Unix-style pattern, supporting wildcards. Example : "i_*"
 		"""
-		for signal in [getattr(self.itf, field.name) for field in fields(self.itf) if pattern is None or fnmatch(field.name,pattern)] :
-			self.register_signal_as_driven(signal)
+		for name in interface_fields(type(self.itf), pattern) :
+			self.register_signal_as_driven(getattr(self.itf, name))
 
 	def register_remaining_signals_as_driven(self,pattern = None):
 		"""
@@ -94,7 +106,7 @@ class GenericDriver(Component):
 		drv : "GenericDriver"
 		for drv in self.drivers :
 			driven_signals.extend(drv.driven_signals)
-		for signal in [getattr(self.itf, field.name) for field in fields(self.itf) if pattern is None or fnmatch(field.name,pattern)] :
+		for signal in [getattr(self.itf, name) for name in interface_fields(type(self.itf), pattern)] :
 			if signal in driven_signals :
 				continue
 			self.register_signal_as_driven(signal)
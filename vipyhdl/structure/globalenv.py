@@ -1,13 +1,16 @@
+import atexit
 import logging
 
 from vipyhdl.utils.meta import Singleton
 import typing as T
 from cocotb.handle import ModifiableObject
-import cocotb
 from cocotb.log import SimBaseLog, SimLogFormatter
-from logging import LoggerAdapter, Filter
+from logging import LoggerAdapter
 import os
 from inspect import getmodule
+from .tasks import TaskRegistry
+from .writes import WriteBuffer
+from .handles import clear_handle_cache
 
 
 class VipyLogAdapter(LoggerAdapter):
@@ -102,6 +105,14 @@ class GlobalEnv(metaclass=Singleton):
 		self.built = False
 		self.top = None
 
+		"""Registry through which all background tasks should be started"""
+		self.tasks = TaskRegistry()
+		if "VIPY_PROFILE_FILE" in os.environ :
+			atexit.register(self.tasks.dump, os.environ["VIPY_PROFILE_FILE"])
+
+		"""Write-combining buffer through which the drivers write their nets, disabled by default"""
+		self.writes = WriteBuffer(self.tasks)
+
 		self._ident_level = 0
 
 		mod = getmodule(SimBaseLog)
@@ -132,7 +143,18 @@ class GlobalEnv(metaclass=Singleton):
 		return True
 
 	def get_top(self,top_type,*args,topname="top",force=False,build=True,**kwargs):
-		if force or self.top is None :
+		"""
+		Get the environment top, building it if required.
+		The top is built only once per simulation, use rearm() between tests to reuse it.
+		:param top_type: Component type to use as top
+		:param topname: Name to give to the top
+		:param force: Tear the existing environment down and build a new top.
+		:param build: Build the new top.
+		:return: The environment top.
+		"""
+		if force and self.top is not None :
+			self.teardown()
+		if self.top is None :
 			ret = top_type(*args, **kwargs)
 			if build :
 				ret.name = topname
@@ -141,6 +163,48 @@ class GlobalEnv(metaclass=Singleton):
 		else :
 			return self.top
 
+	async def rearm(self):
+		"""
+		Bring the built environment back to its post-build state, typically at the start of each cocotb test :
+		  - kill all the tasks started through the task registry, including those left over by the previous test,
+		  - drop the writes pending in the write-combining buffer,
+		  - teardown then arm all the components of the hierarchy,
+		  - reset the top.
+
+		The build (naming, loggers and driven nets registry) is kept as is.
+		Objects which are not components (i.e. a standalone SPIMonitor) shall be restarted by their owner.
+		:raises RuntimeError: if no environment has been built.
+		"""
+		if self.top is None :
+			raise RuntimeError("Unable to rearm the environment as no top has been built.")
+
+		self._log.lhigh(f"{' REARM ENV ':#^80s}")
+		self.tasks.kill_all()
+		self.writes.clear()
+		components = list(self.top.hierarchy)
+		for comp in components :
+			comp.teardown()
+		for comp in components :
+			comp.arm()
+		await self.top.reset()
+
+	def teardown(self):
+		"""
+		Tear the whole environment down, allowing a new top to be built.
+		All tasks are killed, the driven nets registry and the handle metadata cache are emptied.
+		"""
+		if self.top is not None :
+			self._log.lhigh(f"{' TEARDOWN ENV ':#^80s}")
+			self.tasks.kill_all()
+			for comp in list(self.top.hierarchy) :
+				comp.teardown()
+		self.tasks.clear()
+		self.writes.clear()
+		self.signals_to_driver.clear()
+		clear_handle_cache()
+		self.top = None
+		self.built = False
+
 	@property
 	def log(self):
 		return self._log
@@ -0,0 +1,150 @@
+import functools
+import typing as T
+from dataclasses import dataclass, fields, MISSING
+from fnmatch import fnmatch
+
+from cocotb.handle import SimHandleBase, HierarchyObject, IntegerObject, EnumObject, RealObject
+
+
+@dataclass(frozen=True)
+class HandleInfo:
+	"""Static facts about a simulator handle, which never change during a simulation"""
+	name : str
+	path : str
+	"""Number of bits, of each element for arrays"""
+	width : int
+	"""Declared signedness, if reported by the simulator interface, else False"""
+	signed : bool = False
+	"""Index range (left, right) of array handles, None for plain signals"""
+	range : T.Optional[T.Tuple[int, int]] = None
+
+	@property
+	def is_array(self) -> bool:
+		return self.range is not None
+
+	@property
+	def length(self) -> int:
+		""":return: The number of elements of an array, 1 for plain signals"""
+		if self.range is None :
+			return 1
+		return abs(self.range[0] - self.range[1]) + 1
+
+	@property
+	def mask(self) -> int:
+		return (1 << self.width) - 1
+
+
+"""Metadata of all the handles seen so far, cleared on teardown"""
+_cache : T.Dict[SimHandleBase, HandleInfo] = dict()
+
+"""Width of the handles holding a single value of a fixed size, for which len() is the number of elements (1)"""
+_FIXED_WIDTHS = ((IntegerObject, 32), (EnumObject, 32), (RealObject, 64))
+
+
+def _width(handle : SimHandleBase) -> int:
+	""":return: The number of bits of a non-array handle"""
+	for handle_type, width in _FIXED_WIDTHS :
+		if isinstance(handle, handle_type) :
+			return width
+	return len(handle)
+
+
+def handle_info(handle : SimHandleBase) -> HandleInfo:
+	"""
+	Get the static metadata of a handle, fetched from the simulator on the first call only.
+	Unlike handle.value.n_bits, this does not read the value of the signal.
+	:param handle: Signal handle
+	:return: The handle metadata
+	"""
+	try :
+		return _cache[handle]
+	except KeyError :
+		pass
+
+	rng = tuple(handle._range) if getattr(handle, "_type", None) == "GPI_ARRAY" else None
+	width = _width(handle[rng[0]]) if rng is not None else _width(handle)
+	info = HandleInfo(
+		name=handle._name,
+		path=handle._path,
+		width=width,
+		signed=bool(getattr(handle, "is_signed", False)),
+		range=rng
+	)
+	_cache[handle] = info
+	return info
+
+
+"""Children of the scanned scopes, by name, cleared on teardown"""
+_scopes : T.Dict[HierarchyObject, T.Dict[str, SimHandleBase]] = dict()
+
+
+def clear_handle_cache():
+	"""Forget the handles seen so far, so that they are not kept alive across tops"""
+	_cache.clear()
+	_scopes.clear()
+
+
+def scope_handles(scope : HierarchyObject) -> T.Dict[str, SimHandleBase]:
+	"""
+	Scan a scope of the design hierarchy once and cache its children.
+	:param scope: Scope to scan, typically the DUT or one of its instances
+	:return: The handles of the scope, by name
+	"""
+	try :
+		return _scopes[scope]
+	except KeyError :
+		pass
+	ret = {h._name.split(".")[-1] : h for h in scope}
+	_scopes[scope] = ret
+	return ret
+
+
+@functools.lru_cache(maxsize=None)
+def interface_fields(itf_type : type, pattern : T.Optional[str] = None) -> T.Tuple[str, ...]:
+	"""
+	:param itf_type: Interface dataclass type
+	:param pattern: Unix-style pattern on the field names, all the fields if None
+	:return: The names of the matching fields, computed once per interface type and pattern
+	"""
+	return tuple(f.name for f in fields(itf_type) if pattern is None or fnmatch(f.name, pattern))
+
+
+def bind_interface(itf_type : type, scope : HierarchyObject, prefix : str = "", suffix : str = "",
+				   mapping : T.Optional[T.Dict[str, str]] = None):
+	"""
+	Build an interface dataclass from the signals of a scope, matched by name::
+
+		itf = bind_interface(SPIInterface, dut, prefix="spi_")
+		# SPIInterface(mosi=dut.spi_mosi, miso=dut.spi_miso, clk=dut.spi_clk, csn=dut.spi_csn)
+
+	The scope is only scanned once, so binding many instances of a VIP costs one dictionary lookup per field.
+	Fields with a default value are left to it if no signal matches, the others are required.
+
+	:param itf_type: Interface dataclass type
+	:param scope: Scope holding the signals
+	:param prefix: Prefix of the signal names
+	:param suffix: Suffix of the signal names
+	:param mapping: Signal names of some fields, used as is instead of the prefixed and suffixed field names
+	:return: The interface instance
+	:raises AttributeError: if a required field has no matching signal
+	"""
+	handles = scope_handles(scope)
+	mapping = mapping if mapping is not None else dict()
+	kwargs = dict()
+	missing = list()
+	for f in fields(itf_type) :
+		name = mapping.get(f.name, f"{prefix}{f.name}{suffix}")
+		handle = handles.get(name)
+		if handle is None :
+			# Signals hidden from the scope iteration (i.e. non public Verilator signals) may still be found by name
+			try :
+				handle = getattr(scope, name)
+			except AttributeError :
+				pass
+		if handle is not None :
+			kwargs[f.name] = handle
+		elif f.default is MISSING and f.default_factory is MISSING :
+			missing.append(name)
+	if len(missing) > 0 :
+		raise AttributeError(f"Unable to bind {itf_type.__name__} in {scope._path} : no signal named {', '.join(missing)}")
+	return itf_type(**kwargs)
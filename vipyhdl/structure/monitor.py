@@ -1,31 +1,24 @@
 import typing as T
 
-import logging
-
-
-import cocotb
-import functools
-from dataclasses import *
+from dataclasses import fields
 from fnmatch import fnmatch
 
-from cocotb.triggers import _Event
-
 from . import  Component
 from abc import ABC, abstractmethod
 
-from cocotb.triggers import *
-from cocotb.handle import *
+from cocotb.triggers import Trigger, Event, First, ReadOnly, Edge
+from cocotb.handle import ModifiableObject
 from cocotb import Task
 
+from vipyhdl.utils.event import make_pulse
+
 
 class Monitor(Component, ABC) :
 	def __init__(self):
 		super(Monitor, self).__init__()
 		self._sensitivity_list : T.List[Trigger] = list()
-		self._autoreset_events : T.List[Event] = list()
 
 		self._run_process : Task = None
-		self._autoreset_process = None
 		self.evt = None
 		self._trigger_event = None
 
@@ -57,20 +50,6 @@ class Monitor(Component, ABC) :
 			await ReadOnly()
 			self.monitor()
 
-	async def _autoreset_events_handler(self):
-		self._log.debug(f"Start autoclear event handler")
-		if len(self._autoreset_events) > 0 :
-			_trigger_events = [e.wait() for e in self._autoreset_events]
-			evt_trigger  : _Event = None
-			while True :
-				evt_trigger = await First(*_trigger_events)
-				#self._log.debug(f"Clear event {evt_trigger!r}")
-				evt_trigger.parent.clear()
-
-	def build(self):
-		super(Monitor, self).build()
-		self._autoreset_process = cocotb.start_soon(self._autoreset_events_handler())
-
 	def post_build(self):
 		super().post_build()
 		evt : Event
@@ -80,7 +59,7 @@ class Monitor(Component, ABC) :
 	def start(self):
 		if self._run_process is not None :
 			self.stop()
-		self._run_process = cocotb.start_soon(self._run())
+		self._run_process = self.start_task(self._run())
 
 	def stop(self):
 		if self._run_process is not None:
@@ -109,12 +88,16 @@ class Monitor(Component, ABC) :
 			self.add_evt_to_sensitivity(Edge(signal))
 
 	def add_evt_to_autoreset(self, evt : T.Union[T.Iterable[Event],Event]):
+		"""
+		Make the provided events clear themselves right after being set, by turning them into PulseEvent in place.
+		Events may directly be created as PulseEvent instead.
+		:param evt: Event or iterable of events
+		"""
 		if hasattr(evt,"__iter__") :
 			for e in evt :
 				self.add_evt_to_autoreset(e)
 		else:
-			if evt not in self._autoreset_events :
-				self._autoreset_events.append(evt)
+			make_pulse(evt)
 
 	def evt_name(self,name : str):
 		return  f"{self.name}@{name}"
@@ -0,0 +1,223 @@
+import inspect
+import json
+import os
+import time
+import typing as T
+
+import cocotb
+from cocotb import Task
+
+
+class TaskStats:
+	def __init__(self, owner, name : str):
+		"""
+		Accounting data for all the tasks started by a given owner under a given name.
+		A task restarted several times (typically on reset) is accounted on the same record.
+		:param owner: Object (usually a component) which started the task.
+		:param name: Name of the task, unique for a given owner.
+		"""
+		self.owner = owner
+		self.name = name
+
+		"""Number of tasks started under this name"""
+		self.started = 0
+
+		"""Number of times the tasks were resumed by the scheduler (only accounted when profiling)"""
+		self.resumptions = 0
+
+		"""Cumulated wall time spent executing the tasks, in seconds (only accounted when profiling)"""
+		self.wall_time = 0.0
+
+		"""Handles of the tasks which may still be running"""
+		self._tasks : T.List[Task] = list()
+
+	@property
+	def owner_name(self) -> str:
+		""":return: The name of the owner, or the owner type name if it has no name"""
+		name = getattr(self.owner, "name", None)
+		return name if name is not None else type(self.owner).__name__
+
+	@property
+	def live_tasks(self) -> T.List[Task]:
+		""":return: The tasks that are still running. Finished tasks are forgotten."""
+		self._tasks = [t for t in self._tasks if not t.done()]
+		return self._tasks
+
+	@property
+	def live(self) -> int:
+		return len(self.live_tasks)
+
+	def as_dict(self) -> T.Dict[str, T.Any]:
+		return {
+			"owner" : self.owner_name,
+			"name" : self.name,
+			"started" : self.started,
+			"live" : self.live,
+			"resumptions" : self.resumptions,
+			"wall_time" : self.wall_time
+		}
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__} {self.owner_name}:{self.name} live={self.live} resumed={self.resumptions}>"
+
+
+class _Resume:
+	"""Awaitable handing a trigger over to the scheduler on behalf of a profiled coroutine"""
+	__slots__ = ("trigger",)
+
+	def __init__(self, trigger):
+		self.trigger = trigger
+
+	def __await__(self):
+		return (yield self.trigger)
+
+
+async def _profiled(coro, stats : TaskStats):
+	"""
+	Run a coroutine step by step, accounting each resumption and the wall time spent in it.
+	Values and exceptions sent by the scheduler are forwarded as is.
+	"""
+	send_value = None
+	error = None
+	while True :
+		start = time.perf_counter()
+		try :
+			trigger = coro.send(send_value) if error is None else coro.throw(error)
+		except StopIteration as e :
+			return e.value
+		finally :
+			stats.resumptions += 1
+			stats.wall_time += time.perf_counter() - start
+
+		try :
+			send_value = await _Resume(trigger)
+			error = None
+		except GeneratorExit :
+			# The task is killed
+			coro.close()
+			raise
+		except BaseException as e :
+			send_value = None
+			error = e
+
+
+class TaskRegistry:
+	def __init__(self):
+		"""
+		Registry through which the components start their background tasks.
+		Each task is accounted against its owner, which allows to spot leaked or duplicated tasks.
+
+		If profiling is enabled (by setting the VIPY_PROFILE environment variable or the profiling attribute),
+		the number of resumptions and the wall time spent in each task are also accounted.
+		"""
+
+		"""Records, indexed by (owner id, task name)"""
+		self._records : T.Dict[T.Tuple[int,str], TaskStats] = dict()
+
+		"""Enable the per-resumption accounting. Only affects tasks started afterward."""
+		self.profiling = "VIPY_PROFILE" in os.environ or "VIPY_PROFILE_FILE" in os.environ
+
+	def _prepare(self, owner, coro, name : T.Optional[str]):
+		if name is None :
+			name = getattr(coro, "__qualname__", type(coro).__name__)
+		key = (id(owner), name)
+		if key not in self._records :
+			self._records[key] = TaskStats(owner, name)
+		stats = self._records[key]
+		stats.started += 1
+
+		if self.profiling and inspect.iscoroutine(coro) :
+			wrapped = _profiled(coro, stats)
+			wrapped.__name__ = coro.__name__
+			wrapped.__qualname__ = coro.__qualname__
+			coro = wrapped
+		return coro, stats
+
+	def start_soon(self, owner, coro, name : T.Optional[str] = None) -> Task:
+		"""
+		Schedule a coroutine to be run concurrently, see cocotb.start_soon
+		:param owner: Object accounted as the owner of the task
+		:param coro: Coroutine to run
+		:param name: Name of the task, default to the coroutine name.
+		:return: The created task
+		"""
+		coro, stats = self._prepare(owner, coro, name)
+		task = cocotb.start_soon(coro)
+		stats._tasks.append(task)
+		return task
+
+	async def start(self, owner, coro, name : T.Optional[str] = None) -> Task:
+		"""
+		Schedule a coroutine to be run concurrently and yield control to it, see cocotb.start
+		:param owner: Object accounted as the owner of the task
+		:param coro: Coroutine to run
+		:param name: Name of the task, default to the coroutine name.
+		:return: The created task
+		"""
+		coro, stats = self._prepare(owner, coro, name)
+		task = await cocotb.start(coro)
+		stats._tasks.append(task)
+		return task
+
+	def stats(self, owner = None) -> T.List[TaskStats]:
+		"""
+		:param owner: If provided, only return the records of this owner
+		:return: The list of matching task records
+		"""
+		return [s for s in self._records.values() if owner is None or s.owner is owner]
+
+	def live_count(self, owner = None) -> int:
+		"""
+		:param owner: If provided, only count the tasks of this owner
+		:return: The number of tasks still running
+		"""
+		return sum(s.live for s in self.stats(owner))
+
+	def live_count_per_owner(self) -> T.Dict[str, int]:
+		""":return: The number of running tasks, indexed by owner name"""
+		ret : T.Dict[str, int] = dict()
+		for s in self._records.values() :
+			ret[s.owner_name] = ret.get(s.owner_name, 0) + s.live
+		return ret
+
+	def kill_all(self, owner = None):
+		"""
+		Kill all the running tasks
+		:param owner: If provided, only kill the tasks of this owner
+		"""
+		for s in self.stats(owner) :
+			for task in s.live_tasks :
+				task.kill()
+			s._tasks.clear()
+
+	def clear(self):
+		"""Forget all the accounting data. Running tasks are left untouched but will not be tracked anymore."""
+		self._records.clear()
+
+	def as_dict(self) -> T.List[T.Dict[str, T.Any]]:
+		return [s.as_dict() for s in self._records.values()]
+
+	def dump(self, path : str):
+		"""
+		Write the accounting data to a JSON file
+		:param path: Path of the file to write
+		"""
+		with open(path, "w") as f :
+			json.dump(self.as_dict(), f, indent=1)
+
+	@property
+	def as_report(self) -> str:
+		"""
+		:return: a report of all the tasks started through the registry, the most time consuming first
+		"""
+		ret = f"{'':#<80s}\n" \
+		      f"#{' Task registry report ': ^78s}#\n" \
+		      f"{'':#<80s}\n"
+		ret += f"{'Owner:task':44s} {'Live':>5s} {'Start':>6s} {'Resumed':>10s} {'Time (ms)':>11s}\n"
+		for s in sorted(self._records.values(), key=lambda x: x.wall_time, reverse=True) :
+			tname = f"{s.owner_name}:{s.name}"
+			if len(tname) > 44 :
+				tname = "..." + tname[-41:]
+			ret += f"{tname:44s} {s.live:5d} {s.started:6d} {s.resumptions:10d} {s.wall_time * 1e3:11.3f}\n"
+		ret += f"{'':#<80s}\n"
+		return ret
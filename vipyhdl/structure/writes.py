@@ -0,0 +1,116 @@
+import os
+import typing as T
+
+from cocotb.handle import ModifiableObject
+from cocotb.triggers import ReadWrite
+from cocotb import Task
+
+from .tasks import TaskRegistry
+
+
+class WriteBuffer:
+	def __init__(self, tasks : TaskRegistry):
+		"""
+		Write-combining layer through which the drivers write their nets.
+
+		When enabled (by setting the VIPY_WRITE_COMBINING environment variable or the enabled attribute), the writes
+		are stored per handle and only the last value of each net is applied, once, in the ReadWrite phase of the
+		timestep or earlier on an explicit flush().
+		When disabled, the writes go straight to the handles.
+
+		As with the cocotb writes, reading a net after writing it returns its previous value until the buffer is
+		flushed. A net written through the buffer should not be written directly in the same timestep.
+		:param tasks: Registry used to start the flush task
+		"""
+		self._tasks = tasks
+		self._enabled = "VIPY_WRITE_COMBINING" in os.environ
+
+		"""Pending values, indexed by handle. Dicts keep the insertion order, so nets are written in order of first write."""
+		self._pending : T.Dict[ModifiableObject, T.Any] = dict()
+		self._flush_task : T.Optional[Task] = None
+
+		"""Number of writes posted while enabled"""
+		self.posted = 0
+
+		"""Number of writes superseded by a later write to the same net before the flush"""
+		self.elided = 0
+
+		"""Number of writes actually applied to the simulator"""
+		self.applied = 0
+
+		"""Number of non-empty flushes"""
+		self.flushes = 0
+
+	@property
+	def enabled(self) -> bool:
+		return self._enabled
+
+	@enabled.setter
+	def enabled(self, value : bool):
+		if not value :
+			self.flush()
+		self._enabled = value
+
+	@property
+	def pending(self) -> int:
+		""":return: The number of nets waiting to be written"""
+		return len(self._pending)
+
+	def write(self, handle : ModifiableObject, value):
+		"""
+		Write a net, through the buffer if enabled.
+		:param handle: Net to write
+		:param value: Value to write, as accepted by handle.value
+		"""
+		if not self._enabled :
+			handle.value = value
+			return
+		self.posted += 1
+		if handle in self._pending :
+			self.elided += 1
+		self._pending[handle] = value
+		# The flush task may have been killed with the other tasks (end of test, rearm) before running
+		if self._flush_task is None or self._flush_task.done() :
+			self._flush_task = self._tasks.start_soon(self, self._flush_on_readwrite(), "flush")
+
+	def value(self, handle : ModifiableObject):
+		"""
+		:return: The value pending for a net, or its current value if none is pending
+		"""
+		if handle in self._pending :
+			return self._pending[handle]
+		return handle.value
+
+	async def _flush_on_readwrite(self):
+		await ReadWrite()
+		self._flush_task = None
+		self.flush()
+
+	def flush(self):
+		"""
+		Apply all the pending writes right away. Must not be called in the ReadOnly phase.
+		"""
+		if len(self._pending) == 0 :
+			return
+		pending = self._pending
+		self._pending = dict()
+		for handle, value in pending.items() :
+			handle.setimmediatevalue(value)
+		self.applied += len(pending)
+		self.flushes += 1
+
+	def clear(self):
+		"""Drop the pending writes and forget the flush task, used on rearm and teardown"""
+		self._pending.clear()
+		self._flush_task = None
+
+	def as_dict(self) -> T.Dict[str, int]:
+		return {
+			"posted" : self.posted,
+			"elided" : self.elided,
+			"applied" : self.applied,
+			"flushes" : self.flushes
+		}
+
+	def __repr__(self) -> str:
+		return f"<{type(self).__name__} enabled={self._enabled} pending={self.pending} elided={self.elided}/{self.posted}>"
@@ -0,0 +1,13 @@
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .pulse_event import PulseEvent
+	from .pulse_event import make_pulse
+
+__all__ = ["PulseEvent", "make_pulse"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"PulseEvent" : ".pulse_event",
+	"make_pulse" : ".pulse_event",
+})
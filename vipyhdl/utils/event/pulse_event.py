@@ -0,0 +1,30 @@
+from cocotb.triggers import Event
+
+
+class PulseEvent(Event):
+	"""
+	Event which only wakes up the tasks currently waiting on it and never stays set.
+	It behaves as an Event which would be cleared right after each set(), without any helper task::
+
+		evt = PulseEvent("data_ready")
+		evt.set(42)       # Wake up the current waiters, which may read evt.data
+		evt.is_set()      # False, a later evt.wait() will wait for the next set()
+
+	The data passed to set() is kept until the next set().
+	"""
+
+	def set(self, data=None):
+		super().set(data)
+		self.clear()
+
+
+def make_pulse(evt : Event) -> PulseEvent:
+	"""
+	Turn an existing event into a pulse event, in place, so any reference to the event is kept valid.
+	:param evt: Event to convert
+	:return: The converted event
+	"""
+	if not isinstance(evt, PulseEvent) :
+		evt.__class__ = PulseEvent
+		evt.clear()
+	return evt
@@ -0,0 +1,34 @@
+import importlib
+import sys
+import typing as T
+
+
+def lazy_exports(package : str, exports : T.Dict[str, str]) -> T.Tuple[T.Callable[[str], T.Any], T.Callable[[], T.List[str]]]:
+	"""
+	Build the module level __getattr__ and __dir__ (PEP 562) of a package whose exported names are only imported
+	when first accessed. Importing the package then costs nothing until one of its names is actually used::
+
+		# In the package __init__.py
+		__all__ = ["ClockDriver", "ResetDriver"]
+		__getattr__, __dir__ = lazy_exports(__name__, {
+			"ClockDriver" : ".clock",
+			"ResetDriver" : ".reset",
+		})
+
+	Once loaded, a name is stored in the package namespace so later accesses do not go through __getattr__ anymore.
+
+	:param package: Name of the package, usually __name__
+	:param exports: Mapping of each exported name to the (relative) module defining it
+	:return: The __getattr__ and __dir__ functions to set in the package namespace
+	"""
+	def __getattr__(name : str):
+		if name not in exports :
+			raise AttributeError(f"module {package!r} has no attribute {name!r}")
+		value = getattr(importlib.import_module(exports[name], package), name)
+		setattr(sys.modules[package], name, value)
+		return value
+
+	def __dir__() -> T.List[str]:
+		return sorted(set(vars(sys.modules[package])) | set(exports))
+
+	return __getattr__, __dir__
@@ -1 +1,20 @@
-from .queue import QueueEvt
\ No newline at end of file
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .queue import QueueEvt
+	from .queue import RingBuffer
+	from .dataport import DataPort
+	from .broadcast import BroadcastPort, BroadcastSubscriber, OverflowPolicy, BroadcastOverflowError
+
+__all__ = ["QueueEvt", "RingBuffer", "DataPort", "BroadcastPort", "BroadcastSubscriber", "OverflowPolicy", "BroadcastOverflowError"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"QueueEvt" : ".queue",
+	"RingBuffer" : ".queue",
+	"DataPort" : ".dataport",
+	"BroadcastPort" : ".broadcast",
+	"BroadcastSubscriber" : ".broadcast",
+	"OverflowPolicy" : ".broadcast",
+	"BroadcastOverflowError" : ".broadcast",
+})
@@ -0,0 +1,237 @@
+import enum
+import typing as T
+
+from cocotb.queue import QueueEmpty, QueueFull
+
+from vipyhdl.utils.event import PulseEvent
+
+
+class OverflowPolicy(enum.Enum):
+	"""Behavior of a BroadcastPort when its slowest subscriber lags by a full buffer"""
+	BLOCK = enum.auto()
+	DROP_OLDEST = enum.auto()
+	RAISE = enum.auto()
+
+
+class BroadcastOverflowError(RuntimeError):
+	pass
+
+
+class BroadcastSubscriber:
+	def __init__(self, port : "BroadcastPort", cursor : int):
+		"""
+		Read side of a BroadcastPort, with its own read cursor.
+		Provides the same reading interface as a cocotb Queue.
+		:param port: Port to read from
+		:param cursor: Sequence number of the first item to read
+		"""
+		self._port = port
+
+		"""Sequence number of the next item to read"""
+		self.cursor = cursor
+
+		"""Number of items read"""
+		self.received = 0
+
+		"""Number of items overwritten before being read (DROP_OLDEST policy only)"""
+		self.dropped = 0
+
+	def _skip_dropped(self):
+		oldest = self._port._head - self._port.capacity
+		if self.cursor < oldest :
+			self.dropped += oldest - self.cursor
+			self.cursor = oldest
+
+	@property
+	def lag(self) -> int:
+		""":return: The number of items available but not yet read"""
+		self._skip_dropped()
+		return self._port._head - self.cursor
+
+	def qsize(self) -> int:
+		return self.lag
+
+	def empty(self) -> bool:
+		return self.cursor >= self._port._head
+
+	def get_nowait(self):
+		"""
+		:return: The next item
+		:raises QueueEmpty: if no item is available
+		"""
+		port = self._port
+		self._skip_dropped()
+		if self.cursor >= port._head :
+			raise QueueEmpty()
+		item = port._buffer[self.cursor % port.capacity]
+		self.cursor += 1
+		self.received += 1
+		if port._producer_blocked :
+			port._space_available.set()
+		return item
+
+	async def get(self):
+		""":return: The next item, waiting for it if required"""
+		while self.cursor >= self._port._head :
+			await self._port._data_available.wait()
+		return self.get_nowait()
+
+	def drain(self) -> T.List[T.Any]:
+		""":return: All the available items"""
+		ret = list()
+		while not self.empty() :
+			ret.append(self.get_nowait())
+		return ret
+
+
+class BroadcastPort:
+	def __init__(self, capacity : int = 1024, policy : OverflowPolicy = OverflowPolicy.BLOCK, name : str = "broadcast"):
+		"""
+		Data port broadcasting each item to all of its subscribers through a single bounded ring buffer.
+		Each subscriber holds its own read cursor, so a put costs the same regardless of the number of subscribers.
+
+		When the slowest subscriber lags by `capacity` items, the behavior depends on the policy :
+		  - BLOCK : put() waits for the slowest subscriber to read, put_nowait() raises QueueFull.
+		  - DROP_OLDEST : the oldest item is overwritten, lagging subscribers skip it and account it as dropped.
+		  - RAISE : put() and put_nowait() raise BroadcastOverflowError.
+
+		:param capacity: Number of items held by the ring buffer
+		:param policy: Overflow policy
+		:param name: Name used for the internal events
+		"""
+		if capacity < 1 :
+			raise ValueError(f"Invalid broadcast port capacity {capacity}")
+		self.capacity = capacity
+		self.policy = policy
+		self.name = name
+
+		self._buffer : T.List[T.Any] = [None] * capacity
+
+		"""Sequence number of the next item to write"""
+		self._head = 0
+
+		"""Lower bound of the subscribers cursors, only refreshed when the buffer seems full or its occupancy may reach a new maximum"""
+		self._tail = 0
+
+		self.subscribers : T.Dict[object, BroadcastSubscriber] = dict()
+
+		self._data_available = PulseEvent(f"{name}_data")
+		self._space_available = PulseEvent(f"{name}_space")
+		self._producer_blocked = False
+
+		"""Statistics. max_occupancy is the largest number of items not yet read by the slowest subscriber, right after a put"""
+		self.puts = 0
+		self.max_occupancy = 0
+		self.blocked_puts = 0
+		self.overflows = 0
+
+	def connect(self, child) -> BroadcastSubscriber:
+		"""
+		Get the subscriber associated to child, creating it if required.
+		A new subscriber only receives the items put after its connection.
+		:param child: Object identifying the subscriber
+		:return: The subscriber
+		"""
+		if child not in self.subscribers :
+			self.subscribers[child] = BroadcastSubscriber(self, self._head)
+		return self.subscribers[child]
+
+	def disconnect(self, child):
+		"""
+		Remove a subscriber, a producer blocked by this subscriber is released.
+		:param child: Object identifying the subscriber
+		"""
+		self.subscribers.pop(child)
+		if self._producer_blocked :
+			self._space_available.set()
+
+	def _refresh_tail(self):
+		if len(self.subscribers) > 0 :
+			self._tail = min(s.cursor for s in self.subscribers.values())
+		else :
+			self._tail = self._head
+
+	def full(self) -> bool:
+		""":return: True if the slowest subscriber lags by a full buffer"""
+		if self._head - self._tail < self.capacity :
+			return False
+		self._refresh_tail()
+		return self._head - self._tail >= self.capacity
+
+	@property
+	def occupancy(self) -> int:
+		""":return: The number of items not yet read by the slowest subscriber"""
+		self._refresh_tail()
+		return min(self._head - self._tail, self.capacity)
+
+	@property
+	def max_lag(self) -> int:
+		""":return: The lag of the slowest subscriber"""
+		return max((s.lag for s in self.subscribers.values()), default=0)
+
+	@property
+	def dropped(self) -> int:
+		""":return: Total number of items dropped, all subscribers included"""
+		for s in self.subscribers.values() :
+			s._skip_dropped()
+		return sum(s.dropped for s in self.subscribers.values())
+
+	@property
+	def stats(self) -> T.Dict[str, T.Any]:
+		return {
+			"puts" : self.puts,
+			"capacity" : self.capacity,
+			"occupancy" : self.occupancy,
+			"max_occupancy" : self.max_occupancy,
+			"blocked_puts" : self.blocked_puts,
+			"overflows" : self.overflows,
+			"dropped" : self.dropped,
+			"lags" : {str(child) : s.lag for child, s in self.subscribers.items()}
+		}
+
+	def put_nowait(self, item):
+		"""
+		Broadcast an item without waiting.
+		:param item: Item to broadcast
+		:raises QueueFull: if the buffer is full with the BLOCK policy
+		:raises BroadcastOverflowError: if the buffer is full with the RAISE policy
+		"""
+		if self.full() :
+			self.overflows += 1
+			if self.policy is OverflowPolicy.BLOCK :
+				raise QueueFull()
+			elif self.policy is OverflowPolicy.RAISE :
+				raise BroadcastOverflowError(f"Broadcast port {self.name} overflow, the slowest subscriber lags by {self.capacity} items")
+			# DROP_OLDEST : lagging subscribers will skip the overwritten item on their next read
+			self._tail = self._head - self.capacity + 1
+
+		self._buffer[self._head % self.capacity] = item
+		self._head += 1
+		self.puts += 1
+		if self._head - self._tail > self.max_occupancy :
+			# The tail may be stale, only pay for the subscribers scan when the maximum may change
+			self._refresh_tail()
+			self.max_occupancy = max(self.max_occupancy, min(self._head - self._tail, self.capacity))
+		self._data_available.set()
+
+	async def put(self, item):
+		"""
+		Broadcast an item, waiting for the slowest subscriber with the BLOCK policy.
+		:param item: Item to broadcast
+		:raises BroadcastOverflowError: if the buffer is full with the RAISE policy
+		"""
+		if self.policy is OverflowPolicy.BLOCK and self.full() :
+			self.blocked_puts += 1
+			while self.full() :
+				self._producer_blocked = True
+				await self._space_available.wait()
+			self._producer_blocked = False
+		self.put_nowait(item)
+
+	def clear(self):
+		"""Drop all the items not yet read. Subscribers are kept."""
+		self._buffer = [None] * self.capacity
+		for s in self.subscribers.values() :
+			s.cursor = self._head
+		self._tail = self._head
+		self._producer_blocked = False
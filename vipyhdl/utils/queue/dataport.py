@@ -13,5 +13,14 @@ class DataPort():
 
 	def put(self,item):
 		for q in self.queues.values():
-			q.put(item)
+			q.put_nowait(item)
+
+	def put_many(self,items : T.Sequence):
+		for q in self.queues.values():
+			q.put_many_nowait(items)
+
+	def clear(self):
+		"""Drop the content of all the connected queues"""
+		for q in self.queues.values():
+			q.clear()
 
@@ -1,29 +1,216 @@
-from cocotb.queue import Queue
-from cocotb.triggers import *
-import cocotb
+import typing as T
+
+from cocotb.queue import Queue, QueueFull
+from cocotb.triggers import Event
+
+
+class RingBuffer:
+	__slots__ = ("capacity", "_data", "_head", "_count")
+
+	def __init__(self, capacity : int):
+		"""
+		Fixed capacity FIFO storage, allocated once.
+		Provides the subset of the deque interface used by the cocotb queues.
+		:param capacity: Maximum number of items
+		"""
+		self.capacity = capacity
+		self._data : T.List[T.Any] = [None] * capacity
+		self._head = 0
+		self._count = 0
+
+	def append(self, item):
+		if self._count >= self.capacity :
+			raise QueueFull()
+		self._data[(self._head + self._count) % self.capacity] = item
+		self._count += 1
+
+	def extend(self, items : T.Iterable):
+		for item in items :
+			self.append(item)
+
+	def popleft(self):
+		if self._count == 0 :
+			raise IndexError("pop from an empty ring buffer")
+		item = self._data[self._head]
+		self._data[self._head] = None
+		self._head = (self._head + 1) % self.capacity
+		self._count -= 1
+		return item
+
+	def clear(self):
+		self._data = [None] * self.capacity
+		self._head = 0
+		self._count = 0
+
+	def __len__(self):
+		return self._count
+
+	def __bool__(self):
+		return self._count > 0
+
+	def __iter__(self):
+		for i in range(self._count) :
+			yield self._data[(self._head + i) % self.capacity]
 
 
 class QueueEvt(Queue):
-	def __init__(self, maxsize = 0):
+	def __init__(self, maxsize = 0, preallocate = False):
+		"""
+		Queue providing events on its state (full, empty, done).
+		The events are only created, and then maintained, once they are accessed.
+
+		:param maxsize: Maximum number of items, 0 for an unbounded queue.
+		:param preallocate: For bounded queues, store the items in a ring buffer allocated once.
+		"""
+		self._preallocate = preallocate and maxsize > 0
 		super().__init__(maxsize)
-		self.is_full = Event()
-		self.is_empty = Event()
-		self.is_done = Event()
-		self.is_empty.set()
+		self._evt_full : T.Optional[Event] = None
+		self._evt_empty : T.Optional[Event] = None
+		self._evt_done : T.Optional[Event] = None
 		self.done_flag = False
 
+	def _init(self, maxsize):
+		if self._preallocate :
+			self._queue = RingBuffer(maxsize)
+		else :
+			super()._init(maxsize)
+
+	@property
+	def is_full(self) -> Event:
+		if self._evt_full is None :
+			self._evt_full = Event("queue_full")
+			if self.full() :
+				self._evt_full.set()
+		return self._evt_full
+
+	@property
+	def is_empty(self) -> Event:
+		if self._evt_empty is None :
+			self._evt_empty = Event("queue_empty")
+			if self.empty() :
+				self._evt_empty.set()
+		return self._evt_empty
+
+	@property
+	def is_done(self) -> Event:
+		if self._evt_done is None :
+			self._evt_done = Event("queue_done")
+			if self.empty() and self.done_flag :
+				self._evt_done.set()
+		return self._evt_done
+
+	def _after_put(self):
+		"""Update the state events after one or several items were added"""
+		if self._evt_empty is not None :
+			self._evt_empty.clear()
+		if self._evt_done is not None :
+			self._evt_done.clear()
+		if self._evt_full is not None and self.full() :
+			self._evt_full.set()
+
+	def _after_get(self):
+		"""Update the state events after one or several items were removed"""
+		if self._evt_full is not None :
+			self._evt_full.clear()
+		if self.empty() :
+			if self._evt_empty is not None :
+				self._evt_empty.set()
+			if self.done_flag and self._evt_done is not None :
+				self._evt_done.set()
+
 	def _put(self,item):
 		super()._put(item)
-		self.is_empty.clear()
-		self.is_done.clear()
-		if self.full() :
-			self.is_full.set()
+		self._after_put()
 
 	def _get(self):
 		ret = super()._get()
-		self.is_full.clear()
-		if self.empty() :
-			self.is_empty.set()
-			if self.done_flag :
-				self.is_done.set()
+		self._after_get()
+		return ret
+
+	def put_many_nowait(self, items : T.Sequence):
+		"""
+		Put several items at once, the state events are updated once.
+		:param items: Items to put
+		:raises QueueFull: if the queue cannot hold all the items. Nothing is put in this case.
+		"""
+		if len(items) == 0 :
+			return
+		if self.maxsize > 0 and self.qsize() + len(items) > self.maxsize :
+			raise QueueFull()
+		self._queue.extend(items)
+		self._after_put()
+		# Same bookkeeping as put_nowait, the finished event only exists up to cocotb 1.9
+		finished = getattr(self, "_finished", None)
+		if finished is not None :
+			finished.clear()
+		for _ in range(min(len(items), len(self._getters))) :
+			self._wakeup_next(self._getters)
+
+	async def put_many(self, items : T.Iterable):
+		"""
+		Put several items, waiting for room if required.
+		The items are put by batches, as large as the available room.
+		:param items: Items to put
+		"""
+		items = list(items)
+		pos = 0
+		while pos < len(items) :
+			room = len(items) - pos if self.maxsize <= 0 else self.maxsize - self.qsize()
+			if room <= 0 :
+				# Wait for room through the regular put
+				await self.put(items[pos])
+				pos += 1
+			else :
+				self.put_many_nowait(items[pos:pos+room])
+				pos += room
+
+	def get_many_nowait(self, n : T.Optional[int] = None) -> T.List[T.Any]:
+		"""
+		Get several items at once, the state events are updated once.
+		:param n: Maximum number of items to get, all the available items if None.
+		:return: The list of items, which may be shorter than n (or empty).
+		"""
+		count = len(self._queue) if n is None else min(n, len(self._queue))
+		if count == 0 :
+			return list()
+		ret = [self._queue.popleft() for _ in range(count)]
+		self._after_get()
+		for _ in range(min(count, len(self._putters))) :
+			self._wakeup_next(self._putters)
+		return ret
+
+	async def get_many(self, n : int) -> T.List[T.Any]:
+		"""
+		Get exactly n items, waiting for them if required.
+		:param n: Number of items to get
+		:return: The list of items
+		"""
+		ret = list()
+		while len(ret) < n :
+			if self.empty() :
+				ret.append(await self.get())
+			else :
+				ret.extend(self.get_many_nowait(n - len(ret)))
 		return ret
+
+	def drain(self) -> T.List[T.Any]:
+		"""
+		:return: All the queued items, the queue is left empty.
+		"""
+		return self.get_many_nowait()
+
+	def clear(self):
+		"""
+		Drop all the queued items and forget the waiting tasks.
+		Intended to be used between two tests, when all the tasks using the queue are killed.
+		"""
+		self._queue.clear()
+		self._getters.clear()
+		self._putters.clear()
+		self.done_flag = False
+		if self._evt_full is not None :
+			self._evt_full.clear()
+		if self._evt_done is not None :
+			self._evt_done.clear()
+		if self._evt_empty is not None :
+			self._evt_empty.set()
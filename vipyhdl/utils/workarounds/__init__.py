@@ -1 +1,14 @@
-from .verilator_vectors import int_to_vector, vector_to_int
+import typing as T
+
+from vipyhdl.utils.meta.lazy import lazy_exports
+
+if T.TYPE_CHECKING :
+	from .verilator_vectors import int_to_vector, vector_to_int
+	from .vector_codec import VectorCodec
+
+__all__ = ["int_to_vector", "vector_to_int", "VectorCodec"]
+__getattr__, __dir__ = lazy_exports(__name__, {
+	"int_to_vector" : ".verilator_vectors",
+	"vector_to_int" : ".verilator_vectors",
+	"VectorCodec" : ".vector_codec",
+})
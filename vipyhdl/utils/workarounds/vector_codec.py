@@ -0,0 +1,206 @@
+import functools
+import typing as T
+from math import prod
+
+try :
+	import numpy as np
+except ImportError :
+	np = None
+
+
+class VectorCodec:
+	def __init__(self, dim : T.Sequence[int], signed : bool = False):
+		"""
+		Pack and unpack N-dimensional arrays of words to and from a single integer, as seen on a packed HDL vector.
+		Element 0 is held by the LSBs of the packed value, the last dimension is the word size and the other
+		dimensions are nested in row-major order::
+
+			codec = VectorCodec([2, 3, 8])
+			codec.unpack(0x050403020100)
+			# [[0, 1, 2], [3, 4, 5]]
+
+		Conversions are done through bytes buffers, shifts and masks, so their cost is linear with the vector size.
+		When NumPy is available, unpack_array and pack_array provide a vectorized path for large vectors.
+
+		:param dim: Dimensions of the array, the last one being the word size in bits.
+		:param signed: Words are two's complement signed values.
+		"""
+		if len(dim) == 0 or any(d < 1 for d in dim) :
+			raise ValueError(f"Invalid vector dimensions {list(dim)!r}")
+		self.dim = list(dim)
+		self.shape = self.dim[:-1]
+		self.signed = signed
+
+		"""Number of bits per word"""
+		self.wsize = self.dim[-1]
+
+		"""Number of words"""
+		self.count = prod(self.shape)
+
+		"""Number of bits of the packed vector"""
+		self.width = self.count * self.wsize
+
+		self.mask = (1 << self.wsize) - 1
+		self.vector_mask = (1 << self.width) - 1
+		self._sign_bit = 1 << (self.wsize - 1)
+		self._sign_offset = 1 << self.wsize
+
+		# Words of byte-aligned size are directly sliced from the buffer.
+		# Otherwise, words are handled by groups of 8 which always span a whole number of bytes.
+		self._byte_aligned = self.wsize % 8 == 0
+		if self._byte_aligned :
+			self._word_bytes = self.wsize // 8
+			self._nbytes = self.count * self._word_bytes
+		else :
+			self._groups = (self.count + 7) // 8
+			self._nbytes = self._groups * self.wsize
+
+	@classmethod
+	@functools.lru_cache(maxsize=None)
+	def get(cls, dim : T.Tuple[int, ...], signed : bool = False) -> "VectorCodec":
+		"""
+		:return: A shared codec for the given dimensions (provided as a tuple) and signedness.
+		"""
+		return cls(dim, signed)
+
+	def unpack_flat(self, value : int) -> T.List[int]:
+		"""
+		:param value: Packed vector value. Bits beyond the vector width are ignored.
+		:return: The flat list of words, element 0 first.
+		"""
+		raw = (int(value) & self.vector_mask).to_bytes(self._nbytes, "little")
+		if self._byte_aligned :
+			k = self._word_bytes
+			return [int.from_bytes(raw[i:i+k], "little", signed=self.signed) for i in range(0, self._nbytes, k)]
+
+		w = self.wsize
+		m = self.mask
+		ret = list()
+		for g in range(0, self._nbytes, w) :
+			chunk = int.from_bytes(raw[g:g+w], "little")
+			for _ in range(8) :
+				ret.append(chunk & m)
+				chunk >>= w
+		del ret[self.count:]
+		if self.signed :
+			sign = self._sign_bit
+			offset = self._sign_offset
+			ret = [x - offset if x & sign else x for x in ret]
+		return ret
+
+	def pack_flat(self, values : T.Sequence[int]) -> int:
+		"""
+		:param values: Flat list of words, element 0 first. Missing words are packed as 0, extra words are ignored.
+		Negative words are packed as two's complement.
+		:return: The packed vector value.
+		"""
+		m = self.mask
+		if len(values) < self.count :
+			values = list(values) + [0] * (self.count - len(values))
+
+		if self._byte_aligned :
+			k = self._word_bytes
+			raw = b"".join([(int(x) & m).to_bytes(k, "little") for x in values[:self.count]])
+			return int.from_bytes(raw, "little")
+
+		# Merge the words pairwise until a single value is left, so each shift works on small integers
+		items = [int(x) & m for x in values[:self.count]]
+		width = self.wsize
+		while len(items) > 1 :
+			if len(items) % 2 :
+				items.append(0)
+			items = [lo | (hi << width) for lo, hi in zip(items[0::2], items[1::2])]
+			width *= 2
+		return items[0]
+
+	def nest(self, flat : T.List[T.Any]) -> T.Any:
+		"""
+		:param flat: Flat list of words
+		:return: The words nested as per the codec shape. A single word is returned as is for 1D codecs.
+		"""
+		if len(self.shape) == 0 :
+			return flat[0]
+		ret = flat
+		for d in reversed(self.shape[1:]) :
+			ret = [ret[i:i+d] for i in range(0, len(ret), d)]
+		return ret
+
+	@staticmethod
+	def flatten(values : T.Any) -> T.List[T.Any]:
+		"""
+		:param values: Nested lists (or tuples) of words
+		:return: The flat list of words, in packing order
+		"""
+		if not isinstance(values, (list, tuple)) :
+			return [values]
+		if len(values) == 0 or not isinstance(values[0], (list, tuple)) :
+			return values
+		ret = list()
+		for v in values :
+			ret.extend(VectorCodec.flatten(v))
+		return ret
+
+	def unpack(self, value : int) -> T.Any:
+		"""
+		:param value: Packed vector value
+		:return: Nested lists of words, as per the codec shape.
+		"""
+		return self.nest(self.unpack_flat(value))
+
+	def pack(self, values : T.Any) -> int:
+		"""
+		:param values: Nested lists of words, or a NumPy array.
+		:return: The packed vector value.
+		"""
+		if np is not None and isinstance(values, np.ndarray) :
+			return self.pack_array(values)
+		return self.pack_flat(self.flatten(values))
+
+	def _require_numpy(self):
+		if np is None :
+			raise ImportError("NumPy is required for the array conversions of VectorCodec")
+		if self.wsize > 64 :
+			raise ValueError(f"Array conversions are limited to 64 bits words, got {self.wsize} bits")
+
+	@property
+	def dtype(self):
+		""":return: The smallest NumPy integer type able to hold a word"""
+		self._require_numpy()
+		for size in [8, 16, 32, 64] :
+			if self.wsize <= size :
+				return np.dtype(f"{'i' if self.signed else 'u'}{size // 8}")
+
+	def unpack_array(self, value : int) -> "np.ndarray":
+		"""
+		:param value: Packed vector value
+		:return: A NumPy array of codec shape holding the words
+		"""
+		self._require_numpy()
+		raw = (int(value) & self.vector_mask).to_bytes(self._nbytes, "little")
+		shape = self.shape if len(self.shape) > 0 else [1]
+		if self._byte_aligned and self._word_bytes in [1, 2, 4, 8] :
+			return np.frombuffer(raw, dtype=self.dtype.newbyteorder("<"), count=self.count).reshape(shape).copy()
+
+		bits = np.unpackbits(np.frombuffer(raw, dtype=np.uint8), bitorder="little")[:self.width]
+		weights = np.left_shift(np.uint64(1), np.arange(self.wsize, dtype=np.uint64))
+		words = (bits.reshape(self.count, self.wsize).astype(np.uint64) * weights).sum(axis=1, dtype=np.uint64)
+		if self.signed :
+			words = words.astype(np.int64)
+			words[words >= self._sign_bit] -= self._sign_offset
+		return words.astype(self.dtype).reshape(shape)
+
+	def pack_array(self, values : "np.ndarray") -> int:
+		"""
+		:param values: Array of words, of codec shape or flat.
+		:return: The packed vector value.
+		"""
+		self._require_numpy()
+		flat = np.asarray(values).reshape(-1)[:self.count]
+		if flat.size < self.count :
+			flat = np.concatenate([flat, np.zeros(self.count - flat.size, dtype=flat.dtype)])
+		words = flat.astype(np.int64 if self.signed or flat.dtype.kind == "i" else np.uint64).astype(np.uint64) & np.uint64(self.mask)
+		if self._byte_aligned and self._word_bytes in [1, 2, 4, 8] :
+			return int.from_bytes(words.astype(f"<u{self._word_bytes}").tobytes(), "little")
+
+		bits = ((words[:, None] >> np.arange(self.wsize, dtype=np.uint64)) & np.uint64(1)).astype(np.uint8)
+		return int.from_bytes(np.packbits(bits.reshape(-1), bitorder="little").tobytes(), "little")